@@ -0,0 +1,132 @@
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+# Time to live in seconds of the cached objects and lists of each entity
+DEFAULT_TTL_SECONDS = {
+    "collections": 60.0,
+    "workflows": 60.0,
+    "users": 300.0,
+    "schedules": 30.0,
+    "credentials": 300.0,
+    "connections": 300.0,
+    # Keyed by published version, which never changes, the time to live only bounds the memory use
+    "workflow_graphs": 3600.0,
+}
+
+# (entity, object id or None for lists, variant)
+CacheKey = Tuple[str, Optional[str], Hashable]
+
+
+class _EntityStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+
+class CatalogCache:
+    """Bounded in-memory cache of the catalog objects (workflows, users, collections, ...) read by the tools.
+
+    Entries are stored per entity and object id, with a variant telling apart the different
+    representations of the same object (e.g. the model and the decoded JSON) or the filters of a
+    list. Every entity has its own time to live, and the least recently used entries are evicted
+    once `max_entries` is reached. Mutations call `invalidate`, which drops the changed object
+    together with every cached list of its entity, or `clear`.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: Optional[Dict[str, float]] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = dict(DEFAULT_TTL_SECONDS)
+        self.ttl_seconds.update(ttl_seconds or {})
+        # key -> (expires_at, value), in least recently used order
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        # (entity, object id) -> keys of its variants
+        self._keys: Dict[Tuple[str, Optional[str]], Set[CacheKey]] = {}
+        self._stats: Dict[str, _EntityStats] = {}
+        # Incremented by every invalidation, so that a load started before it is not cached
+        self._generations: Dict[str, int] = {}
+        self.evictions = 0
+
+    async def get_or_load(
+        self, entity: str, object_id: Optional[str], variant: Hashable, load: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Return the cached value of `(entity, object_id, variant)`, or await `load()` and cache its result.
+
+        Use `object_id=None` for lists. Exceptions raised by `load` are not cached.
+        """
+        stats = self._stats.setdefault(entity, _EntityStats())
+        ttl = self.ttl_seconds.get(entity, 0)
+        key = (entity, object_id, variant)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                stats.hits += 1
+                self._entries.move_to_end(key)
+                return entry[1]
+            self._remove(key)
+
+        stats.misses += 1
+        generation = self._generations.get(entity, 0)
+        value = await load()
+        if ttl > 0 and value is not None and self.max_entries > 0 and generation == self._generations.get(entity, 0):
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            self._keys.setdefault((entity, object_id), set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return value
+
+    def invalidate(self, entity: str, object_id: Optional[str] = None):
+        """Drop every cached list of `entity`, and the cached variants of `object_id` if given"""
+        self._stats.setdefault(entity, _EntityStats()).invalidations += 1
+        self._generations[entity] = self._generations.get(entity, 0) + 1
+        for group in {(entity, None), (entity, object_id)}:
+            for key in list(self._keys.get(group, ())):
+                self._remove(key)
+
+    def clear(self, entity: Optional[str] = None):
+        """Drop every cached entry of `entity`, or the whole cache.
+
+        Used by mutations that change many objects at once, e.g. transferring all the assets of a user.
+        """
+        if entity is None:
+            self._entries.clear()
+            self._keys.clear()
+            for name in self._stats:
+                self._generations[name] = self._generations.get(name, 0) + 1
+            return
+        self._stats.setdefault(entity, _EntityStats()).invalidations += 1
+        self._generations[entity] = self._generations.get(entity, 0) + 1
+        for group in [group for group in self._keys if group[0] == entity]:
+            for key in list(self._keys[group]):
+                self._remove(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the size of the cache and the hit and miss counters of each entity"""
+        entities = {}
+        for entity, stats in self._stats.items():
+            lookups = stats.hits + stats.misses
+            entities[entity] = {
+                "ttl_seconds": self.ttl_seconds.get(entity, 0),
+                "hits": stats.hits,
+                "misses": stats.misses,
+                "hit_rate": round(stats.hits / lookups, 3) if lookups else None,
+                "invalidations": stats.invalidations,
+            }
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "entities": entities,
+        }
+
+    def _remove(self, key: CacheKey):
+        self._entries.pop(key, None)
+        group = key[:2]
+        keys = self._keys.get(group)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys[group]
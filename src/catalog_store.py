@@ -0,0 +1,318 @@
+import asyncio
+import datetime
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from src.server_client.private_files import FILE_MODE, private_directory
+from src.server_client.rate_limit import set_background_priority
+
+logger = logging.getLogger(__name__)
+
+# entity -> (JSON key indexed as name, JSON key indexed as owner, list filter used by the incremental sync)
+ENTITIES = {
+    "workflows": ("name", "ownerId", "created_after"),
+    "users": ("email", None, "created_after"),
+    "collections": ("name", "ownerId", None),
+    "schedules": ("name", "ownerId", None),
+    "credentials": ("userName", None, None),
+}
+
+# List filters the store can answer, and the indexed column they match exactly
+FILTER_COLUMNS = {"name": "name", "email": "name", "owner_id": "owner_id"}
+
+# Objects created this many seconds before the previous sync started are fetched again, for clock skew
+INCREMENTAL_SYNC_OVERLAP_SECONDS = 300
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    entity TEXT NOT NULL,
+    id TEXT NOT NULL,
+    name TEXT,
+    owner_id TEXT,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (entity, id)
+);
+CREATE INDEX IF NOT EXISTS objects_owner ON objects (entity, owner_id);
+CREATE INDEX IF NOT EXISTS objects_name ON objects (entity, name);
+CREATE TABLE IF NOT EXISTS sync_state (
+    entity TEXT PRIMARY KEY,
+    full_synced_at REAL NOT NULL,
+    synced_at REAL NOT NULL,
+    synced_since TEXT NOT NULL
+);
+"""
+
+# A list fetch: called without arguments for a full sync, with the incremental filter otherwise
+Fetch = Callable[..., Awaitable[Any]]
+
+
+class CatalogStore:
+    """Optional on-disk mirror of the catalog lists (workflows, users, collections, schedules, credentials).
+
+    The lists are kept in a SQLite database in WAL mode, indexed by id, owner and name, so that
+    they survive restarts and list queries are answered locally:
+
+    - The first read of an entity downloads the full list.
+    - Entities with a `created_after` filter are synced incrementally before a read, at most every
+      `incremental_sync_seconds`, by fetching only the objects created since the previous sync.
+    - Every `full_sync_seconds` the full list is downloaded again in the background to pick up
+      changed and deleted objects, while reads keep being served from the store.
+    - `upsert` and `remove` apply the mutation of one object to its row, `invalidate` forces a full
+      sync before the next read, for the mutations of many objects.
+
+    The database holds the listings of every user, its directory and files are only readable by
+    the current user.
+
+    :param path: path of the SQLite database file, in a directory of its own.
+    :param json_codec: codec used to store the objects.
+    """
+
+    def __init__(self, path: str, json_codec, full_sync_seconds: float = 3600, incremental_sync_seconds: float = 60):
+        self.path = path
+        self.json_codec = json_codec
+        self.full_sync_seconds = full_sync_seconds
+        self.incremental_sync_seconds = incremental_sync_seconds
+
+        private_directory(os.path.dirname(os.path.abspath(path)))
+        # SQLite creates the -wal and -shm files with the mode of the database file
+        os.close(os.open(path, os.O_RDWR | os.O_CREAT, FILE_MODE))
+        for file_path in (path, path + "-wal", path + "-shm"):
+            if os.path.exists(file_path):
+                os.chmod(file_path, FILE_MODE)
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+        # Entities changed by a mutation since their last full sync
+        self._stale = set()
+        self._sync_tasks: Dict[str, asyncio.Task] = {}
+
+        # counters
+        self.reads = 0
+        self.full_syncs = 0
+        self.incremental_syncs = 0
+        self.sync_errors = 0
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def can_serve(self, entity: str, filters: Dict[str, Any]) -> bool:
+        """True if the list of `entity` filtered by `filters` can be read from the store"""
+        if entity not in ENTITIES:
+            return False
+        name_key, owner_key, _ = ENTITIES[entity]
+        columns = {"name": name_key, "owner_id": owner_key}
+        return all(key in FILTER_COLUMNS and columns[FILTER_COLUMNS[key]] for key in filters)
+
+    def invalidate(self, entity: str):
+        """Force a full sync of `entity` before its next read"""
+        if entity in ENTITIES:
+            self._stale.add(entity)
+
+    async def upsert(self, entity: str, item: Dict[str, Any]):
+        """Store an object created or changed by a mutation, as returned by the server"""
+        if entity in ENTITIES and isinstance(item, dict) and "id" in item:
+            await asyncio.to_thread(self._upsert, entity, item)
+            self._after_mutation(entity)
+
+    async def remove(self, entity: str, object_id: str):
+        """Delete the row of an object deleted by a mutation"""
+        if entity in ENTITIES:
+            await asyncio.to_thread(self._remove, entity, object_id)
+            self._after_mutation(entity)
+
+    def _after_mutation(self, entity: str):
+        running = self._sync_tasks.get(entity)
+        if running is not None and not running.done():
+            # The list being downloaded may predate the mutation, sync again before the next read
+            self._stale.add(entity)
+
+    async def list(self, entity: str, fetch: Fetch, filters: Optional[Dict[str, Any]] = None) -> List[Any]:
+        """Return the list of `entity` matching `filters` exactly, syncing it with `fetch` first if needed.
+
+        :param fetch: coroutine function returning the decoded JSON list from the server.
+        :param filters: list filters accepted by `can_serve`.
+        """
+        state = await asyncio.to_thread(self._state, entity)
+        while state is None or entity in self._stale:
+            await asyncio.shield(self._sync_task(entity, fetch, full=True))
+            state = await asyncio.to_thread(self._state, entity)
+
+        now = time.time()
+        running = self._sync_tasks.get(entity)
+        if running is not None and not running.done():
+            # A sync started by another read, serve the current rows meanwhile
+            pass
+        elif now - state["full_synced_at"] >= self.full_sync_seconds:
+            # Keep serving the current rows while the full list downloads
+            self._sync_task(entity, fetch, full=True, background=True).add_done_callback(self._log_sync_error)
+        elif ENTITIES[entity][2] and now - state["synced_at"] >= self.incremental_sync_seconds:
+            await asyncio.shield(self._sync_task(entity, fetch, full=False))
+
+        self.reads += 1
+        return await asyncio.to_thread(self._select, entity, filters or {})
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of stored objects and the sync state of each entity"""
+        with self._lock:
+            counts = dict(self._connection.execute("SELECT entity, COUNT(*) FROM objects GROUP BY entity"))
+            states = self._connection.execute("SELECT entity, full_synced_at, synced_at FROM sync_state").fetchall()
+        now = time.time()
+        return {
+            "path": self.path,
+            "reads": self.reads,
+            "full_syncs": self.full_syncs,
+            "incremental_syncs": self.incremental_syncs,
+            "sync_errors": self.sync_errors,
+            "entities": {
+                entity: {
+                    "objects": counts.get(entity, 0),
+                    "seconds_since_full_sync": round(now - full_synced_at, 1),
+                    "seconds_since_sync": round(now - synced_at, 1),
+                }
+                for entity, full_synced_at, synced_at in states
+            },
+        }
+
+    def _sync_task(self, entity: str, fetch: Fetch, full: bool, background: bool = False) -> asyncio.Task:
+        """Return the running sync of `entity`, or start one, so that concurrent reads share it.
+
+        The requests of a `background` sync, which no read waits for, give way to the interactive requests.
+        """
+        task = self._sync_tasks.get(entity)
+        if task is None or task.done():
+            task = asyncio.get_running_loop().create_task(self._sync(entity, fetch, full, background))
+            self._sync_tasks[entity] = task
+        return task
+
+    def _log_sync_error(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background sync of the catalog failed: {task.exception()}")
+
+    async def _sync(self, entity: str, fetch: Fetch, full: bool, background: bool = False):
+        if background:
+            set_background_priority()
+        started_at = time.time()
+        since = datetime.datetime.fromtimestamp(
+            started_at - INCREMENTAL_SYNC_OVERLAP_SECONDS, datetime.timezone.utc
+        ).strftime("%Y-%m-%dT%H:%M:%SZ")
+        if full:
+            # Mutations made while the list downloads mark the entity stale again
+            self._stale.discard(entity)
+        try:
+            if full:
+                items = await fetch()
+            else:
+                state = await asyncio.to_thread(self._state, entity)
+                items = await fetch(**{ENTITIES[entity][2]: state["synced_since"]})
+            await asyncio.to_thread(self._write, entity, items or [], full, started_at, since)
+        except Exception:
+            self.sync_errors += 1
+            if full:
+                self._stale.add(entity)
+            raise
+        if full:
+            self.full_syncs += 1
+        else:
+            self.incremental_syncs += 1
+
+    def _state(self, entity: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT full_synced_at, synced_at, synced_since FROM sync_state WHERE entity = ?", (entity,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"full_synced_at": row[0], "synced_at": row[1], "synced_since": row[2]}
+
+    def _write(self, entity: str, items: List[Dict[str, Any]], full: bool, synced_at: float, since: str):
+        name_key, owner_key, _ = ENTITIES[entity]
+        dumps = self.json_codec.dumps
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN")
+            try:
+                if full:
+                    connection.execute("DELETE FROM objects WHERE entity = ?", (entity,))
+                    position = 0
+                else:
+                    position = connection.execute(
+                        "SELECT COALESCE(MAX(position), -1) + 1 FROM objects WHERE entity = ?", (entity,)
+                    ).fetchone()[0]
+                rows = []
+                for item in items:
+                    if not isinstance(item, dict) or "id" not in item:
+                        continue
+                    owner_id = item.get(owner_key) if owner_key else None
+                    rows.append((entity, item["id"], item.get(name_key), owner_id, position, dumps(item)))
+                    position += 1
+                # Objects seen again by an incremental sync keep their position
+                connection.executemany(
+                    "INSERT INTO objects (entity, id, name, owner_id, position, data) VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (entity, id) DO UPDATE SET name = excluded.name, owner_id = excluded.owner_id, "
+                    "data = excluded.data",
+                    rows,
+                )
+                if full:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO sync_state (entity, full_synced_at, synced_at, synced_since) "
+                        "VALUES (?, ?, ?, ?)",
+                        (entity, synced_at, synced_at, since),
+                    )
+                else:
+                    connection.execute(
+                        "UPDATE sync_state SET synced_at = ?, synced_since = ? WHERE entity = ?",
+                        (synced_at, since, entity),
+                    )
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+
+    def _remove(self, entity: str, object_id: str):
+        with self._lock:
+            self._connection.execute("DELETE FROM objects WHERE entity = ? AND id = ?", (entity, object_id))
+
+    def _upsert(self, entity: str, item: Dict[str, Any]):
+        name_key, owner_key, _ = ENTITIES[entity]
+        with self._lock:
+            connection = self._connection
+            row = connection.execute(
+                "SELECT data FROM objects WHERE entity = ? AND id = ?", (entity, item["id"])
+            ).fetchone()
+            if row is not None:
+                # Keep the shape of the list items, the mutations return the detailed view of the object
+                data = self.json_codec.loads(row[0])
+                data.update((key, value) for key, value in item.items() if key in data)
+                connection.execute(
+                    "UPDATE objects SET name = ?, owner_id = ?, data = ? WHERE entity = ? AND id = ?",
+                    (data.get(name_key), data.get(owner_key) if owner_key else None, self.json_codec.dumps(data),
+                     entity, item["id"]),
+                )
+            else:
+                connection.execute(
+                    "INSERT INTO objects (entity, id, name, owner_id, position, data) SELECT ?, ?, ?, ?, "
+                    "COALESCE(MAX(position), -1) + 1, ? FROM objects WHERE entity = ?",
+                    (entity, item["id"], item.get(name_key), item.get(owner_key) if owner_key else None,
+                     self.json_codec.dumps(item), entity),
+                )
+
+    def _select(self, entity: str, filters: Dict[str, Any]) -> List[Any]:
+        query = "SELECT data FROM objects WHERE entity = ?"
+        params = [entity]
+        for key, value in filters.items():
+            query += f" AND {FILTER_COLUMNS[key]} = ?"
+            params.append(value)
+        query += " ORDER BY position"
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+        loads = self.json_codec.loads
+        return [loads(row[0]) for row in rows]
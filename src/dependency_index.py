@@ -0,0 +1,269 @@
+import asyncio
+import io
+import logging
+import multiprocessing
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from src.server_client.rate_limit import set_background_priority
+from src.workflow_graph import MACRO_EXTENSION
+from src.workflow_package import WORKFLOW_EXTENSIONS, WorkflowPackageError
+from src.workflow_xml import DependencyTarget, parse_dependencies
+
+logger = logging.getLogger(__name__)
+
+# Kinds of dependencies indexed
+KINDS = ("connections", "credentials", "files")
+
+
+def read_dependencies(package_bytes: bytes) -> Dict[str, List[str]]:
+    """Return the data connections, credentials and file paths used by the workflow and the macros of a package"""
+    target = DependencyTarget()
+    try:
+        with zipfile.ZipFile(io.BytesIO(package_bytes)) as package:
+            for member in package.infolist():
+                if member.filename.lower().endswith(WORKFLOW_EXTENSIONS + (MACRO_EXTENSION,)):
+                    with package.open(member) as stream:
+                        parse_dependencies(stream, target)
+    except zipfile.BadZipFile as e:
+        raise WorkflowPackageError(f"Invalid workflow package file: {e}")
+    return {kind: sorted(getattr(target, kind)) for kind in KINDS}
+
+
+def _parse_package(package_bytes: bytes) -> Tuple[Tuple[str, ...], ...]:
+    """Run `read_dependencies` in a worker process, returning the lists in `KINDS` order to keep the result small"""
+    dependencies = read_dependencies(package_bytes)
+    return tuple(tuple(dependencies[kind]) for kind in KINDS)
+
+
+def _key(kind: str, value: str) -> str:
+    """Connections and credentials match exactly, file paths ignore case and the kind of slashes"""
+    return value.replace("\\", "/").lower() if kind == "files" else value
+
+
+class DependencyIndex:
+    """Inverted index of the data connections, credentials and file paths used by the published workflows.
+
+    The index is built by a pipeline over the published version of every workflow:
+
+    - download stage: `concurrency` coroutines download the packages.
+    - parse stage: the packages are parsed by `parse_workers` processes, so that parsing scales
+      with the cores instead of being serialized by the GIL, while the next packages download.
+      With `parse_workers=0` they are parsed in threads.
+    - index stage: the results are merged into the index on the event loop.
+
+    The stages are linked by a bounded queue, so at most a few packages are held in memory. The
+    index is refreshed incrementally: only the workflows whose published version changed since
+    they were indexed go through the pipeline again, and deleted workflows are dropped. The first
+    query waits for the index to be built, later queries are answered from the current index while
+    a refresh runs in the background every `refresh_seconds`.
+    """
+
+    def __init__(self, concurrency: int = 4, refresh_seconds: float = 300, parse_workers: int = 0):
+        self.concurrency = max(1, concurrency)
+        self.refresh_seconds = refresh_seconds
+        self.parse_workers = parse_workers
+        # Started on the first refresh
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # workflow id -> {"name", "version", "dependencies"}
+        self._workflows: Dict[str, Dict[str, Any]] = {}
+        # kind -> key -> workflow ids
+        self._index: Dict[str, Dict[str, Set[str]]] = {kind: {} for kind in KINDS}
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.refreshed_at: Optional[float] = None
+
+        # counters
+        self.refreshes = 0
+        self.workflows_parsed = 0
+        self.workflows_unchanged = 0
+        self.errors = 0
+        self.bytes_parsed = 0
+        self.download_seconds = 0.0
+        self.parse_seconds = 0.0
+        self.last_refresh_seconds: Optional[float] = None
+        self.last_refresh_workflows = 0
+
+    def close(self):
+        """Stop the running refresh and the parse workers"""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def query(
+        self,
+        kind: str,
+        value: str,
+        list_workflows: Callable[[], Awaitable[List[Dict[str, Any]]]],
+        download: Callable[[str], Awaitable[Optional[bytes]]],
+        prefix: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Return the workflows using the dependency `value` of `kind`, refreshing the index first if needed.
+
+        :param list_workflows: coroutine function returning the decoded JSON list of the workflows.
+        :param download: coroutine function returning the package of the published version of a workflow by id.
+        :param prefix: match every dependency starting with `value`, e.g. every file under a share path.
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown dependency kind {kind}, expected one of {', '.join(KINDS)}")
+        if self.refreshed_at is None:
+            await asyncio.shield(self._start_refresh(list_workflows, download))
+        elif time.time() - self.refreshed_at >= self.refresh_seconds:
+            self._start_refresh(list_workflows, download)
+
+        key = _key(kind, value)
+        keys = {k for k in self._index[kind] if k.startswith(key)} if prefix else {key}
+        workflow_ids = set()
+        for k in keys:
+            workflow_ids |= self._index[kind].get(k, set())
+        result = []
+        for workflow_id in workflow_ids:
+            indexed = self._workflows[workflow_id]
+            matches = [item for item in indexed["dependencies"][kind] if _key(kind, item) in keys]
+            result.append({"id": workflow_id, "name": indexed["name"], kind: matches})
+        return sorted(result, key=lambda item: item["name"] or "")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the size of the index, its refresh counters and the time spent in each pipeline stage"""
+        return {
+            "workflows": len(self._workflows),
+            "dependencies": {kind: len(self._index[kind]) for kind in KINDS},
+            "seconds_since_refresh": round(time.time() - self.refreshed_at, 1) if self.refreshed_at else None,
+            "refreshing": self._refresh_task is not None and not self._refresh_task.done(),
+            "refreshes": self.refreshes,
+            "workflows_parsed": self.workflows_parsed,
+            "workflows_unchanged": self.workflows_unchanged,
+            "errors": self.errors,
+            "parse_workers": self.parse_workers,
+            "bytes_parsed": self.bytes_parsed,
+            "download_seconds": round(self.download_seconds, 3),
+            "parse_seconds": round(self.parse_seconds, 3),
+            "last_refresh_seconds": self.last_refresh_seconds,
+            "last_refresh_workflows_per_second": (
+                round(self.last_refresh_workflows / self.last_refresh_seconds, 1)
+                if self.last_refresh_workflows and self.last_refresh_seconds else None
+            ),
+        }
+
+    def _start_refresh(self, list_workflows, download) -> asyncio.Task:
+        """Return the running refresh, or start one, so that concurrent queries share it"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.get_running_loop().create_task(self._refresh(list_workflows, download))
+            self._refresh_task.add_done_callback(self._log_refresh_error)
+        return self._refresh_task
+
+    def _log_refresh_error(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Refresh of the dependency index failed: {task.exception()}")
+
+    async def _refresh(self, list_workflows, download):
+        # Bulk work, the requests of the refresh give way to the interactive ones
+        set_background_priority()
+        started_at = time.time()
+        items = await list_workflows() or []
+        workflows = {item["id"]: item for item in items if isinstance(item, dict) and "id" in item}
+        for workflow_id in set(self._workflows) - set(workflows):
+            self._remove(workflow_id)
+
+        changed = []
+        for workflow_id, item in workflows.items():
+            indexed = self._workflows.get(workflow_id)
+            if indexed is not None and indexed["version"] == item.get("publishedVersionNumber"):
+                indexed["name"] = item.get("name")
+                self.workflows_unchanged += 1
+            else:
+                changed.append(item)
+
+        parsers = max(1, self.parse_workers)
+        if self.parse_workers > 0 and self._executor is None:
+            # Forking this multi-threaded process (event loop, worker threads, SQLite connections) can deadlock
+            self._executor = ProcessPoolExecutor(self.parse_workers, mp_context=multiprocessing.get_context("spawn"))
+        loop = asyncio.get_running_loop()
+        # Downloaded packages waiting for a parser, bounded to keep the memory in check
+        packages: asyncio.Queue = asyncio.Queue(maxsize=parsers * 2)
+        pending = iter(changed)
+        parsed = 0
+
+        async def download_stage():
+            for item in pending:
+                start = time.perf_counter()
+                try:
+                    package = await download(item["id"])
+                except Exception as e:
+                    self.errors += 1
+                    logger.warning(f"Could not download the package of workflow {item['id']}: {e}")
+                    continue
+                finally:
+                    self.download_seconds += time.perf_counter() - start
+                if package is not None:
+                    await packages.put((item, package))
+
+        async def parse(item, package):
+            if self._executor is not None:
+                try:
+                    return await loop.run_in_executor(self._executor, _parse_package, package)
+                except BrokenProcessPool as e:
+                    # A worker died, parse this package and the rest of this refresh in threads,
+                    # and start new workers next time
+                    logger.warning(f"Parse workers stopped while parsing workflow {item['id']}: {e}")
+                    if self._executor is not None:
+                        self._executor.shutdown(wait=False, cancel_futures=True)
+                        self._executor = None
+            return await asyncio.to_thread(_parse_package, package)
+
+        async def parse_stage():
+            nonlocal parsed
+            while True:
+                item, package = await packages.get()
+                start = time.perf_counter()
+                try:
+                    result = await parse(item, package)
+                except Exception as e:
+                    self.errors += 1
+                    logger.warning(f"Could not parse the package of workflow {item['id']}: {e}")
+                else:
+                    # Index stage, on the event loop so that queries never see a half updated index
+                    self._remove(item["id"])
+                    dependencies = {kind: list(values) for kind, values in zip(KINDS, result)}
+                    self._add(item["id"], item.get("name"), item.get("publishedVersionNumber"), dependencies)
+                    self.workflows_parsed += 1
+                    self.bytes_parsed += len(package)
+                    parsed += 1
+                finally:
+                    self.parse_seconds += time.perf_counter() - start
+                    packages.task_done()
+
+        parse_tasks = [loop.create_task(parse_stage()) for _ in range(parsers)]
+        try:
+            await asyncio.gather(*(download_stage() for _ in range(self.concurrency)))
+            await packages.join()
+        finally:
+            for task in parse_tasks:
+                task.cancel()
+        self.refreshes += 1
+        self.refreshed_at = started_at
+        self.last_refresh_seconds = round(time.time() - started_at, 3)
+        self.last_refresh_workflows = parsed
+
+    def _add(self, workflow_id: str, name: Optional[str], version: Any, dependencies: Dict[str, List[str]]):
+        self._workflows[workflow_id] = {"name": name, "version": version, "dependencies": dependencies}
+        for kind in KINDS:
+            for value in dependencies.get(kind, ()):
+                self._index[kind].setdefault(_key(kind, value), set()).add(workflow_id)
+
+    def _remove(self, workflow_id: str):
+        indexed = self._workflows.pop(workflow_id, None)
+        if indexed is None:
+            return
+        for kind in KINDS:
+            for value in indexed["dependencies"].get(kind, ()):
+                key = _key(kind, value)
+                workflow_ids = self._index[kind].get(key)
+                if workflow_ids is not None:
+                    workflow_ids.discard(workflow_id)
+                    if not workflow_ids:
+                        del self._index[kind][key]
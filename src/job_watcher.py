@@ -0,0 +1,206 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Job states after which a job is not polled anymore
+FINAL_JOB_STATUSES = ("Completed", "Cancelled")
+# First delay between two polls of a running job, and the factor it grows by after each poll
+INITIAL_POLL_INTERVAL_SECONDS = 1.0
+POLL_BACKOFF_FACTOR = 1.5
+# Failed polls in a row after which the waiting callers get the error, the previous ones are retried
+MAX_CONSECUTIVE_POLL_ERRORS = 3
+
+
+class _WatchedJob:
+    """State shared by every caller waiting on the same job"""
+
+    def __init__(self, job_id: str, max_interval: float, now: float):
+        self.job_id = job_id
+        self.status = None
+        self.details = None
+        self.error = None
+        self.done = False
+        self.consecutive_errors = 0
+        self.polling = False
+        self.subscribers = 0
+        # Incremented on every poll so that waiters can tell a new update from the one they saw
+        self.version = 0
+        self.updated = asyncio.Condition()
+        self.max_interval = max_interval
+        self.interval = min(INITIAL_POLL_INTERVAL_SECONDS, max_interval)
+        self.next_poll_at = now
+
+
+class JobWatcher:
+    """Background service that polls the status of running jobs for all callers at once.
+
+    Callers waiting on the same job share a single subscription, every job is polled on one
+    shared schedule with an adaptive backoff, and the total number of status requests is
+    capped by a global budget of `max_requests_per_second`. Each poll result is fanned out to
+    every waiting caller, so the load on the server grows with the number of distinct running
+    jobs and not with the number of callers. A failed poll is retried on the schedule, the
+    callers only get the error after `MAX_CONSECUTIVE_POLL_ERRORS` failures in a row.
+    """
+
+    def __init__(self, jobs_api, max_requests_per_second: float = 1.0):
+        if max_requests_per_second <= 0:
+            raise ValueError(
+                f"The job poll request budget must be positive, got {max_requests_per_second} "
+                "(ALTERYX_JOB_POLL_REQUESTS_PER_SECOND)"
+            )
+        self.jobs_api = jobs_api
+        self.max_requests_per_second = max_requests_per_second
+        self._jobs: Dict[str, _WatchedJob] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tokens = max(1.0, max_requests_per_second)
+        self._tokens_updated_at = time.monotonic()
+        self._poll_tasks = set()
+        self.requests_sent = 0
+
+    async def wait_for_job(
+        self,
+        job_id: str,
+        timeout_seconds: float,
+        max_poll_interval_seconds: float = 10.0,
+        progress_callback: Optional[Callable[[float, float, str], Awaitable[None]]] = None,
+    ):
+        """Wait until a job reaches a final state and return its details, messages included.
+        Returns None if the job is still running after timeout_seconds.
+        progress_callback(elapsed, total, message) is awaited after every status update."""
+        job = self._subscribe(job_id, max_poll_interval_seconds)
+        start_time = time.monotonic()
+        seen_version = 0
+        try:
+            while True:
+                remaining = timeout_seconds - (time.monotonic() - start_time)
+                if remaining <= 0:
+                    return None
+                try:
+                    async with job.updated:
+                        await asyncio.wait_for(job.updated.wait_for(lambda: job.version != seen_version), remaining)
+                except asyncio.TimeoutError:
+                    return None
+                seen_version = job.version
+
+                if job.error is not None:
+                    raise job.error
+                if job.done:
+                    return job.details
+                if progress_callback is not None:
+                    elapsed = time.monotonic() - start_time
+                    await progress_callback(elapsed, timeout_seconds, f"Job {job_id} is {job.status}")
+        finally:
+            self._unsubscribe(job)
+
+    def stats(self):
+        """Number of jobs currently watched, callers waiting on them and status requests sent so far"""
+        return {
+            "watched_jobs": len(self._jobs),
+            "waiting_callers": sum(job.subscribers for job in self._jobs.values()),
+            "requests_sent": self.requests_sent,
+        }
+
+    def _subscribe(self, job_id: str, max_poll_interval_seconds: float) -> _WatchedJob:
+        job = self._jobs.get(job_id)
+        if job is None:
+            job = _WatchedJob(job_id, max_poll_interval_seconds, time.monotonic())
+            self._jobs[job_id] = job
+        else:
+            # The most impatient caller decides how often a shared job is polled
+            job.max_interval = min(job.max_interval, max_poll_interval_seconds)
+            job.interval = min(job.interval, job.max_interval)
+        job.subscribers += 1
+
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        self._wakeup.set()
+        return job
+
+    def _unsubscribe(self, job: _WatchedJob):
+        job.subscribers -= 1
+        if job.subscribers <= 0 and self._jobs.get(job.job_id) is job:
+            del self._jobs[job.job_id]
+            # Let the poll loop stop if this was the last watched job
+            self._wakeup.set()
+
+    def _take_tokens(self, wanted: int) -> int:
+        """Take up to `wanted` requests from the global budget and return how many were granted"""
+        now = time.monotonic()
+        capacity = max(1.0, self.max_requests_per_second)
+        self._tokens = min(capacity, self._tokens + (now - self._tokens_updated_at) * self.max_requests_per_second)
+        self._tokens_updated_at = now
+        granted = min(wanted, int(self._tokens))
+        self._tokens -= granted
+        return granted
+
+    async def _run(self):
+        """Poll every due job within the request budget until no job is left to watch"""
+        while self._jobs:
+            self._wakeup.clear()
+            now = time.monotonic()
+            due = sorted(
+                (job for job in self._jobs.values() if not job.polling and not job.done and job.next_poll_at <= now),
+                key=lambda job: job.next_poll_at,
+            )
+            for job in due[: self._take_tokens(len(due))]:
+                job.polling = True
+                task = asyncio.get_running_loop().create_task(self._poll(job))
+                self._poll_tasks.add(task)
+                task.add_done_callback(self._poll_tasks.discard)
+
+            # Sleep until the next job is due or a token is available, or until a new caller subscribes
+            pending = [job.next_poll_at for job in self._jobs.values() if not job.polling and not job.done]
+            delay = max(min(pending) - now, 0.0) if pending else None
+            if len(due) > 0 and self._tokens < 1:
+                token_delay = (1 - self._tokens) / self.max_requests_per_second
+                delay = token_delay if delay is None else max(delay, token_delay)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll(self, job: _WatchedJob):
+        failed = False
+        try:
+            self.requests_sent += 1
+            # The poll that sees the final status returns the details with the messages, no extra request
+            details = await self.jobs_api.jobs_get_job_v3(job.job_id, include_messages=True)
+            job.consecutive_errors = 0
+            job.status = details.status
+            job.details = details
+            job.done = details.status in FINAL_JOB_STATUSES
+        except Exception as e:
+            job.consecutive_errors += 1
+            logger.warning(
+                f"Error polling job {job.job_id} ({job.consecutive_errors}/{MAX_CONSECUTIVE_POLL_ERRORS}): {e}"
+            )
+            if job.consecutive_errors >= MAX_CONSECUTIVE_POLL_ERRORS:
+                job.error = e
+                job.done = True
+            else:
+                failed = True
+        finally:
+            job.polling = False
+            job.next_poll_at = time.monotonic() + job.interval
+            job.interval = min(job.interval * POLL_BACKOFF_FACTOR, job.max_interval)
+
+        if failed:
+            # Retried on the next scheduled poll, the callers have nothing new to see
+            if self._wakeup is not None:
+                self._wakeup.set()
+            return
+
+        if job.done and self._jobs.get(job.job_id) is job:
+            # Callers arriving from now on start a fresh subscription
+            del self._jobs[job.job_id]
+
+        async with job.updated:
+            job.version += 1
+            job.updated.notify_all()
+        if self._wakeup is not None:
+            self._wakeup.set()
@@ -1,9 +1,23 @@
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 from dotenv import load_dotenv
+from src.output import to_tool_result
 from src.tools import AYXMCPTools, InputData
 from typing import List, Optional, Dict, Any
 
 
+class AlteryxFastMCP(FastMCP):
+    """FastMCP app returning tool results as compact structured content"""
+
+    def __init__(self, json_codec, **kwargs):
+        self.json_codec = json_codec
+        super().__init__(**kwargs)
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]):
+        """Call a tool by name and convert its result with `to_tool_result`"""
+        result = await self._tool_manager.call_tool(name, arguments, context=self.get_context())
+        return to_tool_result(result, self.json_codec)
+
+
 class MCPAlteryxServer:
     def __init__(self):
         """Initialize the MCP Alteryx Server"""
@@ -26,7 +40,8 @@ class MCPAlteryxServer:
         #     "port": 3001,
         # }
         # Initialize the FastMCP app
-        self.app = FastMCP(
+        self.app = AlteryxFastMCP(
+            self.tools.configuration.json_codec,
             name="mcp-alteryx-server",
             # settings=settings,
             prompt="""
@@ -37,7 +52,7 @@ This MCP server provides tools for querying the remote Alteryx server using the
 ## Available Tools
 
 ### Collections
-- get_all_collections: Get all collections
+- get_all_collections: Get all collections (optionally only some fields, a summary or one page)
 - get_collection_by_id: Get a specific collection
 - create_collection: Create a new collection
 - delete_collection: Delete a collection
@@ -48,18 +63,23 @@ This MCP server provides tools for querying the remote Alteryx server using the
 - remove_schedule_from_collection: Remove a schedule from a collection
 
 ### Workflows
-- get_all_workflows: Get all workflows
+- get_all_workflows: Search workflows with server-side filters (optionally only some fields, a summary or one page)
 - get_workflow_by_id: Get a specific workflow
 - update_workflow_name_or_comment: Update workflow details
 - transfer_workflow: Transfer workflow ownership
-- get_workflow_jobs: Get jobs for a workflow
+- get_workflow_jobs: Get jobs for a workflow, filtered, sorted and paginated by the server
 - execute_workflow: Execute a workflow
 - download_workflow_package_file: Download workflow package
 - get_workflow_xml: Get workflow XML
 - get_workflow_tool_list: Get the list of tools in a workflow
+- get_workflow_graph: Get the tools, connections, containers and macros of a workflow
+- get_workflow_data_flow: Get the sources, sinks and topological order of the tools of a workflow
+- get_workflow_upstream_tools: Get the tools feeding a tool of a workflow
+- get_workflow_downstream_tools: Get the tools fed by a tool of a workflow
+- find_workflows_by_dependency: Find the workflows using a data connection, a credential or a file path
 
 ### Users
-- get_all_users: Get all users
+- get_all_users: Search users with server-side filters (optionally only some fields, a summary or one page)
 - get_user_by_id: Get a specific user
 - get_user_by_email: Get user by email
 - get_user_by_name: Get user by name
@@ -77,7 +97,7 @@ This MCP server provides tools for querying the remote Alteryx server using the
 - get_job_output_data: Get the output data generated by a job
 
 ### Schedules
-- get_all_schedules: Get all schedules
+- get_all_schedules: Search schedules with server-side filters (optionally only some fields, a summary or one page)
 - get_schedule_by_id: Get a specific schedule
 - deactivate_schedule: Deactivate a schedule
 - activate_schedule: Activate a schedule
@@ -85,11 +105,15 @@ This MCP server provides tools for querying the remote Alteryx server using the
 - change_schedule_owner: Change schedule ownership
 
 ### Credentials and Connections
-- get_all_credentials: Get all credentials
+- get_all_credentials: Get all credentials (optionally only some fields, a summary or one page)
 - get_credential_by_id: Get a specific credential
 - lookup_connection: Lookup a connection
 - get_connection_by_id: Get a specific connection
 
+### Diagnostics
+- get_client_stats: Get the cache, index, job watcher, retry, rate limiter, request coalescing and HTTP cache counters of the client
+- get_circuit_breakers: Get the state of the circuit breaker of each server endpoint
+
 ## Guidelines for Use
 
 - Always check if a query would is about a workflow, a collection, a user, a job, a connection or a credential
@@ -119,238 +143,414 @@ If the API key is missing or invalid, appropriate error messages will be returne
 
         # Register Collections tools
         @self.app.tool()
-        def get_all_collections():
-            """Get the list of all collections of the Alteryx server"""
-            return self.tools.get_all_collections()
+        async def get_all_collections(
+            fields: Optional[List[str]] = None,
+            summary: bool = False,
+            limit: Optional[int] = None,
+            cursor: Optional[str] = None,
+        ):
+            """Get the list of all collections of the Alteryx server.
+            Use `fields` to return only the given fields of each collection (e.g. ["id", "name"]),
+            or `summary` to return only the summary fields
+            (id, name, owner_id, date_added).
+            Use `limit` to get one page {"items": [...], "next_cursor": ...} and pass `next_cursor` as `cursor`
+            to get the next page."""
+            return await self.tools.get_all_collections(fields=fields, summary=summary, limit=limit, cursor=cursor)
 
         @self.app.tool()
-        def get_collection_by_id(collection_id: str):
+        async def get_collection_by_id(collection_id: str):
             """Get a collection by its ID"""
-            return self.tools.get_collection_by_id(collection_id)
+            return await self.tools.get_collection_by_id(collection_id)
 
         @self.app.tool()
-        def create_collection(name: str):
+        async def create_collection(name: str):
             """Create a new collection"""
-            return self.tools.create_collection(name)
+            return await self.tools.create_collection(name)
 
         @self.app.tool()
-        def delete_collection(collection_id: str):
+        async def delete_collection(collection_id: str):
             """Delete a collection by its ID"""
-            return self.tools.delete_collection(collection_id)
+            return await self.tools.delete_collection(collection_id)
 
         @self.app.tool()
-        def update_collection_name_or_owner(collection_id: str, name: str, owner_id: str):
+        async def update_collection_name_or_owner(collection_id: str, name: str, owner_id: str):
             """Update a collection name or owner by its ID"""
-            return self.tools.update_collection_name_or_owner(collection_id, name, owner_id)
+            return await self.tools.update_collection_name_or_owner(collection_id, name, owner_id)
 
         @self.app.tool()
-        def add_workflow_to_collection(collection_id: str, workflow_id: str):
+        async def add_workflow_to_collection(collection_id: str, workflow_id: str):
             """Add a workflow to a collection by its ID"""
-            return self.tools.add_workflow_to_collection(collection_id, workflow_id)
+            return await self.tools.add_workflow_to_collection(collection_id, workflow_id)
 
         @self.app.tool()
-        def remove_workflow_from_collection(collection_id: str, workflow_id: str):
+        async def remove_workflow_from_collection(collection_id: str, workflow_id: str):
             """Remove a workflow from a collection by its ID"""
-            return self.tools.remove_workflow_from_collection(collection_id, workflow_id)
+            return await self.tools.remove_workflow_from_collection(collection_id, workflow_id)
 
         @self.app.tool()
-        def add_schedule_to_collection(collection_id: str, schedule_id: str):
+        async def add_schedule_to_collection(collection_id: str, schedule_id: str):
             """Add a schedule to a collection by its ID"""
-            return self.tools.add_schedule_to_collection(collection_id, schedule_id)
+            return await self.tools.add_schedule_to_collection(collection_id, schedule_id)
 
         @self.app.tool()
-        def remove_schedule_from_collection(collection_id: str, schedule_id: str):
+        async def remove_schedule_from_collection(collection_id: str, schedule_id: str):
             """Remove a schedule from a collection by its ID"""
-            return self.tools.remove_schedule_from_collection(collection_id, schedule_id)
+            return await self.tools.remove_schedule_from_collection(collection_id, schedule_id)
 
         # Register Workflows tools
         @self.app.tool()
-        def get_all_workflows():
-            """Get the list of all workflows of the Alteryx server"""
-            return self.tools.get_all_workflows()
+        async def get_all_workflows(
+            name: Optional[str] = None,
+            owner_id: Optional[str] = None,
+            created_after: Optional[str] = None,
+            created_before: Optional[str] = None,
+            fields: Optional[List[str]] = None,
+            summary: bool = False,
+            limit: Optional[int] = None,
+            cursor: Optional[str] = None,
+        ):
+            """Get the list of all workflows of the Alteryx server.
+            Filter by `name`, `owner_id` or by the creation date of the published version
+            (`created_after`/`created_before`, ISO 8601 dates, inclusive) to let the server do the search.
+            Use `fields` to return only the given fields of each workflow (e.g. ["id", "name"]),
+            or `summary` to return only the summary fields
+            (id, name, owner_id, date_created, published_version_number).
+            Use `limit` to get one page {"items": [...], "next_cursor": ...} and pass `next_cursor` as `cursor`
+            to get the next page."""
+            return await self.tools.get_all_workflows(
+                name=name,
+                owner_id=owner_id,
+                created_after=created_after,
+                created_before=created_before,
+                fields=fields, summary=summary, limit=limit, cursor=cursor,
+            )
 
         @self.app.tool()
-        def get_workflow_by_id(workflow_id: str):
+        async def get_workflow_by_id(workflow_id: str):
             """Get a workflow by its ID"""
-            return self.tools.get_workflow_by_id(workflow_id)
+            return await self.tools.get_workflow_by_id(workflow_id)
 
         @self.app.tool()
-        def update_workflow_name_or_comment(workflow_id: str, name: str, comment: str):
+        async def update_workflow_name_or_comment(workflow_id: str, name: str, comment: str):
             """Update a workflow name or comment by its ID"""
-            return self.tools.update_workflow_name_or_comment(workflow_id, name, comment)
+            return await self.tools.update_workflow_name_or_comment(workflow_id, name, comment)
 
         @self.app.tool()
-        def download_workflow_package_file(workflow_id: str, output_directory: str):
+        async def download_workflow_package_file(workflow_id: str, output_directory: str):
             """Download a workflow package file by its ID and save it to the local directory"""
-            return self.tools.download_workflow_package_file(workflow_id, output_directory)
+            return await self.tools.download_workflow_package_file(workflow_id, output_directory)
 
         @self.app.tool()
-        def get_workflow_xml(workflow_id: str):
+        async def get_workflow_xml(workflow_id: str):
             """Get the XML representation of a workflow file by its ID"""
-            return self.tools.get_workflow_xml(workflow_id)
+            return await self.tools.get_workflow_xml(workflow_id)
         
         @self.app.tool()
-        def get_workflow_tool_list(workflow_id: str):
+        async def get_workflow_tool_list(workflow_id: str):
             """Get the list of tools in a workflow by the workflow ID"""
-            return self.tools.get_workflow_tool_list(workflow_id)
+            return await self.tools.get_workflow_tool_list(workflow_id)
+
+        @self.app.tool()
+        async def get_workflow_graph(workflow_id: str):
+            """Get the graph of a workflow by its ID: the tools (id, type, container, macro, annotation),
+            the connections between their anchors, the containers, the macros embedded in the package,
+            the sources, the sinks and the topological order of the tools"""
+            return await self.tools.get_workflow_graph(workflow_id)
+
+        @self.app.tool()
+        async def get_workflow_data_flow(workflow_id: str):
+            """Get the source tools and the sink tools of a workflow by its ID,
+            and the topological order in which its tools process the data"""
+            return await self.tools.get_workflow_data_flow(workflow_id)
+
+        @self.app.tool()
+        async def get_workflow_upstream_tools(workflow_id: str, tool_id: str, recursive: bool = False):
+            """Get the tools connected to the inputs of a tool of a workflow.
+            With `recursive`, get every tool the tool depends on, in topological order"""
+            return await self.tools.get_workflow_upstream_tools(workflow_id, tool_id, recursive)
+
+        @self.app.tool()
+        async def get_workflow_downstream_tools(workflow_id: str, tool_id: str, recursive: bool = False):
+            """Get the tools connected to the outputs of a tool of a workflow.
+            With `recursive`, get every tool depending on the tool, in topological order"""
+            return await self.tools.get_workflow_downstream_tools(workflow_id, tool_id, recursive)
 
         @self.app.tool()
-        def transfer_workflow(workflow_id: str, new_owner_id: str):
+        async def find_workflows_by_dependency(
+            connection_id: Optional[str] = None,
+            credential_id: Optional[str] = None,
+            file_path: Optional[str] = None,
+        ):
+            """Find the published workflows that use a data connection (`connection_id`, a DCM connection id
+            that lookup_connection resolves, or the name of a data connection), a credential (`credential_id`)
+            or a file path (`file_path`, which also matches every file under it, e.g. a share path).
+            Give exactly one of them. The workflows are indexed in the background, the first call waits
+            for the index to be built."""
+            return await self.tools.find_workflows_by_dependency(
+                connection_id=connection_id, credential_id=credential_id, file_path=file_path
+            )
+
+        @self.app.tool()
+        async def transfer_workflow(workflow_id: str, new_owner_id: str):
             """Transfer workflow ownership to a new user"""
-            return self.tools.transfer_workflow(workflow_id, new_owner_id)
+            return await self.tools.transfer_workflow(workflow_id, new_owner_id)
 
         @self.app.tool()
-        def get_workflow_jobs(workflow_id: str):
-            """Get all jobs associated with a workflow"""
-            return self.tools.get_workflow_jobs(workflow_id)
+        async def get_workflow_jobs(
+            workflow_id: str,
+            status: Optional[str] = None,
+            result_code: Optional[str] = None,
+            sort_field: Optional[str] = None,
+            direction: Optional[str] = None,
+            limit: Optional[int] = None,
+            cursor: Optional[str] = None,
+        ):
+            """Get all jobs associated with a workflow.
+            Filter by job `status` or `result_code`, and sort by `sort_field` in `direction` (asc or desc).
+            Use `limit` to get one page {"items": [...], "next_cursor": ...} and pass `next_cursor` as `cursor`
+            to get the next page."""
+            return await self.tools.get_workflow_jobs(
+                workflow_id,
+                status=status,
+                result_code=result_code,
+                sort_field=sort_field,
+                direction=direction,
+                limit=limit,
+                cursor=cursor,
+            )
 
         @self.app.tool()
-        def start_workflow_execution(workflow_id: str, input_data: list[InputData] = None):
+        async def start_workflow_execution(workflow_id: str, input_data: list[InputData] = None):
             """Start a workflow execution by its ID and return the job ID. 
             This will create a new job and add it to the execution queue.
             This call will return a job ID that can be used to get the job details later. 
             The input data is a list of name-value pairs, each containing a name and value."""
-            return self.tools.start_workflow_execution(workflow_id, input_data)
+            return await self.tools.start_workflow_execution(workflow_id, input_data)
         
         @self.app.tool()
-        def execute_workflow_with_monitoring(
+        async def execute_workflow_with_monitoring(
+                ctx: Context,
                 workflow_id: str, 
                 input_data: list[InputData] = None
         ):
             """Execute a workflow by its ID and monitor its execution status. This call will return a jobID, he Job status and the job details once the execution is completed or failed.
             The input data parameter is a list of name-value pairs, each containing a name and value. """
-            return self.tools.execute_workflow_with_monitoring(
+            return await self.tools.execute_workflow_with_monitoring(
                 workflow_id, 
                 input_data, 
                 wait_for_completion=True,
                 timeout_seconds=300,  # 5 minutes timeout
-                poll_interval_seconds=10
+                poll_interval_seconds=10,
+                progress_callback=ctx.report_progress,
             )
 
         # Register Users tools
         @self.app.tool()
-        def get_all_users():
-            """Get the list of all users of the Alteryx server"""
-            return self.tools.get_all_users()
+        async def get_all_users(
+            active: Optional[bool] = None,
+            email: Optional[str] = None,
+            role: Optional[str] = None,
+            first_name: Optional[str] = None,
+            last_name: Optional[str] = None,
+            created_after: Optional[str] = None,
+            created_before: Optional[str] = None,
+            fields: Optional[List[str]] = None,
+            summary: bool = False,
+            limit: Optional[int] = None,
+            cursor: Optional[str] = None,
+        ):
+            """Get the list of all users of the Alteryx server.
+            Filter by `active`, `email`, `role`, `first_name`, `last_name` or by the creation date
+            (`created_after`/`created_before`, ISO 8601 dates) to let the server do the search.
+            Use `fields` to return only the given fields of each user (e.g. ["id", "email"]),
+            or `summary` to return only the summary fields
+            (id, first_name, last_name, email, role, is_active).
+            Use `limit` to get one page {"items": [...], "next_cursor": ...} and pass `next_cursor` as `cursor`
+            to get the next page."""
+            return await self.tools.get_all_users(
+                active=active,
+                email=email,
+                role=role,
+                first_name=first_name,
+                last_name=last_name,
+                created_after=created_after,
+                created_before=created_before,
+                fields=fields, summary=summary, limit=limit, cursor=cursor,
+            )
 
         @self.app.tool()
-        def get_user_by_id(user_id: str):
+        async def get_user_by_id(user_id: str):
             """Get a user by their ID"""
-            return self.tools.get_user_by_id(user_id)
+            return await self.tools.get_user_by_id(user_id)
 
         @self.app.tool()
-        def get_user_by_email(email: str):
+        async def get_user_by_email(email: str):
             """Get a user by their email"""
-            return self.tools.get_user_by_email(email)
+            return await self.tools.get_user_by_email(email)
 
         @self.app.tool()
-        def get_user_by_name(name: str):
+        async def get_user_by_name(name: str):
             """Get a user by their last name"""
-            return self.tools.get_user_by_name(name)
+            return await self.tools.get_user_by_name(name)
 
         @self.app.tool()
-        def get_user_by_first_name(first_name: str):
+        async def get_user_by_first_name(first_name: str):
             """Get a user by their first name"""
-            return self.tools.get_user_by_first_name(first_name)
+            return await self.tools.get_user_by_first_name(first_name)
 
         @self.app.tool()
-        def get_all_user_assets(user_id: str):
+        async def get_all_user_assets(user_id: str):
             """Get all the assets for a user"""
-            return self.tools.get_all_user_assets(user_id)
+            return await self.tools.get_all_user_assets(user_id)
 
         @self.app.tool()
-        def get_user_assets_by_type(user_id: str, asset_type: str):
+        async def get_user_assets_by_type(user_id: str, asset_type: str):
             """Get user assets by type"""
-            return self.tools.get_user_assets_by_type(user_id, asset_type)
+            return await self.tools.get_user_assets_by_type(user_id, asset_type)
 
         @self.app.tool()
-        def update_user_details(user_id: str, first_name: str, last_name: str, email: str):
+        async def update_user_details(user_id: str, first_name: str, last_name: str, email: str):
             """Update details of an existing user by their ID"""
-            return self.tools.update_user_details(user_id, first_name, last_name, email)
+            return await self.tools.update_user_details(user_id, first_name, last_name, email)
 
         @self.app.tool()
-        def transfer_all_assets(user_id: str, new_owner_id: str):
+        async def transfer_all_assets(user_id: str, new_owner_id: str):
             """Transfer all assets from one user to another"""
-            return self.tools.transfer_all_assets(user_id, new_owner_id)
+            return await self.tools.transfer_all_assets(user_id, new_owner_id)
 
         @self.app.tool()
-        def deactivate_user(user_id: str):
+        async def deactivate_user(user_id: str):
             """Deactivate a user account"""
-            return self.tools.deactivate_user(user_id)
+            return await self.tools.deactivate_user(user_id)
 
         @self.app.tool()
-        def reset_user_password(user_id: str):
+        async def reset_user_password(user_id: str):
             """Reset a user's password by their ID"""
-            return self.tools.reset_user_password(user_id)
+            return await self.tools.reset_user_password(user_id)
 
         # Register Jobs tools
         @self.app.tool()
-        def get_all_job_messages(job_id: str):
+        async def get_all_job_messages(job_id: str):
             """Get all the messages for a job"""
-            return self.tools.get_all_job_messages(job_id)
+            return await self.tools.get_all_job_messages(job_id)
 
         @self.app.tool()
-        def get_job_by_id(job_id: str):
+        async def get_job_by_id(job_id: str):
             """Retrieve details about an existing job and its current state"""
-            return self.tools.get_job_by_id(job_id)
+            return await self.tools.get_job_by_id(job_id)
         
         @self.app.tool()
-        def get_job_output_data(job_id: str):
-            """Get the output data generated by a job. This will return a list of file paths to the output data. 
-            The output data is stored in the temp directory of the server."""
-            return self.tools.get_job_output_data(job_id)
+        async def get_job_output_data(
+            job_id: str,
+            formats: Optional[Dict[str, str]] = None,
+            preferred_formats: Optional[List[str]] = None,
+        ):
+            """Get the output data generated by a job. This will return a list of file paths to the output data,
+            with the size and download throughput of each file.
+            The output data is stored in the temp directory of the server.
+            Choose the format of each output with `formats` (output id -> format, e.g. {"abc": "Csv"}),
+            or give `preferred_formats` (e.g. ["Csv", "Xlsx"]) to use the first one each output is available in.
+            By default the first available format of each output is used."""
+            return await self.tools.get_job_output_data(job_id, formats=formats, preferred_formats=preferred_formats)
 
         # Register Schedules tools
         @self.app.tool()
-        def get_all_schedules():
-            """Get the list of all schedules of the Alteryx server"""
-            return self.tools.get_all_schedules()
+        async def get_all_schedules(
+            owner_id: Optional[str] = None,
+            workflow_id: Optional[str] = None,
+            runs_after: Optional[str] = None,
+            runs_before: Optional[str] = None,
+            fields: Optional[List[str]] = None,
+            summary: bool = False,
+            limit: Optional[int] = None,
+            cursor: Optional[str] = None,
+        ):
+            """Get the list of all schedules of the Alteryx server.
+            Filter by `owner_id`, `workflow_id` or by the next run date (`runs_after`/`runs_before`,
+            ISO 8601 dates in UTC) to let the server do the search.
+            Use `fields` to return only the given fields of each schedule (e.g. ["id", "name"]),
+            or `summary` to return only the summary fields
+            (id, name, workflow_id, owner_id, run_date_time).
+            Use `limit` to get one page {"items": [...], "next_cursor": ...} and pass `next_cursor` as `cursor`
+            to get the next page."""
+            return await self.tools.get_all_schedules(
+                owner_id=owner_id,
+                workflow_id=workflow_id,
+                runs_after=runs_after,
+                runs_before=runs_before,
+                fields=fields, summary=summary, limit=limit, cursor=cursor,
+            )
 
         @self.app.tool()
-        def get_schedule_by_id(schedule_id: str):
+        async def get_schedule_by_id(schedule_id: str):
             """Get a schedule by its ID"""
-            return self.tools.get_schedule_by_id(schedule_id)
+            return await self.tools.get_schedule_by_id(schedule_id)
 
         @self.app.tool()
-        def deactivate_schedule(schedule_id: str):
+        async def deactivate_schedule(schedule_id: str):
             """Deactivate a schedule by its ID"""
-            return self.tools.deactivate_schedule(schedule_id)
+            return await self.tools.deactivate_schedule(schedule_id)
 
         @self.app.tool()
-        def activate_schedule(schedule_id: str):
+        async def activate_schedule(schedule_id: str):
             """Activate a schedule by its ID"""
-            return self.tools.activate_schedule(schedule_id)
+            return await self.tools.activate_schedule(schedule_id)
 
         @self.app.tool()
-        def update_schedule_name_or_comment(schedule_id: str, name: str, comment: str):
+        async def update_schedule_name_or_comment(schedule_id: str, name: str, comment: str):
             """Update a schedule name or comment by its ID"""
-            return self.tools.update_schedule_name_or_comment(schedule_id, name, comment)
+            return await self.tools.update_schedule_name_or_comment(schedule_id, name, comment)
 
         @self.app.tool()
-        def change_schedule_owner(schedule_id: str, new_owner_id: str):
+        async def change_schedule_owner(schedule_id: str, new_owner_id: str):
             """Change the owner of a schedule by its ID"""
-            return self.tools.change_schedule_owner(schedule_id, new_owner_id)
+            return await self.tools.change_schedule_owner(schedule_id, new_owner_id)
 
         # Register Credentials tools
         @self.app.tool()
-        def get_all_credentials():
-            """Get the list of all accessible credentials of the Alteryx server"""
-            return self.tools.get_all_credentials()
+        async def get_all_credentials(
+            fields: Optional[List[str]] = None,
+            summary: bool = False,
+            limit: Optional[int] = None,
+            cursor: Optional[str] = None,
+        ):
+            """Get the list of all accessible credentials of the Alteryx server.
+            Use `fields` to return only the given fields of each credential (e.g. ["id", "user_name"]),
+            or `summary` to return only the summary fields
+            (id, user_name).
+            Use `limit` to get one page {"items": [...], "next_cursor": ...} and pass `next_cursor` as `cursor`
+            to get the next page."""
+            return await self.tools.get_all_credentials(fields=fields, summary=summary, limit=limit, cursor=cursor)
 
         @self.app.tool()
-        def get_credential_by_id(credential_id: str):
+        async def get_credential_by_id(credential_id: str):
             """Get the details of an existing credential"""
-            return self.tools.get_credential_by_id(credential_id)
+            return await self.tools.get_credential_by_id(credential_id)
 
         # Register Connections tools
         @self.app.tool()
-        def lookup_connection(connection_id: str):
+        async def lookup_connection(connection_id: str):
             """Lookup a DCM Connection as referenced in workflows"""
-            return self.tools.lookup_connection(connection_id)
+            return await self.tools.lookup_connection(connection_id)
 
         @self.app.tool()
-        def get_connection_by_id(connection_id: str):
+        async def get_connection_by_id(connection_id: str):
             """Get a connection by its ID"""
-            return self.tools.get_connection_by_id(connection_id)
+            return await self.tools.get_connection_by_id(connection_id)
+
+        # Register diagnostic tools
+        @self.app.tool()
+        async def get_client_stats():
+            """Get the counters of the client side catalog cache (hits, misses, hit rate, evictions per entity),
+            the catalog store, the workflow package cache, the dependency index, the job watcher,
+            the retries of the failed requests, the rate limiter queue waits, the share of identical concurrent
+            reads served by a single request and the HTTP cache of the GET responses. Useful to tune the caches."""
+            return self.tools.get_client_stats()
+
+        @self.app.tool()
+        async def get_circuit_breakers():
+            """Get the state (closed, open or half_open) and the failure counters of the circuit breaker of each
+            server endpoint. Requests to an endpoint with an open breaker fail fast until a probe request succeeds."""
+            return self.tools.get_circuit_breakers()
 
         return self
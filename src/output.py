@@ -0,0 +1,147 @@
+import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from mcp.types import TextContent
+from pydantic import BaseModel
+
+# Fields kept by the `summary` profile of the list tools
+SUMMARY_FIELDS: Dict[str, List[str]] = {
+    "collections": ["id", "name", "owner_id", "date_added"],
+    "workflows": ["id", "name", "owner_id", "date_created", "published_version_number"],
+    "users": ["id", "first_name", "last_name", "email", "role", "is_active"],
+    "schedules": ["id", "name", "workflow_id", "owner_id", "run_date_time"],
+    "credentials": ["id", "user_name"],
+}
+
+# (attribute, JSON key) pairs of each swagger model class, built on first use
+_model_fields: Dict[type, List[Tuple[str, str]]] = {}
+
+
+def _fields(klass: type) -> List[Tuple[str, str]]:
+    fields = _model_fields.get(klass)
+    if fields is None:
+        fields = [(attr, klass.attribute_map[attr]) for attr in klass.swagger_types]
+        _model_fields[klass] = fields
+    return fields
+
+
+def _json_key(name: str) -> str:
+    """Convert a snake_case attribute name to its camelCase JSON key, JSON keys are returned unchanged"""
+    head, *parts = name.split("_")
+    return head + "".join(part[:1].upper() + part[1:] for part in parts)
+
+
+def list_fields(entity: str, fields: Optional[List[str]] = None, summary: bool = False) -> Optional[List[str]]:
+    """Return the fields a list tool keeps for `entity`.
+
+    Explicit `fields` take precedence over the `summary` profile, `None` keeps every field.
+    """
+    if fields:
+        return fields
+    if summary:
+        return SUMMARY_FIELDS[entity]
+    return None
+
+
+def project(data: Any, fields: Optional[List[str]]) -> Any:
+    """Keep only `fields` of every object of a list response.
+
+    Fields can be given as snake_case attribute names (`owner_id`) or as JSON keys (`ownerId`).
+    Projecting the decoded JSON before `to_data` also saves the conversion of the dropped fields.
+    """
+    if not fields or not isinstance(data, list):
+        return data
+    keys = [_json_key(field) for field in fields]
+    return [{key: item[key] for key in keys if key in item} if isinstance(item, dict) else item for item in data]
+
+
+def decode_cursor(cursor: Optional[str]) -> int:
+    """Return the offset encoded in a pagination cursor, 0 for the first page.
+
+    :raise ValueError: if `cursor` was not returned as a `next_cursor`.
+    """
+    if not cursor:
+        return 0
+    if not cursor.isdigit():
+        raise ValueError(f"Invalid cursor '{cursor}', pass the next_cursor of the previous page")
+    return int(cursor)
+
+
+def page(items: List[Any], offset: int, limit: Optional[int], more: bool) -> Dict[str, Any]:
+    """Build one page of a paginated list, with the cursor of the next page if `more` items follow."""
+    result = {"items": items}
+    if more:
+        result["next_cursor"] = str(offset + (limit or len(items)))
+    return result
+
+
+def paginate(data: Any, limit: Optional[int] = None, cursor: Optional[str] = None) -> Any:
+    """Cut one page out of a list the server cannot paginate.
+
+    Without `limit` and `cursor` the list is returned unchanged, otherwise a page
+    `{"items": [...], "next_cursor": ...}` where `next_cursor` is only set if more items follow.
+    """
+    if (limit is None and not cursor) or not isinstance(data, list):
+        return data
+    offset = decode_cursor(cursor)
+    end = offset + limit if limit is not None else len(data)
+    return page(data[offset:end], offset, limit, end < len(data))
+
+
+def render_list(
+    data: Any,
+    entity: str,
+    fields: Optional[List[str]] = None,
+    summary: bool = False,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Any:
+    """Paginate and project a list response of `entity`, then convert it with `to_data`"""
+    result = paginate(data, limit, cursor)
+    keep = list_fields(entity, fields, summary)
+    if isinstance(result, dict):
+        result["items"] = project(result["items"], keep)
+    else:
+        result = project(result, keep)
+    return to_data(result)
+
+
+def to_data(obj: Any) -> Any:
+    """Convert a tool result into compact JSON-compatible data.
+
+    Swagger models become dicts keyed by their JSON attribute names, exactly as the server
+    sends them, `None` values are dropped and dates are written in ISO 8601 format. Data
+    decoded straight from a JSON response only has its `None` values dropped.
+    """
+    if obj is None or isinstance(obj, (str, bool, int, float)):
+        return obj
+    if isinstance(obj, dict):
+        return {key: to_data(value) for key, value in obj.items() if value is not None}
+    if isinstance(obj, (list, tuple)):
+        return [to_data(item) for item in obj]
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json", exclude_none=True)
+    if hasattr(obj, "swagger_types"):
+        data = {}
+        for attr, key in _fields(type(obj)):
+            value = getattr(obj, attr)
+            if value is not None:
+                data[key] = to_data(value)
+        return data
+    return str(obj)
+
+
+def to_tool_result(result: Any, json_codec) -> Any:
+    """Convert the return value of a tool into MCP content.
+
+    Strings, such as messages and errors, are returned as text. Any other value is returned as
+    structured content together with its compact JSON text for clients that only read text.
+    Structured content must be an object, so other values are wrapped in `{"result": ...}`.
+    """
+    if isinstance(result, str):
+        return [TextContent(type="text", text=result)]
+    if not isinstance(result, dict):
+        result = {"result": result}
+    return [TextContent(type="text", text=json_codec.dumps(result, default=str))], result
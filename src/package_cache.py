@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from src.server_client.private_files import create_private_file, private_directory
+
+logger = logging.getLogger(__name__)
+
+PACKAGE_EXTENSION = ".yxzp"
+
+
+def _file_name(workflow_id: str, version_id: str) -> str:
+    return re.sub(r"[^\w.-]", "_", f"{workflow_id}_{version_id}") + PACKAGE_EXTENSION
+
+
+class PackageCache:
+    """Size-bounded disk cache of workflow packages keyed by `(workflow_id, published_version_id)`.
+
+    A published version never changes, so a cached package is valid for as long as it is the
+    published version of its workflow, and repeated requests skip the download entirely. The
+    packages are stored as files in `directory`, their modification time records the last use, and
+    the least recently used ones are deleted once the total size exceeds `max_bytes`. The cache is
+    rebuilt from the directory on startup, which is only readable by the current user.
+
+    Concurrent requests for a version that is not cached share one download.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        private_directory(directory)
+
+        self._lock = threading.Lock()
+        # file name -> size, in least recently used order
+        self._files: "OrderedDict[str, int]" = OrderedDict()
+        self._size = 0
+        # file name -> task downloading the package, for the requests made while it runs
+        self._downloads: Dict[str, asyncio.Task] = {}
+        entries = []
+        for entry in os.scandir(directory):
+            if entry.is_file() and entry.name.endswith(PACKAGE_EXTENSION):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._files[name] = size
+            self._size += size
+
+        # counters
+        self.hits = 0
+        self.misses = 0
+        self.shared_downloads = 0
+        self.evictions = 0
+        self.bytes_downloaded = 0
+        self.bytes_served = 0
+
+    def path(self, workflow_id: str, version_id: str) -> str:
+        """Path of the cached package of a workflow version, which may not exist"""
+        return os.path.join(self.directory, _file_name(workflow_id, version_id))
+
+    async def get_or_download(
+        self, workflow_id: str, version_id: Optional[str], download: Callable[[], Awaitable[bytes]]
+    ) -> bytes:
+        """Return the package of a workflow version from the cache, or await `download()` and cache it.
+
+        Packages without a version id cannot be told apart and are downloaded every time.
+        """
+        if not version_id or self.max_bytes <= 0:
+            return await download()
+
+        name = _file_name(workflow_id, version_id)
+        data = await asyncio.to_thread(self._read, name)
+        if data is not None:
+            self.hits += 1
+            self.bytes_served += len(data)
+            return data
+
+        task = self._downloads.get(name)
+        if task is not None:
+            self.shared_downloads += 1
+        else:
+            self.misses += 1
+            task = self._downloads[name] = asyncio.get_running_loop().create_task(
+                self._download(workflow_id, name, download)
+            )
+            task.add_done_callback(lambda done: self._download_done(name, done))
+        # A caller cancelled while waiting does not cancel the download for the others
+        return await asyncio.shield(task)
+
+    async def _download(self, workflow_id: str, name: str, download: Callable[[], Awaitable[bytes]]) -> bytes:
+        data = await download()
+        if isinstance(data, (bytes, bytearray)):
+            # Shared by the requests waiting for the download, never mutable
+            data = bytes(data)
+            self.bytes_downloaded += len(data)
+            try:
+                await asyncio.to_thread(self._write, name, data)
+            except OSError as e:
+                logger.warning(f"Could not cache the package of workflow {workflow_id}: {e}")
+        return data
+
+    def _download_done(self, name: str, task: asyncio.Task):
+        if self._downloads.get(name) is task:
+            del self._downloads[name]
+        if not task.cancelled():
+            # Mark the exception as retrieved, the requests that were waiting for it may all be gone
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the size of the cache and its hit and miss counters"""
+        lookups = self.hits + self.misses
+        return {
+            "directory": self.directory,
+            "packages": len(self._files),
+            "size_bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared_downloads": self.shared_downloads,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+            "bytes_downloaded": self.bytes_downloaded,
+            "bytes_served": self.bytes_served,
+        }
+
+    def _read(self, name: str) -> Optional[bytes]:
+        with self._lock:
+            if name not in self._files:
+                return None
+            self._files.move_to_end(name)
+        # Read outside of the lock, the packages are replaced atomically and an open file survives its eviction
+        path = os.path.join(self.directory, name)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            # Record the use in the file so that the order survives restarts
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                if name in self._files and not os.path.exists(path):
+                    self._size -= self._files.pop(name)
+            return None
+        return data
+
+    def _write(self, name: str, data: bytes):
+        path = os.path.join(self.directory, name)
+        temp_path = f"{path}.{threading.get_ident()}.{time.monotonic_ns()}.tmp"
+        with create_private_file(temp_path) as f:
+            f.write(data)
+        # Readers never see a partially written package
+        os.replace(temp_path, path)
+        with self._lock:
+            self._size += len(data) - self._files.pop(name, 0)
+            self._files[name] = len(data)
+            while self._size > self.max_bytes and len(self._files) > 1:
+                evicted, size = self._files.popitem(last=False)
+                self._size -= size
+                self.evictions += 1
+                try:
+                    os.remove(os.path.join(self.directory, evicted))
+                except OSError:
+                    pass
@@ -29,7 +29,7 @@ from src.server_client.api.users_api import UsersApi
 from src.server_client.api.workflows_api import WorkflowsApi
 
 # import ApiClient
-from src.server_client.api_client import ApiClient
+from src.server_client.api_client import ApiClient, AsyncApiClient
 from src.server_client.configuration import Configuration
 
 # import models into sdk package
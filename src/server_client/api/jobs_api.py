@@ -237,7 +237,7 @@ class JobsApi(object):
         :param str id:  (required)
         :param str output_id:  (required)
         :param str format:  (required)
-        :return: str
+        :return: bytes
                  If the method is called asynchronously,
                  returns the request thread.
         """
@@ -261,7 +261,7 @@ class JobsApi(object):
         :param str id:  (required)
         :param str output_id:  (required)
         :param str format:  (required)
-        :return: str
+        :return: bytes
                  If the method is called asynchronously,
                  returns the request thread.
         """
@@ -327,7 +327,7 @@ class JobsApi(object):
             body=body_params,
             post_params=form_params,
             files=local_var_files,
-            response_type='str',  # noqa: E501
+            response_type='bytes',  # noqa: E501
             auth_settings=auth_settings,
             async_req=params.get('async_req'),
             _return_http_data_only=params.get('_return_http_data_only'),
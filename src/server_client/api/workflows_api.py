@@ -667,7 +667,7 @@ class WorkflowsApi(object):
         :param str workflow_id: Identifier for an existing workflow or app (required)
         :param str version_id: A specific version number of the workflow. If no version is provided,
           the published version will be downloaded.
-        :return: None
+        :return: bytes
                  If the method is called asynchronously,
                  returns the request thread.
         """
@@ -690,7 +690,7 @@ class WorkflowsApi(object):
         :param str workflow_id: Identifier for an existing workflow or app (required)
         :param str version_id: A specific version number of the workflow. If no version is provided,
           the published version will be downloaded.
-        :return: None
+        :return: bytes
                  If the method is called asynchronously,
                  returns the request thread.
         """
@@ -742,7 +742,7 @@ class WorkflowsApi(object):
             body=body_params,
             post_params=form_params,
             files=local_var_files,
-            response_type=None,  # noqa: E501
+            response_type="bytes",  # noqa: E501
             auth_settings=auth_settings,
             async_req=params.get("async_req"),
             _return_http_data_only=params.get("_return_http_data_only"),
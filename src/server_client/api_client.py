@@ -11,8 +11,9 @@ Generated by: https://github.com/swagger-api/swagger-codegen.git
 
 from __future__ import absolute_import
 
+import asyncio
+import contextvars
 import datetime
-import json
 import mimetypes
 from multiprocessing.pool import ThreadPool
 import os
@@ -23,10 +24,33 @@ import tempfile
 import six
 from urllib.parse import quote
 
+try:
+    from dateutil.parser import parse as parse_datetime
+except ImportError:
+    parse_datetime = None
+
+from src.server_client.circuit_breaker import calling_endpoint
 from src.server_client.configuration import Configuration
 import src.server_client.models as server_client_models
 from src.server_client import rest
 
+# Size of the chunks streamed to disk by `download_to_file`
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# True while `call_json` makes its call: the body is read whole, so identical concurrent calls can share it
+_reading_json = contextvars.ContextVar("reading_json", default=False)
+
+
+def _raw_body(response):
+    """Raw body of a response, `data` for response objects that only carry the decoded body"""
+    content = getattr(response, "content", None)
+    return content if content is not None else response.data
+
+
+def _binary_body(response):
+    body = _raw_body(response)
+    return body.encode("utf8") if isinstance(body, str) else body
+
 
 class ApiClient(object):
     """Generic API client for Swagger client library builds.
@@ -60,6 +84,9 @@ class ApiClient(object):
         "object": object,
     }
 
+    # Transport used to perform the HTTP requests.
+    rest_client_class = rest.RESTClientObject
+
     def __init__(self, configuration=None, header_name=None, header_value=None, cookie=None):
         if configuration is None:
             configuration = Configuration()
@@ -67,7 +94,9 @@ class ApiClient(object):
 
         # Use the pool property to lazily initialize the ThreadPool.
         self._pool = None
-        self.rest_client = rest.RESTClientObject(configuration)
+        # Compiled deserializers, keyed by type string or class
+        self._deserializers = {}
+        self.rest_client = self.rest_client_class(configuration)
         self.default_headers = {}
         if header_name is not None:
             self.default_headers[header_name] = header_value
@@ -83,8 +112,10 @@ class ApiClient(object):
 
     @property
     def pool(self):
+        # Size the executor like the connection pool so that `async_req`
+        # calls never wait on a worker while a connection is free.
         if self._pool is None:
-            self._pool = ThreadPool()
+            self._pool = ThreadPool(self.configuration.connection_pool_maxsize)
         return self._pool
 
     @property
@@ -116,6 +147,97 @@ class ApiClient(object):
         _preload_content=True,
         _request_timeout=None,
     ):
+        response_data = self.__send_call(
+            resource_path,
+            method,
+            path_params,
+            query_params,
+            header_params,
+            body,
+            post_params,
+            files,
+            auth_settings,
+            collection_formats,
+            _preload_content,
+            _request_timeout,
+        )
+        return self._complete_call(response_data, response_type, _return_http_data_only, _preload_content)
+
+    def __send_call(
+        self,
+        resource_path,
+        method,
+        path_params,
+        query_params,
+        header_params,
+        body,
+        post_params,
+        files,
+        auth_settings,
+        collection_formats,
+        _preload_content,
+        _request_timeout,
+    ):
+        """Sends the request of a call, with a fresh token if the first one was rejected, and returns the response."""
+        token_manager = self.configuration.token_manager
+        for attempt in range(2):
+            token = token_manager.get_token(self.rest_client) if auth_settings else None
+            url, query_params_, header_params_, post_params_, body_ = self._prepare_call(
+                resource_path,
+                path_params,
+                query_params,
+                header_params,
+                body,
+                post_params,
+                files,
+                auth_settings,
+                collection_formats,
+            )
+
+            # perform request and return response
+            try:
+                with calling_endpoint(resource_path):
+                    response_data = self.request(
+                        method,
+                        url,
+                        query_params=query_params_,
+                        headers=header_params_,
+                        post_params=post_params_,
+                        body=body_,
+                        _preload_content=_preload_content,
+                        _request_timeout=_request_timeout,
+                    )
+            except rest.ApiException as e:
+                if attempt == 0 and self._is_expired_token_error(e, auth_settings):
+                    # Drop the rejected token and retry once with a fresh one
+                    token_manager.invalidate(token)
+                    continue
+                raise
+            break
+
+        self.last_response = response_data
+        return response_data
+
+    def _is_expired_token_error(self, exception, auth_settings):
+        """True if the request was rejected because its OAuth2 token expired or was revoked."""
+        return exception.status == 401 and bool(auth_settings) and self.configuration.token_manager.enabled
+
+    def _prepare_call(
+        self,
+        resource_path,
+        path_params=None,
+        query_params=None,
+        header_params=None,
+        body=None,
+        post_params=None,
+        files=None,
+        auth_settings=None,
+        collection_formats=None,
+    ):
+        """Builds the url, headers, query, form and body parameters of a request.
+
+        :return: tuple of (url, query_params, header_params, post_params, body)
+        """
         config = self.configuration
 
         # header parameters
@@ -156,20 +278,10 @@ class ApiClient(object):
         # request url
         url = self.configuration.host + resource_path
 
-        # perform request and return response
-        response_data = self.request(
-            method,
-            url,
-            query_params=query_params,
-            headers=header_params,
-            post_params=post_params,
-            body=body,
-            _preload_content=_preload_content,
-            _request_timeout=_request_timeout,
-        )
-
-        self.last_response = response_data
+        return url, query_params, header_params, post_params, body
 
+    def _complete_call(self, response_data, response_type, _return_http_data_only, _preload_content):
+        """Deserializes the response of a request into the value returned to the caller."""
         return_data = response_data
         if _preload_content:
             # deserialize response data
@@ -183,6 +295,91 @@ class ApiClient(object):
         else:
             return (return_data, response_data.status, response_data.getheaders())
 
+    def call_json(self, api_method, *args, **kwargs):
+        """Calls a generated API method and returns the decoded JSON body.
+
+        The body is not deserialized into models, which is cheaper when the
+        data is only passed on, e.g. as tool output.
+
+        >>> workflows = api_client.call_json(WorkflowsApi(api_client).workflows_get_workflows)
+
+        :param api_method: bound method of an `*Api` facade using this client.
+        :return: the decoded JSON body, None if the body is empty.
+        """
+        kwargs["_preload_content"] = False
+        token = _reading_json.set(True)
+        try:
+            response = api_method(*args, **kwargs)
+        finally:
+            _reading_json.reset(token)
+        try:
+            data = response.data
+        finally:
+            response.release_conn()
+        return self.configuration.json_codec.loads(data) if data else None
+
+    def download_to_file(self, api_method, path, *args, **kwargs):
+        """Calls a generated API method and streams the raw body to `path` in chunks.
+
+        The body is never held in memory as a whole nor decoded as text. It is
+        written to a temporary file renamed to `path` once complete.
+
+        >>> size = api_client.download_to_file(JobsApi(api_client).jobs_get_output_file, path, job_id, output_id, "Csv")
+
+        :param api_method: bound method of an `*Api` facade using this client.
+        :return: the number of bytes written.
+        """
+        kwargs["_preload_content"] = False
+        response = api_method(*args, **kwargs)
+        temp_path = f"{path}.{os.getpid()}.{id(response)}.part"
+        size = 0
+        try:
+            # One buffer is reused for every chunk
+            buffer = bytearray(DOWNLOAD_CHUNK_SIZE)
+            view = memoryview(buffer)
+            with open(temp_path, "wb") as f:
+                while True:
+                    read = response.readinto(buffer)
+                    if not read:
+                        break
+                    f.write(view[:read])
+                    size += read
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        finally:
+            response.release_conn()
+        return size
+
+    def read_bytes(self, api_method, *args, **kwargs):
+        """Calls a generated API method and returns the raw body as a `bytearray`.
+
+        The body is read with `readinto` straight into a buffer preallocated from
+        the `Content-Length` header, so it is neither decoded nor copied.
+
+        :param api_method: bound method of an `*Api` facade using this client.
+        """
+        kwargs["_preload_content"] = False
+        response = api_method(*args, **kwargs)
+        try:
+            length = response.headers.get("Content-Length")
+            if length is None or response.headers.get("Content-Encoding", "identity") != "identity":
+                # Unknown or compressed size, let urllib3 read the whole body
+                return bytearray(response.read(decode_content=True))
+            buffer = bytearray(int(length))
+            view = memoryview(buffer)
+            position = 0
+            while position < len(buffer):
+                read = response.readinto(view[position:])
+                if not read:
+                    raise rest.ApiException(status=0, reason="Incomplete response body")
+                position += read
+            return buffer
+        finally:
+            response.release_conn()
+
     def sanitize_for_serialization(self, obj):
         """Builds a JSON POST object.
 
@@ -238,9 +435,13 @@ class ApiClient(object):
         if response_type == "file":
             return self.__deserialize_file(response)
 
-        # fetch data from response object
+        # binary bodies are returned as received, without any decoding or copy
+        if response_type == "bytes":
+            return _binary_body(response)
+
+        # fetch data from response object, the codecs decode the raw bytes directly
         try:
-            data = json.loads(response.data)
+            data = self.configuration.json_codec.loads(_raw_body(response))
         except ValueError:
             data = response.data
 
@@ -257,14 +458,35 @@ class ApiClient(object):
         if data is None:
             return None
 
+        return self._deserializer(klass)(data)
+
+    def _deserializer(self, klass):
+        """Returns the function converting decoded JSON data into `klass`.
+
+        Type strings are parsed and models are resolved only once per client,
+        the resulting functions are cached and reused for every response.
+
+        :param klass: class literal, or string of class name.
+        :return: function taking the decoded JSON data.
+        """
+        try:
+            return self._deserializers[klass]
+        except KeyError:
+            pass
+
+        deserializer = self._compile_deserializer(klass)
+        self._deserializers[klass] = deserializer
+        return deserializer
+
+    def _compile_deserializer(self, klass):
         if isinstance(klass, str):
             if klass.startswith("list["):
-                sub_kls = re.match(r"list\[(.*)\]", klass).group(1)
-                return [self.__deserialize(sub_data, sub_kls) for sub_data in data]
+                sub_deserializer = self._deserializer(klass[len("list[") : -1])
+                return lambda data: [None if sub_data is None else sub_deserializer(sub_data) for sub_data in data]
 
             if klass.startswith("dict("):
-                sub_kls = re.match(r"dict\(([^,]*), (.*)\)", klass).group(2)
-                return {k: self.__deserialize(v, sub_kls) for k, v in six.iteritems(data)}
+                sub_deserializer = self._deserializer(re.match(r"dict\(([^,]*), (.*)\)", klass).group(2))
+                return lambda data: {k: None if v is None else sub_deserializer(v) for k, v in six.iteritems(data)}
 
             # convert str to class
             if klass in self.NATIVE_TYPES_MAPPING:
@@ -272,16 +494,58 @@ class ApiClient(object):
             else:
                 klass = getattr(server_client_models, klass)
 
-        if klass in self.PRIMITIVE_TYPES:
-            return self.__deserialize_primitive(data, klass)
+        if klass is str:
+            return lambda data: data if type(data) is str else self.__deserialize_primitive(data, str)
+        elif klass in self.PRIMITIVE_TYPES:
+            return lambda data: self.__deserialize_primitive(data, klass)
         elif klass is object:
-            return self.__deserialize_object(data)
+            return self.__deserialize_object
         elif klass == datetime.date:
-            return self.__deserialize_date(data)
+            return self.__deserialize_date
         elif klass == datetime.datetime:
-            return self.__deserialize_datatime(data)
+            return self.__deserialize_datatime
         else:
-            return self.__deserialize_model(data, klass)
+            return self._compile_model_deserializer(klass)
+
+    def _compile_model_deserializer(self, klass):
+        """Returns the function building a `klass` model from a decoded JSON dict.
+
+        The (attribute, json key, deserializer) table of the model is built on
+        first use, which also allows models that reference themselves.
+        """
+        if not klass.swagger_types and not self.__hasattr(klass, "get_real_child_model"):
+            return self.__deserialize_object
+        if self.__hasattr(klass, "get_real_child_model"):
+            return lambda data: self.__deserialize_model(data, klass)
+
+        configuration = self.configuration
+        is_dict_model = issubclass(klass, dict)
+        fields = []
+
+        def deserialize_model(data):
+            if not fields:
+                fields.extend(
+                    (attr, klass.attribute_map[attr], self._deserializer(attr_type))
+                    for attr, attr_type in six.iteritems(klass.swagger_types)
+                )
+
+            # Share the client configuration instead of building one per instance
+            kwargs = {"_configuration": configuration}
+            if isinstance(data, dict):
+                for attr, key, deserializer in fields:
+                    if key in data:
+                        value = data[key]
+                        kwargs[attr] = None if value is None else deserializer(value)
+
+            instance = klass(**kwargs)
+
+            if is_dict_model and isinstance(data, dict):
+                for key, value in data.items():
+                    if key not in klass.swagger_types:
+                        instance[key] = value
+            return instance
+
+        return deserialize_model
 
     def call_api(
         self,
@@ -337,45 +601,86 @@ class ApiClient(object):
             If parameter async_req is False or missing,
             then the method will return the response directly.
         """
+        args = (
+            resource_path,
+            method,
+            path_params,
+            query_params,
+            header_params,
+            body,
+            post_params,
+            files,
+            response_type,
+            auth_settings,
+            _return_http_data_only,
+            collection_formats,
+            _preload_content,
+            _request_timeout,
+        )
         if not async_req:
-            return self.__call_api(
-                resource_path,
-                method,
-                path_params,
-                query_params,
-                header_params,
-                body,
-                post_params,
-                files,
-                response_type,
-                auth_settings,
-                _return_http_data_only,
-                collection_formats,
-                _preload_content,
-                _request_timeout,
-            )
+            return self._coalesce(args)
         else:
-            thread = self.pool.apply_async(
-                self.__call_api,
-                (
-                    resource_path,
-                    method,
-                    path_params,
-                    query_params,
-                    header_params,
-                    body,
-                    post_params,
-                    files,
-                    response_type,
-                    auth_settings,
-                    _return_http_data_only,
-                    collection_formats,
-                    _preload_content,
-                    _request_timeout,
-                ),
-            )
+            thread = self.pool.apply_async(self._coalesce, (args,))
         return thread
 
+    def _coalesce(self, args):
+        """Runs the call, sharing the request of an identical call in flight in another thread, see `_coalescing_key`"""
+        key = self._coalescing_key(*args)
+        if key is None:
+            return self.__call_api(*args)
+        (resource_path, method, path_params, query_params, header_params, body, post_params, files, response_type,
+         auth_settings, _return_http_data_only, collection_formats, _preload_content, _request_timeout) = args
+        shared = self.configuration.request_coalescer.run(key, lambda: self.__send_call(
+            resource_path, method, path_params, query_params, header_params, body, post_params, files,
+            auth_settings, collection_formats, True, _request_timeout,
+        ))
+        # Each call reads and deserializes its own response, the callers never share a mutable object
+        response_data = rest.replay_response(shared, _preload_content)
+        return self._complete_call(response_data, response_type, _return_http_data_only, _preload_content)
+
+    def _coalescing_key(
+        self,
+        resource_path,
+        method,
+        path_params=None,
+        query_params=None,
+        header_params=None,
+        body=None,
+        post_params=None,
+        files=None,
+        response_type=None,
+        auth_settings=None,
+        _return_http_data_only=None,
+        collection_formats=None,
+        _preload_content=True,
+        _request_timeout=None,
+    ):
+        """Key of the calls that can share one request, None for a call that must be sent on its own.
+
+        Only the GET calls that read the whole body are coalesced: the calls whose response is
+        deserialized and the calls of `call_json`, not the streamed downloads. They share a request
+        when they have the same URL, query, headers and auth identity. The body is read once and
+        each call gets its own response to decode. The auth identity is the OAuth2 client, not the
+        token, so calls made around a token refresh are coalesced.
+        """
+        config = self.configuration
+        if method != "GET" or not (_preload_content or _reading_json.get()) or not config.request_coalescing:
+            return None
+        if not auth_settings:
+            identity = None
+        elif config.token_manager.enabled:
+            identity = config.client_id
+        else:
+            identity = config.access_token
+        return (
+            config.host,
+            resource_path,
+            tuple(sorted((k, str(v)) for k, v in (path_params or {}).items())),
+            tuple((k, str(v)) for k, v in (query_params or [])),
+            tuple(sorted((k, str(v)) for k, v in (header_params or {}).items())),
+            identity,
+        )
+
     def request(
         self,
         method,
@@ -495,7 +800,7 @@ class ApiClient(object):
         params = []
 
         if post_params:
-            params = post_params
+            params = list(post_params)
 
         if files:
             for k, v in six.iteritems(files):
@@ -583,8 +888,8 @@ class ApiClient(object):
             filename = re.search(r'filename=[\'"]?([^\'"\s]+)[\'"]?', content_disposition).group(1)
             path = os.path.join(os.path.dirname(path), filename)
 
-        with open(path, "w") as f:
-            f.write(response.data)
+        with open(path, "wb") as f:
+            f.write(_binary_body(response))
 
         return path
 
@@ -617,11 +922,14 @@ class ApiClient(object):
         :return: date.
         """
         try:
-            from dateutil.parser import parse
+            return datetime.date.fromisoformat(string)
+        except (TypeError, ValueError):
+            pass
 
-            return parse(string).date()
-        except ImportError:
+        if parse_datetime is None:
             return string
+        try:
+            return parse_datetime(string).date()
         except ValueError:
             raise rest.ApiException(status=0, reason="Failed to parse `{0}` as date object".format(string))
 
@@ -633,12 +941,16 @@ class ApiClient(object):
         :param string: str.
         :return: datetime.
         """
+        # Fast path for the ISO 8601 strings sent by the server
         try:
-            from dateutil.parser import parse
+            return datetime.datetime.fromisoformat(string)
+        except (TypeError, ValueError):
+            pass
 
-            return parse(string)
-        except ImportError:
+        if parse_datetime is None:
             return string
+        try:
+            return parse_datetime(string)
         except ValueError:
             raise rest.ApiException(status=0, reason=("Failed to parse `{0}` as datetime object".format(string)))
 
@@ -674,3 +986,256 @@ class ApiClient(object):
             if klass_name:
                 instance = self.__deserialize(data, klass_name)
         return instance
+
+
+
+class AsyncApiClient(ApiClient):
+    """asyncio flavour of `ApiClient`.
+
+    `call_api` is a coroutine, so every generated `*Api` method built on top of
+    this client returns an awaitable instead of blocking on the HTTP request:
+
+    >>> api = WorkflowsApi(AsyncApiClient(configuration))
+    >>> workflow = await api.workflows_get_workflow(workflow_id)
+
+    All requests share the single `httpx.AsyncClient` connection pool held by
+    `rest.AsyncRESTClientObject`.
+    """
+
+    rest_client_class = rest.AsyncRESTClientObject
+
+    async def close(self):
+        """Close the underlying connection pool."""
+        await self.rest_client.close()
+
+    async def call_json(self, api_method, *args, **kwargs):
+        """Awaits a generated API method and returns the decoded JSON body.
+
+        See `ApiClient.call_json`.
+        """
+        kwargs["_preload_content"] = False
+        token = _reading_json.set(True)
+        try:
+            response = await api_method(*args, **kwargs)
+        finally:
+            _reading_json.reset(token)
+        try:
+            data = await response.aread()
+        finally:
+            await response.aclose()
+        return self.configuration.json_codec.loads(data) if data else None
+
+    async def read_bytes(self, api_method, *args, **kwargs):
+        """Awaits a generated API method and returns the raw body as a `bytearray`.
+
+        See `ApiClient.read_bytes`. The chunks received are copied once into a
+        buffer preallocated from the `Content-Length` header, instead of being
+        collected and joined.
+        """
+        kwargs["_preload_content"] = False
+        response = await api_method(*args, **kwargs)
+        try:
+            length = response.headers.get("Content-Length")
+            if length is None or response.headers.get("Content-Encoding", "identity") != "identity":
+                return bytearray(await response.aread())
+            buffer = bytearray(int(length))
+            position = 0
+            async for chunk in response.aiter_raw(DOWNLOAD_CHUNK_SIZE):
+                buffer[position:position + len(chunk)] = chunk
+                position += len(chunk)
+            if position != len(buffer):
+                raise rest.ApiException(status=0, reason="Incomplete response body")
+            return buffer
+        finally:
+            await response.aclose()
+
+    async def download_to_file(self, api_method, path, *args, **kwargs):
+        """Awaits a generated API method and streams the raw body to `path` in chunks.
+
+        See `ApiClient.download_to_file`. The file writes run in a thread so that
+        the event loop keeps serving other requests during large downloads.
+        """
+        kwargs["_preload_content"] = False
+        response = await api_method(*args, **kwargs)
+        temp_path = f"{path}.{os.getpid()}.{id(response)}.part"
+        size = 0
+        try:
+            f = await asyncio.to_thread(open, temp_path, "wb")
+            try:
+                async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    await asyncio.to_thread(f.write, chunk)
+                    size += len(chunk)
+            finally:
+                await asyncio.to_thread(f.close)
+            await asyncio.to_thread(os.replace, temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        finally:
+            await response.aclose()
+        return size
+
+    async def call_api(
+        self,
+        resource_path,
+        method,
+        path_params=None,
+        query_params=None,
+        header_params=None,
+        body=None,
+        post_params=None,
+        files=None,
+        response_type=None,
+        auth_settings=None,
+        async_req=None,
+        _return_http_data_only=None,
+        collection_formats=None,
+        _preload_content=True,
+        _request_timeout=None,
+    ):
+        """Makes the HTTP request on the event loop and returns deserialized data.
+
+        Takes the same parameters as `ApiClient.call_api`. `async_req` is
+        accepted for compatibility with the generated code and ignored, the
+        call is always awaitable. Identical concurrent GET calls share one
+        request, see `ApiClient._coalescing_key`.
+        """
+        args = (
+            resource_path,
+            method,
+            path_params,
+            query_params,
+            header_params,
+            body,
+            post_params,
+            files,
+            response_type,
+            auth_settings,
+            _return_http_data_only,
+            collection_formats,
+            _preload_content,
+            _request_timeout,
+        )
+        key = self._coalescing_key(*args)
+        if key is None:
+            return await self._call_api(*args)
+        shared = await self.configuration.request_coalescer.run_async(key, lambda: self._send_call(
+            resource_path, method, path_params, query_params, header_params, body, post_params, files,
+            auth_settings, collection_formats, True, _request_timeout,
+        ))
+        # Each call reads and deserializes its own response, the callers never share a mutable object
+        response_data = rest.replay_async_response(shared, _preload_content)
+        return self._complete_call(response_data, response_type, _return_http_data_only, _preload_content)
+
+    async def _call_api(
+        self,
+        resource_path,
+        method,
+        path_params=None,
+        query_params=None,
+        header_params=None,
+        body=None,
+        post_params=None,
+        files=None,
+        response_type=None,
+        auth_settings=None,
+        _return_http_data_only=None,
+        collection_formats=None,
+        _preload_content=True,
+        _request_timeout=None,
+    ):
+        response_data = await self._send_call(
+            resource_path,
+            method,
+            path_params,
+            query_params,
+            header_params,
+            body,
+            post_params,
+            files,
+            auth_settings,
+            collection_formats,
+            _preload_content,
+            _request_timeout,
+        )
+        return self._complete_call(response_data, response_type, _return_http_data_only, _preload_content)
+
+    async def _send_call(
+        self,
+        resource_path,
+        method,
+        path_params,
+        query_params,
+        header_params,
+        body,
+        post_params,
+        files,
+        auth_settings,
+        collection_formats,
+        _preload_content,
+        _request_timeout,
+    ):
+        """Sends the request of a call, see `ApiClient.__send_call`."""
+        token_manager = self.configuration.token_manager
+        for attempt in range(2):
+            token = await token_manager.get_token_async(self.rest_client) if auth_settings else None
+            url, query_params_, header_params_, post_params_, body_ = self._prepare_call(
+                resource_path,
+                path_params,
+                query_params,
+                header_params,
+                body,
+                post_params,
+                files,
+                auth_settings,
+                collection_formats,
+            )
+
+            try:
+                with calling_endpoint(resource_path):
+                    response_data = await self.request(
+                        method,
+                        url,
+                        query_params=query_params_,
+                        headers=header_params_,
+                        post_params=post_params_,
+                        body=body_,
+                        _preload_content=_preload_content,
+                        _request_timeout=_request_timeout,
+                    )
+            except rest.ApiException as e:
+                if attempt == 0 and self._is_expired_token_error(e, auth_settings):
+                    # Drop the rejected token and retry once with a fresh one
+                    token_manager.invalidate(token)
+                    continue
+                raise
+            break
+
+        self.last_response = response_data
+        return response_data
+
+    async def request(
+        self,
+        method,
+        url,
+        query_params=None,
+        headers=None,
+        post_params=None,
+        body=None,
+        _preload_content=True,
+        _request_timeout=None,
+    ):
+        """Makes the HTTP request using AsyncRESTClientObject."""
+        if method not in ("GET", "HEAD", "OPTIONS", "POST", "PUT", "PATCH", "DELETE"):
+            raise ValueError("http method must be `GET`, `HEAD`, `OPTIONS`, `POST`, `PATCH`, `PUT` or `DELETE`.")
+        return await self.rest_client.request(
+            method,
+            url,
+            query_params=query_params,
+            headers=headers,
+            post_params=post_params,
+            body=body,
+            _preload_content=_preload_content,
+            _request_timeout=_request_timeout,
+        )
@@ -0,0 +1,210 @@
+# coding: utf-8
+
+"""
+Alteryx Server API V3
+
+
+Circuit breakers of the API clients.
+"""
+
+from __future__ import absolute_import
+
+import contextlib
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+from src.server_client.rest import ApiException
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Status raised by the calls refused while a breaker is open
+OPEN_STATUS = 503
+
+# Path template of the endpoint called by the current task or thread, set by the API clients
+request_endpoint = contextvars.ContextVar("request_endpoint", default=None)
+
+
+@contextlib.contextmanager
+def calling_endpoint(resource_path):
+    """Attribute the requests made in the block to the endpoint with the path template `resource_path`"""
+    token = request_endpoint.set(resource_path)
+    try:
+        yield
+    finally:
+        request_endpoint.reset(token)
+
+
+class CircuitOpenError(ApiException):
+    """Raised instead of sending a request to an endpoint whose breaker is open"""
+
+    def __init__(self, endpoint, retry_in):
+        super(CircuitOpenError, self).__init__(
+            status=OPEN_STATUS,
+            reason=f"Circuit breaker open for {endpoint} after repeated failures or slow responses, "
+            f"next attempt in {retry_in:.0f}s",
+        )
+        self.endpoint = endpoint
+
+
+def _is_failure(exception):
+    """Connection errors and server errors count against an endpoint, client errors such as 404 do not"""
+    return exception.status is not None and (exception.status == 0 or exception.status >= 500)
+
+
+class CircuitBreaker(object):
+    """Breaker of one endpoint, closed while it is healthy.
+
+    Every attempt of a request is recorded on its own, timed from when it is sent, so the
+    waits for the rate limiter and between retries never count as slow calls.
+    The outcomes of the last `circuit_breaker_window` attempts are kept. Once half the window
+    is filled, the breaker opens when the share of failed or slow calls (slower than
+    `circuit_breaker_slow_call_seconds`) reaches `circuit_breaker_failure_rate`. While open,
+    calls fail fast with `CircuitOpenError`. After `circuit_breaker_open_seconds` the breaker
+    is half open: one probe call is let through, closing the breaker if it succeeds quickly
+    and opening it again otherwise.
+    """
+
+    def __init__(self, endpoint, configuration):
+        self.endpoint = endpoint
+        self.configuration = configuration
+        self.state = CLOSED
+        # True for the failed or slow calls of the window
+        self._outcomes = deque(maxlen=max(1, configuration.circuit_breaker_window))
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+        # counters
+        self.calls = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.rejected = 0
+        self.opened = 0
+        self.last_failure = None
+
+    def before_call(self):
+        """Raise `CircuitOpenError` if the call must not be sent, return True if the call is the probe"""
+        with self._lock:
+            if self.state == CLOSED:
+                return False
+            retry_in = self._opened_at + self.configuration.circuit_breaker_open_seconds - time.monotonic()
+            if self.state == OPEN and retry_in <= 0:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+        raise CircuitOpenError(self.endpoint, max(0.0, retry_in))
+
+    def after_call(self, probe, seconds, exception=None):
+        """Record the outcome of a call let through by `before_call`"""
+        failed = exception is not None and _is_failure(exception)
+        slow = seconds >= self.configuration.circuit_breaker_slow_call_seconds
+        with self._lock:
+            self.calls += 1
+            self.failures += failed
+            self.slow_calls += slow
+            if failed:
+                self.last_failure = str(exception.reason)
+            if probe:
+                self._probing = False
+                if failed or slow:
+                    self._open()
+                else:
+                    logger.info(f"Circuit breaker closed for {self.endpoint}")
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                return
+            if self.state != CLOSED:
+                return
+            self._outcomes.append(failed or slow)
+            if len(self._outcomes) * 2 >= self._outcomes.maxlen and \
+                    sum(self._outcomes) >= self.configuration.circuit_breaker_failure_rate * len(self._outcomes):
+                self._open()
+
+    def cancelled(self, probe):
+        """Release the probe of a call that ended without an outcome, e.g. a cancelled task"""
+        if probe:
+            with self._lock:
+                self._probing = False
+
+    def stats(self):
+        with self._lock:
+            retry_in = None
+            if self.state != CLOSED:
+                retry_in = self._opened_at + self.configuration.circuit_breaker_open_seconds - time.monotonic()
+            return {
+                "state": self.state,
+                "window_calls": len(self._outcomes),
+                "window_failure_rate": round(sum(self._outcomes) / len(self._outcomes), 3) if self._outcomes else None,
+                "calls": self.calls,
+                "failures": self.failures,
+                "slow_calls": self.slow_calls,
+                "rejected": self.rejected,
+                "opened": self.opened,
+                "seconds_until_probe": round(max(0.0, retry_in), 1) if retry_in is not None else None,
+                "last_failure": self.last_failure,
+            }
+
+    def _open(self):
+        logger.warning(f"Circuit breaker opened for {self.endpoint}")
+        self.state = OPEN
+        self.opened += 1
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+
+
+class CircuitBreakers(object):
+    """Circuit breakers keyed by the path template of the endpoints, e.g. `/v3/workflows/{workflowId}/package`.
+
+    A degraded endpoint, such as a DCM endpoint timing out, only opens its own breaker: its
+    calls fail fast instead of holding connections for the full timeout, while the other
+    endpoints keep working. See `CircuitBreaker`. A `circuit_breaker_window` of 0 disables them.
+
+    :param configuration: the Configuration holding the circuit breaker settings.
+    """
+
+    def __init__(self, configuration):
+        self.configuration = configuration
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.configuration.circuit_breaker_window > 0
+
+    def current(self, url):
+        """Return the breaker of the endpoint being called, see `calling_endpoint`, or None if disabled.
+
+        Requests sent outside of an API call, e.g. token requests, use the path of their URL.
+        """
+        if not self.enabled:
+            return None
+        return self.get(request_endpoint.get() or urlsplit(url).path)
+
+    def get(self, resource_path):
+        """Return the breaker of the endpoint with the path template `resource_path`"""
+        breaker = self._breakers.get(resource_path)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(resource_path, CircuitBreaker(resource_path, self.configuration))
+        return breaker
+
+    def stats(self):
+        """Return the state and counters of each breaker, the open ones first"""
+        with self._lock:
+            breakers = list(self._breakers.values())
+        states = {breaker.endpoint: breaker.stats() for breaker in breakers}
+        return {
+            "enabled": self.enabled,
+            "open": sorted(endpoint for endpoint, stats in states.items() if stats["state"] != CLOSED),
+            "endpoints": dict(sorted(states.items(), key=lambda item: (item[1]["state"] == CLOSED, item[0]))),
+        }
@@ -0,0 +1,109 @@
+# coding: utf-8
+
+"""
+Alteryx Server API V3
+
+
+Coalescing of the identical concurrent reads of the API clients.
+"""
+
+from __future__ import absolute_import
+
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class RequestCoalescer(object):
+    """Shares one in-flight request between the identical calls made at the same time.
+
+    The first call with a key runs the request, the calls arriving with the same key before
+    it completes wait for it and receive the same result, or the same exception. The API
+    clients share the response read once, and each call decodes its own copy of the body.
+    Once the request completes the key is forgotten, so results are never served after the
+    fact: this only removes duplicate requests, it is not a cache.
+
+    `run` coalesces the calls of threads, `run_async` the calls of tasks of an event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # key -> Future of the request in flight, for threads
+        self._futures = {}
+        # key -> Task of the request in flight, for the event loop
+        self._tasks = {}
+
+        # counters
+        self.calls = 0
+        self.coalesced = 0
+        self.max_waiters = 0
+        self._waiters = {}
+
+    def run(self, key, call):
+        """Return the result of `call()`, or of the identical call already in flight for `key`"""
+        with self._lock:
+            self.calls += 1
+            future = self._futures.get(key)
+            if future is None:
+                future = self._futures[key] = Future()
+                leader = True
+            else:
+                self._joined(key)
+                leader = False
+        if not leader:
+            return future.result()
+        try:
+            result = call()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._done(self._futures, key, future)
+
+    async def run_async(self, key, call):
+        """Return the result of the coroutine `call()`, or of the identical call already in flight for `key`.
+
+        The request runs in its own task, so a caller cancelled while waiting does not cancel it for the others.
+        """
+        with self._lock:
+            self.calls += 1
+            task = self._tasks.get(key)
+            if task is None or task.done():
+                task = self._tasks[key] = asyncio.ensure_future(call())
+                task.add_done_callback(lambda done: self._task_done(key, done))
+            else:
+                self._joined(key)
+        return await asyncio.shield(task)
+
+    def stats(self):
+        """Return the number of calls, of calls served by a request already in flight, and their ratio"""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "requests": self.calls - self.coalesced,
+                "coalesced": self.coalesced,
+                "coalesced_ratio": round(self.coalesced / self.calls, 3) if self.calls else None,
+                "max_waiters": self.max_waiters,
+                "in_flight": len(self._futures) + len(self._tasks),
+            }
+
+    def _joined(self, key):
+        self.coalesced += 1
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        self.max_waiters = max(self.max_waiters, self._waiters[key])
+
+    def _task_done(self, key, task):
+        self._done(self._tasks, key, task)
+        if not task.cancelled():
+            # Mark the exception as retrieved, the callers that were waiting for it may all be gone
+            task.exception()
+
+    def _done(self, in_flight, key, request):
+        with self._lock:
+            # A new request may already be in flight for the key
+            if in_flight.get(key) is request:
+                del in_flight[key]
+                self._waiters.pop(key, None)
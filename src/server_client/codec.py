@@ -0,0 +1,74 @@
+# coding: utf-8
+
+"""
+Alteryx Server API V3
+
+
+JSON codecs used to encode request bodies and decode response bodies.
+"""
+
+from __future__ import absolute_import
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JsonCodec(object):
+    """JSON codec backed by the standard library."""
+
+    name = "json"
+
+    def dumps(self, obj, default=None):
+        """Serializes `obj` to a compact JSON string.
+
+        :param default: function called for objects that are not JSON serializable.
+        """
+        return json.dumps(obj, default=default, separators=(",", ":"), ensure_ascii=False)
+
+    def dumpb(self, obj, default=None):
+        """Serializes `obj` to compact UTF-8 encoded JSON, as sent in request bodies."""
+        return self.dumps(obj, default=default).encode("utf-8")
+
+    def loads(self, data):
+        """Deserializes a JSON document given as str or bytes.
+
+        :raise ValueError: if `data` is not valid JSON.
+        """
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    """JSON codec backed by orjson, several times faster than the standard library."""
+
+    name = "orjson"
+
+    def dumps(self, obj, default=None):
+        return self.dumpb(obj, default=default).decode("utf-8")
+
+    def dumpb(self, obj, default=None):
+        return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+def get_codec(name="auto"):
+    """Returns the JSON codec called `name`.
+
+    :param name: `json`, `orjson`, or `auto` to use orjson when it is installed
+        and fall back to the standard library otherwise.
+    """
+    name = (name or "auto").lower()
+    if name == "auto":
+        return OrjsonCodec() if orjson is not None else JsonCodec()
+    if name == "orjson":
+        if orjson is None:
+            raise ImportError("The orjson JSON codec requires the orjson package.")
+        return OrjsonCodec()
+    if name == "json":
+        return JsonCodec()
+    raise ValueError("Unknown JSON codec `{0}`, expected `auto`, `json` or `orjson`".format(name))
@@ -21,6 +21,14 @@ import tempfile
 import six
 import http.client as httplib
 
+from src.server_client.circuit_breaker import CircuitBreakers
+from src.server_client.coalescing import RequestCoalescer
+from src.server_client.codec import get_codec
+from src.server_client.http_cache import HttpCache
+from src.server_client.rate_limit import RateLimiter
+from src.server_client.retry import RetryPolicy
+from src.server_client.token_manager import TokenManager
+
 
 class Configuration(object):
     """NOTE: This class is auto generated by the swagger code generator program.
@@ -62,10 +70,94 @@ class Configuration(object):
         self.access_token = ""
         # OAuth2 token endpoint
         self.token_url = "/oauth2/token"
+        # Caches the client credentials token and refreshes it before expiry
+        self.token_manager = TokenManager(self)
 
         # Temp Directory
         self.temp_directory = os.getenv("ALTERYX_TEMP_DIRECTORY", tempfile.gettempdir())
 
+        # Global budget of job status requests per second shared by all job watchers
+        self.job_poll_requests_per_second = float(os.getenv("ALTERYX_JOB_POLL_REQUESTS_PER_SECOND", "1"))
+
+        # Catalog cache of workflows, users, collections, schedules, credentials and connections:
+        # maximum number of cached objects and lists, and time to live in seconds per entity,
+        # e.g. ALTERYX_CATALOG_CACHE_TTL="workflows=30,users=600". A time to live of 0 disables the cache.
+        self.catalog_cache_max_entries = int(os.getenv("ALTERYX_CATALOG_CACHE_MAX_ENTRIES", "1000"))
+        self.catalog_cache_ttl_seconds = {}
+        for item in os.getenv("ALTERYX_CATALOG_CACHE_TTL", "").split(","):
+            if "=" in item:
+                entity, seconds = item.split("=", 1)
+                self.catalog_cache_ttl_seconds[entity.strip()] = float(seconds)
+
+        # Optional on-disk catalog of the workflows, users, collections, schedules and credentials lists,
+        # stored in SQLite under temp_directory. It is synced incrementally every
+        # catalog_incremental_sync_seconds and fully reconciled every catalog_full_sync_seconds.
+        self.catalog_store_enabled = os.getenv("ALTERYX_CATALOG_STORE", "0").lower() in ("1", "true", "yes")
+        self.catalog_incremental_sync_seconds = float(os.getenv("ALTERYX_CATALOG_SYNC_SECONDS", "60"))
+        self.catalog_full_sync_seconds = float(os.getenv("ALTERYX_CATALOG_FULL_SYNC_SECONDS", "3600"))
+
+        # Size limit of the disk cache of workflow packages under temp_directory, 0 disables the cache
+        self.package_cache_max_bytes = int(float(os.getenv("ALTERYX_PACKAGE_CACHE_MAX_MB", "512")) * 1024 * 1024)
+
+        # Index of the connections, credentials and file paths used by the published workflows:
+        # number of packages downloaded and parsed at once, and seconds between two refreshes
+        self.dependency_index_concurrency = int(os.getenv("ALTERYX_DEPENDENCY_INDEX_CONCURRENCY", "4"))
+        self.dependency_index_refresh_seconds = float(os.getenv("ALTERYX_DEPENDENCY_INDEX_REFRESH_SECONDS", "300"))
+        # Processes parsing workflow packages for the bulk analyses, 0 parses them in threads
+        self.parse_workers = int(os.getenv("ALTERYX_PARSE_WORKERS", str(os.cpu_count() or 1)))
+
+        # Number of job outputs downloaded at once by get_job_output_data
+        self.output_download_concurrency = int(os.getenv("ALTERYX_OUTPUT_DOWNLOAD_CONCURRENCY", "4"))
+
+        # Retries of the requests that failed with a transient error: maximum number of retries per call,
+        # exponential backoff base and cap in seconds, total time a call may spend waiting between retries,
+        # and the statuses retried for the idempotent methods
+        self.retry_max_retries = int(os.getenv("ALTERYX_RETRY_MAX_RETRIES", "3"))
+        self.retry_backoff_seconds = float(os.getenv("ALTERYX_RETRY_BACKOFF_SECONDS", "0.5"))
+        self.retry_backoff_max_seconds = float(os.getenv("ALTERYX_RETRY_BACKOFF_MAX_SECONDS", "30"))
+        self.retry_budget_seconds = float(os.getenv("ALTERYX_RETRY_BUDGET_SECONDS", "60"))
+        self.retry_statuses = {
+            int(status) for status in os.getenv("ALTERYX_RETRY_STATUSES", "429,502,503,504").split(",") if status.strip()
+        }
+        self.retry_policy = RetryPolicy(self)
+
+        # Client side rate limit: requests per second and burst per host, 0 disables it, and optional
+        # requests per second per endpoint class, e.g. "jobs=2,workflows=5"
+        self.rate_limit_requests_per_second = float(os.getenv("ALTERYX_RATE_LIMIT_RPS", "10"))
+        self.rate_limit_burst = float(os.getenv("ALTERYX_RATE_LIMIT_BURST", "20"))
+        rate_limit_classes = (item.partition("=") for item in os.getenv("ALTERYX_RATE_LIMIT_CLASSES", "").split(","))
+        self.rate_limit_classes = {
+            name.strip().lower(): float(rate) for name, _, rate in rate_limit_classes if name.strip() and rate.strip()
+        }
+        self.rate_limiter = RateLimiter(self)
+
+        # Circuit breakers per endpoint: number of recent calls considered (0 disables them), share of failed
+        # or slow calls opening a breaker, seconds after which a call is slow, and seconds before a probe call
+        self.circuit_breaker_window = int(os.getenv("ALTERYX_CIRCUIT_BREAKER_WINDOW", "20"))
+        self.circuit_breaker_failure_rate = float(os.getenv("ALTERYX_CIRCUIT_BREAKER_FAILURE_RATE", "0.5"))
+        self.circuit_breaker_slow_call_seconds = float(os.getenv("ALTERYX_CIRCUIT_BREAKER_SLOW_CALL_SECONDS", "30"))
+        self.circuit_breaker_open_seconds = float(os.getenv("ALTERYX_CIRCUIT_BREAKER_OPEN_SECONDS", "30"))
+        self.circuit_breakers = CircuitBreakers(self)
+
+        # Share one request between the identical GET calls made at the same time (default: 1, 0 disables it)
+        self.request_coalescing = os.getenv("ALTERYX_REQUEST_COALESCING", "1").lower() not in ("0", "false", "no")
+        self.request_coalescer = RequestCoalescer()
+
+        # HTTP cache of the GET responses under temp_directory (default: 1, 0 disables it): size limits on disk
+        # and in memory, and seconds the responses without ETag or Last-Modified are served without a request,
+        # globally (default: 0, not cached) and per endpoint class, e.g. "users=300,collections=60"
+        self.http_cache_enabled = os.getenv("ALTERYX_HTTP_CACHE", "1").lower() not in ("0", "false", "no")
+        self.http_cache_max_bytes = int(float(os.getenv("ALTERYX_HTTP_CACHE_MAX_MB", "256")) * 1024 * 1024)
+        self.http_cache_memory_max_bytes = int(float(os.getenv("ALTERYX_HTTP_CACHE_MEMORY_MB", "32")) * 1024 * 1024)
+        self.http_cache_ttl_seconds = float(os.getenv("ALTERYX_HTTP_CACHE_TTL_SECONDS", "0"))
+        http_cache_ttl_classes = (
+            item.partition("=") for item in os.getenv("ALTERYX_HTTP_CACHE_TTL_CLASSES", "").split(",")
+        )
+        self.http_cache_ttl_classes = {
+            name.strip().lower(): float(ttl) for name, _, ttl in http_cache_ttl_classes if name.strip() and ttl.strip()
+        }
+        self.http_cache = HttpCache(self)
+
         # Logging Settings
         self.logger = {}
         self.logger["package_logger"] = logging.getLogger("server_client")
@@ -99,7 +191,10 @@ class Configuration(object):
         # not the best value when you are making a lot of possibly parallel
         # requests to the same host, which is often the case here.
         # cpu_count * 5 is used as default value to increase performance.
-        self.connection_pool_maxsize = multiprocessing.cpu_count() * 5
+        # Can be overridden with ALTERYX_CONNECTION_POOL_MAXSIZE.
+        self.connection_pool_maxsize = int(
+            os.getenv("ALTERYX_CONNECTION_POOL_MAXSIZE", multiprocessing.cpu_count() * 5)
+        )
 
         # Proxy URL
         self.proxy = None
@@ -109,6 +204,9 @@ class Configuration(object):
         # Disable client side validation
         self.client_side_validation = False
 
+        # JSON codec for request and response bodies: auto (orjson if installed), orjson or json
+        self.json_codec = get_codec(os.getenv("ALTERYX_JSON_CODEC", "auto"))
+
     @classmethod
     def set_default(cls, default):
         cls._default = default
@@ -246,47 +344,13 @@ class Configuration(object):
             return None
         return self.client_id + ":" + self.client_secret
 
-    def get_access_token(self):
-        """Gets OAuth2 access token using client credentials.
-
-        :return: The access token string
-        :rtype: str
-        """
-        if not self.client_id or not self.client_secret:
-            return None
-
-        import requests
-        from base64 import b64encode
-
-        # Create basic auth header from client credentials
-        credentials = f"{self.client_id}:{self.client_secret}"
-        auth_header = b64encode(credentials.encode()).decode()
-
-        headers = {"Authorization": f"Basic {auth_header}", "Content-Type": "application/x-www-form-urlencoded"}
-
-        data = {"grant_type": "client_credentials"}
-
-        url = self.host.rstrip("/") + self.token_url
-
-        try:
-            response = requests.post(url, headers=headers, data=data, verify=self.verify_ssl)
-            response.raise_for_status()
-            token_data = response.json()
-            self.access_token = token_data.get("access_token")
-            return self.access_token
-        except Exception as e:
-            self.logger.error(f"Error getting access token: {str(e)}")
-            return None
-
     def auth_settings(self):
         """Gets Auth Settings dict for api client.
 
         :return: The Auth Settings information dict.
         """
-        # Try to get access token if we have client credentials but no token
-        if not self.access_token and self.client_id and self.client_secret:
-            self.get_access_token()
-
+        # The access token is fetched and refreshed by `token_manager`
+        # before the request is prepared.
         return {
             "oauth2": {
                 "type": "oauth2",
@@ -0,0 +1,425 @@
+# coding: utf-8
+
+"""
+Alteryx Server API V3
+
+
+HTTP cache of the GET responses of the REST clients.
+"""
+
+from __future__ import absolute_import
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+from src.server_client.private_files import create_private_file, private_directory
+from src.server_client.rate_limit import endpoint_class
+
+logger = logging.getLogger(__name__)
+
+# Extension of the cached responses on disk
+ENTRY_EXTENSION = ".http"
+
+# Request headers that change the response, part of the key along with the URL and the auth identity
+VARY_HEADERS = ("Accept",)
+
+# Response headers dropped from the cached responses, the body is stored decoded unless `encoded` is passed
+DROPPED_HEADERS = frozenset(("content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"))
+
+# Downloads cached on disk by `PackageCache` per published version, never stored twice
+_UNCACHED_PATHS = re.compile(r"/workflows/[^/]+/package/?$")
+
+_MAX_AGE = re.compile(r"max-age\s*=\s*(\d+)")
+
+
+class HttpCache(object):
+    """Cache of the GET responses keyed by URL, query, `Accept` header and auth identity.
+
+    - Responses with an `ETag` or a `Last-Modified` validator are stored, and the next request
+      sends `If-None-Match` / `If-Modified-Since`: on `304 Not Modified` the stored body is
+      served instead of downloading it again.
+    - Responses without validators are stored for `http_cache_ttl_seconds`, or the TTL of their
+      endpoint class in `http_cache_ttl_classes` (e.g. `users=300`), and served without a request
+      while fresh. A `Cache-Control: max-age` sent by the server takes precedence, `no-store`
+      responses are never stored.
+    - Entries are kept in memory up to `http_cache_memory_max_bytes` and on disk under
+      `temp_directory` up to `http_cache_max_bytes`, the least recently used ones are evicted
+      first. Entries larger than a quarter of a limit are not kept in that tier.
+    - Streamed responses are written to the cache file by `writer` as the caller reads them,
+      they are never buffered in memory. The workflow packages are left to `PackageCache`.
+
+    The auth identity is the OAuth2 client when the token manager is enabled, otherwise the
+    `Authorization` header, so the responses of a user are never served to another one. Keys
+    are hashed, the credentials are never written to disk. The cache directory and its files
+    are only readable by the current user, see `private_directory`.
+
+    :param configuration: the Configuration holding the cache settings.
+    """
+
+    def __init__(self, configuration):
+        self.configuration = configuration
+        self._lock = threading.Lock()
+        # key -> entry, in least recently used order
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        # key -> size of the entry file, in least recently used order, loaded on first use
+        self._files = None
+        self._disk_size = 0
+        self._directory_checked = False
+
+        # counters
+        self.fresh_hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.bytes_served = 0
+
+    @property
+    def enabled(self):
+        return self.configuration.http_cache_enabled
+
+    @property
+    def directory(self):
+        return os.path.join(os.path.normpath(self.configuration.temp_directory), "http_cache")
+
+    def key(self, method, url, query_params=None, headers=None):
+        """Return the key of a cacheable request, None if the request is not cacheable"""
+        if not self.enabled or method != "GET" or _UNCACHED_PATHS.search(urlsplit(url).path):
+            return None
+        headers = headers or {}
+        if headers.get("Range"):
+            return None
+        configuration = self.configuration
+        authorization = headers.get("Authorization")
+        if not authorization:
+            identity = None
+        elif configuration.token_manager.enabled:
+            identity = "client:" + configuration.client_id
+        else:
+            identity = authorization
+        parts = [url, sorted((str(k), str(v)) for k, v in (query_params or [])), identity]
+        parts += [headers.get(name) for name in VARY_HEADERS]
+        return hashlib.sha256(json.dumps(parts).encode("utf8")).hexdigest()
+
+    def lookup(self, key):
+        """Return the entry stored for `key`, from memory or from disk, or None"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+            self._load_files()
+            if key not in self._files:
+                self.misses += 1
+                return None
+            self._files.move_to_end(key)
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                meta, _, body = f.read().partition(b"\n")
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._forget_file(key)
+                self.misses += 1
+            return None
+        entry = dict(json.loads(meta), body=body)
+        with self._lock:
+            self._keep_in_memory(key, entry)
+        return entry
+
+    def is_fresh(self, entry):
+        """True if the entry can be served without a request"""
+        if time.time() < entry["expires_at"]:
+            with self._lock:
+                self.fresh_hits += 1
+                self.bytes_served += len(entry["body"])
+            return True
+        return False
+
+    def conditional_headers(self, entry, headers):
+        """Return a copy of `headers` with the validators of the entry, None if the entry has none"""
+        if not entry["etag"] and not entry["last_modified"]:
+            return None
+        headers = dict(headers or {})
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def not_modified(self, key, entry, headers):
+        """Record a `304 Not Modified` response to a conditional request for the entry, return the entry to serve"""
+        expires_at = self._expires_at(entry["url"], headers or {}, validated=True)
+        with self._lock:
+            self.revalidated += 1
+            self.bytes_served += len(entry["body"])
+        if expires_at is not None and expires_at > time.time():
+            # Fresh again for the `max-age` of the 304, also after a restart
+            entry["expires_at"] = expires_at
+            self._write(key, entry)
+        return entry
+
+    def store(self, key, url, status, headers, body):
+        """Store a response, return the stored entry or None if the response may not be stored"""
+        entry = self._entry(url, status, headers)
+        if entry is None:
+            return None
+        entry["body"] = bytes(body)
+        with self._lock:
+            self.stores += 1
+            self._keep_in_memory(key, entry)
+        self._write(key, entry)
+        return entry
+
+    def writer(self, key, url, status, headers, encoded=False):
+        """Return an `EntryWriter` storing a streamed response as it is read, or None if it may not be stored.
+
+        `encoded` is True when the chunks written are the body as sent, before its `Content-Encoding` is decoded.
+        """
+        entry = self._entry(url, status, headers, encoded)
+        if entry is None:
+            return None
+        length = headers.get("Content-Length")
+        if length is not None and int(length) * 4 > self.configuration.http_cache_max_bytes:
+            return None
+        try:
+            return EntryWriter(self, key, entry)
+        except OSError:
+            return None
+
+    def stats(self):
+        """Return the hits, misses and sizes of the memory and disk tiers"""
+        with self._lock:
+            hits = self.fresh_hits + self.revalidated
+            return {
+                "enabled": self.enabled,
+                "fresh_hits": self.fresh_hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+                "hit_rate": round(hits / (hits + self.misses), 3) if hits + self.misses else None,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "bytes_served": self.bytes_served,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_size,
+                "disk_entries": len(self._files) if self._files is not None else None,
+                "disk_bytes": self._disk_size,
+            }
+
+    def _entry(self, url, status, headers, encoded=False):
+        """Entry of a response without its body, None if the response may not be stored"""
+        expires_at = self._expires_at(url, headers, validated=False)
+        if expires_at is None:
+            return None
+        dropped = DROPPED_HEADERS - {"content-encoding"} if encoded else DROPPED_HEADERS
+        return {
+            "url": url,
+            "status": status,
+            "headers": [(k, v) for k, v in headers.items() if k.lower() not in dropped],
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "expires_at": expires_at,
+        }
+
+    def _expires_at(self, url, headers, validated):
+        """Time until which a response is fresh, None if it may not be stored.
+
+        `validated` is True for the headers of a 304 response, which refresh an entry that has validators.
+        """
+        cache_control = (headers.get("Cache-Control") or "").lower()
+        if "no-store" in cache_control:
+            return None
+        now = time.time()
+        max_age = _MAX_AGE.search(cache_control)
+        if max_age and "no-cache" not in cache_control:
+            return now + int(max_age.group(1))
+        if validated or headers.get("ETag") or headers.get("Last-Modified"):
+            # Revalidated on every request
+            return now
+        if "no-cache" in cache_control:
+            return None
+        configuration = self.configuration
+        ttl = configuration.http_cache_ttl_classes.get(endpoint_class(url), configuration.http_cache_ttl_seconds)
+        return now + ttl if ttl > 0 else None
+
+    def _keep_in_memory(self, key, entry):
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_size -= len(previous["body"])
+        max_bytes = self.configuration.http_cache_memory_max_bytes
+        if len(entry["body"]) * 4 > max_bytes:
+            return
+        self._memory[key] = entry
+        self._memory_size += len(entry["body"])
+        while self._memory_size > max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted["body"])
+
+    def _load_files(self):
+        """Read the entries stored on disk by previous runs, in least recently used order"""
+        if self._files is not None:
+            return
+        self._files = OrderedDict()
+        entries = []
+        if os.path.isdir(self.directory):
+            try:
+                self._check_directory()
+            except OSError as e:
+                # Never serve entries that another user could have written
+                logger.warning(f"HTTP cache files ignored: {e}")
+                return
+            for item in os.scandir(self.directory):
+                if item.is_file() and item.name.endswith(ENTRY_EXTENSION):
+                    stat = item.stat()
+                    entries.append((stat.st_mtime, item.name[:-len(ENTRY_EXTENSION)], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._files[key] = size
+            self._disk_size += size
+
+    def _check_directory(self):
+        """Create the cache directory readable by the current user only, or check an existing one"""
+        if not self._directory_checked:
+            private_directory(self.directory)
+            self._directory_checked = True
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ENTRY_EXTENSION)
+
+    def _temp_path(self, key):
+        return f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.{time.monotonic_ns()}.part"
+
+    def _write(self, key, entry):
+        meta = _meta_line(entry)
+        size = len(meta) + len(entry["body"])
+        if size * 4 > self.configuration.http_cache_max_bytes:
+            return
+        temp_path = self._temp_path(key)
+        try:
+            self._check_directory()
+            with create_private_file(temp_path) as f:
+                f.write(meta)
+                f.write(entry["body"])
+            os.replace(temp_path, self._path(key))
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+        self._add_file(key, size)
+
+    def _add_file(self, key, size):
+        """Record the file of an entry written to disk, and evict the least recently used files over the limit"""
+        max_bytes = self.configuration.http_cache_max_bytes
+        evicted = []
+        with self._lock:
+            self._load_files()
+            self._forget_file(key)
+            self._files[key] = size
+            self._disk_size += size
+            while self._disk_size > max_bytes and len(self._files) > 1:
+                old_key, old_size = self._files.popitem(last=False)
+                self._disk_size -= old_size
+                self.evictions += 1
+                evicted.append(old_key)
+        for old_key in evicted:
+            try:
+                os.remove(self._path(old_key))
+            except OSError:
+                pass
+
+    def _forget_file(self, key):
+        size = self._files.pop(key, None)
+        if size is not None:
+            self._disk_size -= size
+
+
+def _meta_line(entry):
+    """First line of an entry file, the entry without its body"""
+    return json.dumps({name: value for name, value in entry.items() if name != "body"}).encode("utf8") + b"\n"
+
+
+class EntryWriter(object):
+    """Writes the body of a streamed response to its cache file chunk by chunk, as the caller reads it.
+
+    The entry is stored by `commit` once the whole body was read, and dropped by `discard` when
+    the caller stops early, the connection fails, or the body outgrows the limits of the cache.
+    The body is kept for the memory tier only while it is small enough for it.
+    """
+
+    def __init__(self, cache, key, entry):
+        self.cache = cache
+        self.key = key
+        self.entry = entry
+        self._chunks = []
+        self._temp_path = cache._temp_path(key)
+        cache._check_directory()
+        self._file = create_private_file(self._temp_path)
+        meta = _meta_line(entry)
+        self._file.write(meta)
+        self.size = len(meta)
+
+    @property
+    def closed(self):
+        return self._file is None
+
+    def write(self, chunk):
+        if self._file is None:
+            return
+        configuration = self.cache.configuration
+        self.size += len(chunk)
+        if self.size * 4 > configuration.http_cache_max_bytes:
+            self.discard()
+            return
+        try:
+            self._file.write(chunk)
+        except OSError:
+            self.discard()
+            return
+        if self._chunks is not None:
+            if self.size * 4 > configuration.http_cache_memory_max_bytes:
+                self._chunks = None
+            else:
+                self._chunks.append(bytes(chunk))
+
+    def commit(self):
+        """Store the entry, once the whole body was written"""
+        if self._file is None:
+            return
+        cache = self.cache
+        try:
+            self._file.close()
+            self._file = None
+            os.replace(self._temp_path, cache._path(self.key))
+        except OSError:
+            self.discard()
+            return
+        cache._add_file(self.key, self.size)
+        with cache._lock:
+            cache.stores += 1
+            if self._chunks is not None:
+                cache._keep_in_memory(self.key, dict(self.entry, body=b"".join(self._chunks)))
+            else:
+                # Drop an older version of the entry kept in memory
+                previous = cache._memory.pop(self.key, None)
+                if previous is not None:
+                    cache._memory_size -= len(previous["body"])
+
+    def discard(self):
+        """Drop the partial entry"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._chunks = None
+        if os.path.exists(self._temp_path):
+            try:
+                os.remove(self._temp_path)
+            except OSError:
+                pass
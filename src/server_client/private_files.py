@@ -0,0 +1,41 @@
+# coding: utf-8
+
+"""
+Alteryx Server API V3
+
+
+Files only readable by the current user, for the caches written under the temp directory.
+"""
+
+from __future__ import absolute_import
+
+import os
+import stat
+
+# Modes of the private directories and files
+DIRECTORY_MODE = 0o700
+FILE_MODE = 0o600
+
+
+def private_directory(path):
+    """Create `path` readable by the current user only, or check that an existing one is.
+
+    The temp directory is shared with the other local accounts, so the caches of the server
+    data are kept in directories they cannot list or read. An existing directory owned by
+    another user raises `PermissionError`, its files could be read or replaced by that user.
+    """
+    os.makedirs(path, mode=DIRECTORY_MODE, exist_ok=True)
+    if not hasattr(os, "getuid"):
+        # Windows: the files inherit the ACL of the user profile temp directory
+        return path
+    info = os.stat(path)
+    if info.st_uid != os.getuid():
+        raise PermissionError(f"{path} is owned by another user")
+    if stat.S_IMODE(info.st_mode) != DIRECTORY_MODE:
+        os.chmod(path, DIRECTORY_MODE)
+    return path
+
+
+def create_private_file(path):
+    """Create the new file `path` readable by the current user only, and return it open for binary writes"""
+    return os.fdopen(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), FILE_MODE), "wb")
@@ -0,0 +1,207 @@
+# coding: utf-8
+
+"""
+Alteryx Server API V3
+
+
+Client side rate limiter of the REST clients.
+"""
+
+from __future__ import absolute_import
+
+import asyncio
+import contextlib
+import contextvars
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Priority lanes, interactive requests are served before background ones
+INTERACTIVE = 0
+BACKGROUND = 1
+LANES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+# Lane of the requests made in the current task or thread
+request_priority = contextvars.ContextVar("request_priority", default=INTERACTIVE)
+
+# e.g. /webapi/v3/workflows/{workflowId}/package -> workflows
+_ENDPOINT_CLASS = re.compile(r"/v\d+/([^/?]+)")
+
+
+def set_background_priority():
+    """Send the requests of the current task with the background priority, e.g. at the start of a sync task"""
+    request_priority.set(BACKGROUND)
+
+
+@contextlib.contextmanager
+def background_priority():
+    """Send the requests made in the block with the background priority"""
+    token = request_priority.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+
+def endpoint_class(url):
+    """Return the resource a URL belongs to, e.g. `workflows` or `jobs`, used to pick its rate limit"""
+    path = urlsplit(url).path
+    match = _ENDPOINT_CLASS.search(path)
+    if match:
+        return match.group(1).lower()
+    return path.rstrip("/").rsplit("/", 1)[-1].lower() or "/"
+
+
+class _LaneStats(object):
+    def __init__(self):
+        self.requests = 0
+        self.waited = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+
+class TokenBucket(object):
+    """Token bucket refilled at `rate` tokens per second up to `capacity` tokens.
+
+    Background requests only take a token when no interactive request is waiting for one.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        # number of requests waiting in each lane
+        self.waiting = {lane: 0 for lane in LANES}
+        self._lock = threading.Lock()
+
+    def take(self, lane):
+        """Take a token and return 0, or return the seconds to wait before trying again"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if lane == BACKGROUND and self.waiting[INTERACTIVE]:
+                # Let the interactive requests have the next tokens
+                return max(1.0 - self.tokens, 1.0) / self.rate
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return 0.0
+            return (1.0 - self.tokens) / self.rate
+
+
+class RateLimiter(object):
+    """Token buckets limiting the requests sent to each host and to each endpoint class of a host.
+
+    Every request takes a token from the bucket of its host, refilled at
+    `rate_limit_requests_per_second` up to `rate_limit_burst`, and from the bucket of its
+    endpoint class (e.g. `jobs`, `workflows`) when `rate_limit_classes` sets a rate for it.
+    Requests wait in one of two lanes: the interactive lane (the default) is always served
+    before the background lane, which catalog syncs and bulk indexing use through
+    `background_priority`. The time spent waiting is recorded per lane.
+
+    The settings are read from the configuration, a rate of 0 disables the limiter.
+
+    :param configuration: the Configuration holding the rate limit settings.
+    """
+
+    def __init__(self, configuration):
+        self.configuration = configuration
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._stats = {lane: _LaneStats() for lane in LANES}
+
+    def _buckets_for(self, url):
+        configuration = self.configuration
+        host = urlsplit(url).netloc
+        keys = []
+        if configuration.rate_limit_requests_per_second > 0:
+            keys.append((host, None, configuration.rate_limit_requests_per_second, configuration.rate_limit_burst))
+        resource = endpoint_class(url)
+        rate = configuration.rate_limit_classes.get(resource, 0)
+        if rate > 0:
+            keys.append((host, resource, rate, max(1.0, rate * 2)))
+        buckets = []
+        with self._lock:
+            for host, resource, rate, capacity in keys:
+                bucket = self._buckets.get((host, resource))
+                if bucket is None or bucket.rate != rate or bucket.capacity != max(1.0, capacity):
+                    bucket = self._buckets[(host, resource)] = TokenBucket(rate, capacity)
+                buckets.append(bucket)
+        return buckets
+
+    def acquire(self, url):
+        """Block until the request to `url` may be sent, and return the seconds waited"""
+        lane = request_priority.get()
+        started_at = time.monotonic()
+        for bucket in self._buckets_for(url):
+            self._enter(bucket, lane)
+            try:
+                while True:
+                    delay = bucket.take(lane)
+                    if not delay:
+                        break
+                    time.sleep(delay)
+            finally:
+                self._leave(bucket, lane)
+        return self._record(lane, time.monotonic() - started_at)
+
+    async def acquire_async(self, url):
+        """Wait without blocking the event loop until the request to `url` may be sent, return the seconds waited"""
+        lane = request_priority.get()
+        started_at = time.monotonic()
+        for bucket in self._buckets_for(url):
+            self._enter(bucket, lane)
+            try:
+                while True:
+                    delay = bucket.take(lane)
+                    if not delay:
+                        break
+                    await asyncio.sleep(delay)
+            finally:
+                self._leave(bucket, lane)
+        return self._record(lane, time.monotonic() - started_at)
+
+    def stats(self):
+        """Return the requests, the number of waits and the time waited in each lane, and the tokens per bucket"""
+        with self._lock:
+            lanes = {
+                LANES[lane]: {
+                    "requests": stats.requests,
+                    "waited": stats.waited,
+                    "wait_seconds": round(stats.wait_seconds, 3),
+                    "average_wait_seconds": round(stats.wait_seconds / stats.requests, 4) if stats.requests else None,
+                    "max_wait_seconds": round(stats.max_wait_seconds, 3),
+                }
+                for lane, stats in self._stats.items()
+            }
+            buckets = {
+                f"{host}/{resource}" if resource else host: {
+                    "rate": bucket.rate,
+                    "capacity": bucket.capacity,
+                    "tokens": round(bucket.tokens, 2),
+                    "waiting": sum(bucket.waiting.values()),
+                }
+                for (host, resource), bucket in self._buckets.items()
+            }
+        return {"requests_per_second": self.configuration.rate_limit_requests_per_second, "lanes": lanes,
+                "buckets": buckets}
+
+    def _enter(self, bucket, lane):
+        with bucket._lock:
+            bucket.waiting[lane] += 1
+
+    def _leave(self, bucket, lane):
+        with bucket._lock:
+            bucket.waiting[lane] -= 1
+
+    def _record(self, lane, waited):
+        with self._lock:
+            stats = self._stats[lane]
+            stats.requests += 1
+            if waited > 0.001:
+                stats.waited += 1
+                stats.wait_seconds += waited
+                stats.max_wait_seconds = max(stats.max_wait_seconds, waited)
+        return waited
@@ -12,16 +12,15 @@ Generated by: https://github.com/swagger-api/swagger-codegen.git
 
 from __future__ import absolute_import
 
+import asyncio
 import io
-import json
 import logging
 import re
 import ssl
+import time
 
 import certifi
 
-# python 2 and python 3 compatibility library
-import six
 from urllib.parse import urlencode
 
 try:
@@ -29,16 +28,147 @@ try:
 except ImportError:
     raise ImportError("Swagger python client requires urllib3.")
 
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+from src.server_client.http_cache import DROPPED_HEADERS
+
 
 logger = logging.getLogger(__name__)
 
 
+def _decode_body(content):
+    """Decodes a body as UTF-8 text, bodies that are not valid UTF-8 (binary files) are kept as bytes"""
+    try:
+        return content.decode("utf8")
+    except UnicodeDecodeError:
+        return content
+
+
+def _cached_headers(entry):
+    return list(entry["headers"]) + [("Content-Length", str(len(entry["body"])))]
+
+
+def _cached_response(entry, _preload_content):
+    """Response serving an entry of the HTTP cache, like the responses of `RESTClientObject.request`"""
+    response = urllib3.HTTPResponse(
+        body=io.BytesIO(entry["body"]),
+        headers=_cached_headers(entry),
+        status=entry["status"],
+        reason="OK",
+        preload_content=_preload_content,
+    )
+    return RESTResponse(response) if _preload_content else response
+
+
+def _async_cached_response(entry, _preload_content):
+    """Response serving an entry of the HTTP cache, like the responses of `AsyncRESTClientObject.request`"""
+    if _preload_content:
+        return AsyncRESTResponse(httpx.Response(entry["status"], headers=_cached_headers(entry), content=entry["body"]))
+    return httpx.Response(entry["status"], headers=_cached_headers(entry), stream=httpx.ByteStream(entry["body"]))
+
+
+def _replayed_entry(response):
+    headers = response.getheaders()
+    return {
+        "status": response.status,
+        "headers": [(k, v) for k, v in headers.items() if k.lower() not in DROPPED_HEADERS],
+        "body": response.content,
+    }
+
+
+def replay_response(response, _preload_content):
+    """New response serving the status, headers and body of a preloaded `RESTResponse`, read from the start"""
+    return _cached_response(_replayed_entry(response), _preload_content)
+
+
+def replay_async_response(response, _preload_content):
+    """New response serving the status, headers and body of a preloaded `AsyncRESTResponse`, read from the start"""
+    return _async_cached_response(_replayed_entry(response), _preload_content)
+
+
+class _CachingResponse(object):
+    """Streamed urllib3 response whose body is written to the HTTP cache as the caller reads it"""
+
+    def __init__(self, response, writer):
+        self.urllib3_response = response
+        self.writer = writer
+
+    def __getattr__(self, name):
+        return getattr(self.urllib3_response, name)
+
+    @property
+    def data(self):
+        return self.read()
+
+    def read(self, amt=None, decode_content=None, **kwargs):
+        data = self.urllib3_response.read(amt, decode_content=decode_content, **kwargs)
+        if decode_content is False:
+            # The cache stores the decoded body
+            self.writer.discard()
+            return data
+        self.writer.write(data)
+        if amt is None or not data:
+            self.writer.commit()
+        return data
+
+    def readinto(self, b):
+        read = self.urllib3_response.readinto(b)
+        if read:
+            self.writer.write(memoryview(b)[:read])
+        else:
+            self.writer.commit()
+        return read
+
+    def release_conn(self):
+        if not self.writer.closed and self.urllib3_response.length_remaining == 0:
+            # The caller stopped at the Content-Length, read the end of the body
+            self.read()
+        if not self.writer.closed:
+            self.writer.discard()
+        self.urllib3_response.release_conn()
+
+
+class _CachingStream(httpx.AsyncByteStream if httpx is not None else object):
+    """Body of a streamed httpx response, written to the HTTP cache as the caller reads it"""
+
+    def __init__(self, stream, writer):
+        self.stream = stream
+        self.writer = writer
+
+    async def __aiter__(self):
+        async for chunk in self.stream:
+            await asyncio.to_thread(self.writer.write, chunk)
+            yield chunk
+        await asyncio.to_thread(self.writer.commit)
+
+    async def aclose(self):
+        if not self.writer.closed:
+            await asyncio.to_thread(self.writer.discard)
+        await self.stream.aclose()
+
+
 class RESTResponse(io.IOBase):
     def __init__(self, resp):
         self.urllib3_response = resp
         self.status = resp.status
         self.reason = resp.reason
-        self.data = resp.data
+        # Raw body, only decoded to text when `data` is read, so binary bodies are never copied
+        self.content = resp.data
+        self._data = None
+
+    @property
+    def data(self):
+        """Body decoded as text, or bytes if it is not valid UTF-8"""
+        if self._data is None:
+            self._data = _decode_body(self.content)
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
 
     def getheaders(self):
         """Returns a dictionary of the response headers."""
@@ -49,6 +179,35 @@ class RESTResponse(io.IOBase):
         return self.urllib3_response.headers.get(name, default)
 
 
+class AsyncRESTResponse(io.IOBase):
+    def __init__(self, resp):
+        self.httpx_response = resp
+        self.status = resp.status_code
+        self.reason = resp.reason_phrase
+        # Raw body, only decoded to text when `data` is read, so binary bodies are never copied
+        self.content = resp.content
+        self._data = None
+
+    @property
+    def data(self):
+        """Body decoded as text, or bytes if it is not valid UTF-8"""
+        if self._data is None:
+            self._data = _decode_body(self.content)
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+    def getheaders(self):
+        """Returns a dictionary of the response headers."""
+        return self.httpx_response.headers
+
+    def getheader(self, name, default=None):
+        """Returns a given response header."""
+        return self.httpx_response.headers.get(name, default)
+
+
 class RESTClientObject(object):
     def __init__(self, configuration, pools_size=4, maxsize=None):
         # urllib3.PoolManager will pass all kw parameters to connectionpool
@@ -70,7 +229,17 @@ class RESTClientObject(object):
             # if not set certificate file, use Mozilla's root certificates.
             ca_certs = certifi.where()
 
+        # codec used to encode json request bodies
+        self.json_codec = configuration.json_codec
+        # decides which failed requests are retried
+        self.retry_policy = configuration.retry_policy
+        self.rate_limiter = configuration.rate_limiter
+        self.circuit_breakers = configuration.circuit_breakers
+        self.http_cache = configuration.http_cache
+
         addition_pool_args = {}
+        # Failed attempts are retried by `request` according to the retry policy, urllib3 only follows redirects
+        addition_pool_args["retries"] = urllib3.Retry(total=None, connect=0, read=0, other=0, status=0, redirect=3)
         if configuration.assert_hostname is not None:
             addition_pool_args["assert_hostname"] = configuration.assert_hostname  # noqa: E501
 
@@ -114,7 +283,11 @@ class RESTClientObject(object):
         _preload_content=True,
         _request_timeout=None,
     ):
-        """Perform requests.
+        """Perform requests, retrying the failed attempts as decided by the retry policy.
+
+        Every attempt waits for a token of the rate limiter first. GET responses
+        are served from the HTTP cache while fresh, and revalidated with
+        conditional requests when they have validators, see `HttpCache`.
 
         :param method: http request method
         :param url: http request url
@@ -132,6 +305,84 @@ class RESTClientObject(object):
                                  timeout. It can also be a pair (tuple) of
                                  (connection, read) timeouts.
         """
+        cache = self.http_cache
+        key = cache.key(method, url, query_params, headers)
+        entry = cache.lookup(key) if key else None
+        if entry is not None:
+            if cache.is_fresh(entry):
+                return _cached_response(entry, _preload_content)
+            headers = cache.conditional_headers(entry, headers) or headers
+        try:
+            response = self._send(method, url, query_params, headers, body, post_params, _preload_content,
+                                  _request_timeout)
+        except ApiException as e:
+            if entry is None or e.status != 304:
+                raise
+            return _cached_response(cache.not_modified(key, entry, e.headers), _preload_content)
+        if key and response.status == 200:
+            response = self._store(key, url, response, _preload_content)
+        return response
+
+    def _store(self, key, url, response, _preload_content):
+        """Store a response in the HTTP cache, return the response to pass on"""
+        cache = self.http_cache
+        if _preload_content:
+            cache.store(key, url, response.status, response.getheaders(), response.content)
+            return response
+        writer = cache.writer(key, url, response.status, response.headers)
+        return _CachingResponse(response, writer) if writer is not None else response
+
+    def _send(self, method, url, query_params, headers, body, post_params, _preload_content, _request_timeout):
+        """Perform the attempts of a request, see `request`."""
+        call = self.retry_policy.start()
+        breaker = self.circuit_breakers.current(url)
+        while True:
+            # Raises CircuitOpenError while the endpoint is failing, outside of the retried block and before
+            # taking a request from the rate limit, a rejected call does not delay the other ones
+            probe = breaker.before_call() if breaker is not None else False
+            try:
+                self.rate_limiter.acquire(url)
+                started_at = time.monotonic()
+                response = self._request(
+                    method,
+                    url,
+                    query_params=query_params,
+                    # The headers are changed by an attempt
+                    headers=dict(headers or {}),
+                    body=body,
+                    post_params=post_params,
+                    _preload_content=_preload_content,
+                    _request_timeout=_request_timeout,
+                )
+            except ApiException as e:
+                if breaker is not None:
+                    breaker.after_call(probe, time.monotonic() - started_at, e)
+                delay = self.retry_policy.next_delay(call, method, e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            except BaseException:
+                if breaker is not None:
+                    breaker.cancelled(probe)
+                raise
+            if breaker is not None:
+                breaker.after_call(probe, time.monotonic() - started_at)
+            self.retry_policy.succeeded(call)
+            return response
+
+    def _request(
+        self,
+        method,
+        url,
+        query_params=None,
+        headers=None,
+        body=None,
+        post_params=None,
+        _preload_content=True,
+        _request_timeout=None,
+    ):
+        """Perform one attempt of a request, see `request`."""
         method = method.upper()
         assert method in ["GET", "HEAD", "DELETE", "POST", "PUT", "PATCH", "OPTIONS"]
 
@@ -159,7 +410,7 @@ class RESTClientObject(object):
                 if re.search("json", headers["Content-Type"], re.IGNORECASE):
                     request_body = "{}"
                     if body is not None:
-                        request_body = json.dumps(body)
+                        request_body = self.json_codec.dumpb(body)
                     r = self.pool_manager.request(
                         method,
                         url,
@@ -216,25 +467,18 @@ class RESTClientObject(object):
                 r = self.pool_manager.request(
                     method, url, fields=query_params, preload_content=_preload_content, timeout=timeout, headers=headers
                 )
-        except urllib3.exceptions.SSLError as e:
+        except urllib3.exceptions.HTTPError as e:
+            # SSL, connection and protocol errors
             msg = "{0}\n{1}".format(type(e).__name__, str(e))
             raise ApiException(status=0, reason=msg)
 
         if _preload_content:
+            # The body is decoded to text when `data` is first read, `content` keeps the raw bytes
             r = RESTResponse(r)
 
-            # In the python 3, the response.data is bytes.
-            # we need to decode it to string.
-            if six.PY3:
-                try:
-                    r.data = r.data.decode("utf8")
-                except UnicodeDecodeError:
-                    # If UTF-8 fails, it is a file that is not UTF-8 encoded.
-                    # create an object with  the buffered
-                    r.data = r.data
-
             # log response body
-            logger.debug("response body: %s", r.data)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("response body: %s", r.data)
 
         if not 200 <= r.status <= 299:
             raise ApiException(http_resp=r)
@@ -357,6 +601,238 @@ class RESTClientObject(object):
         )
 
 
+class AsyncRESTClientObject(object):
+    """asyncio counterpart of `RESTClientObject` built on `httpx.AsyncClient`.
+
+    A single instance holds one connection pool and one SSL context, and every
+    request is awaited on the running event loop instead of blocking a thread.
+    """
+
+    def __init__(self, configuration, maxsize=None):
+        if httpx is None:
+            raise ImportError("The asyncio transport requires httpx.")
+
+        # codec used to encode json request bodies
+        self.json_codec = configuration.json_codec
+        # decides which failed requests are retried
+        self.retry_policy = configuration.retry_policy
+        self.rate_limiter = configuration.rate_limiter
+        self.circuit_breakers = configuration.circuit_breakers
+        self.http_cache = configuration.http_cache
+
+        # ca_certs
+        if configuration.ssl_ca_cert:
+            ca_certs = configuration.ssl_ca_cert
+        else:
+            # if not set certificate file, use Mozilla's root certificates.
+            ca_certs = certifi.where()
+
+        # One SSL context for every connection of the pool
+        ssl_context = ssl.create_default_context(cafile=ca_certs)
+        if not configuration.verify_ssl:
+            ssl_context.check_hostname = False
+            ssl_context.verify_mode = ssl.CERT_NONE
+        elif configuration.assert_hostname is False:
+            ssl_context.check_hostname = False
+        if configuration.cert_file:
+            ssl_context.load_cert_chain(configuration.cert_file, configuration.key_file)
+
+        if maxsize is None:
+            if configuration.connection_pool_maxsize is not None:
+                maxsize = configuration.connection_pool_maxsize
+            else:
+                maxsize = 4
+
+        self.client = httpx.AsyncClient(
+            verify=ssl_context,
+            proxy=configuration.proxy,
+            limits=httpx.Limits(max_connections=maxsize, max_keepalive_connections=maxsize),
+            # urllib3 does not time out by default, keep the same behaviour
+            timeout=None,
+        )
+
+    async def close(self):
+        """Close the underlying connection pool."""
+        await self.client.aclose()
+
+    async def request(
+        self,
+        method,
+        url,
+        query_params=None,
+        headers=None,
+        body=None,
+        post_params=None,
+        _preload_content=True,
+        _request_timeout=None,
+    ):
+        """Perform requests, retrying the failed attempts as decided by the retry policy.
+
+        Every attempt waits for a token of the rate limiter first, and GET
+        responses go through the HTTP cache. Takes the same parameters as
+        `RESTClientObject.request`. When `_preload_content` is False the
+        streaming `httpx.Response` is returned and the caller is responsible
+        for closing it.
+        """
+        cache = self.http_cache
+        key = cache.key(method, url, query_params, headers)
+        # The disk tier of the cache is read and written in a thread
+        entry = await asyncio.to_thread(cache.lookup, key) if key else None
+        if entry is not None:
+            if cache.is_fresh(entry):
+                return _async_cached_response(entry, _preload_content)
+            headers = cache.conditional_headers(entry, headers) or headers
+        try:
+            response = await self._send(method, url, query_params, headers, body, post_params, _preload_content,
+                                        _request_timeout)
+        except ApiException as e:
+            if entry is None or e.status != 304:
+                raise
+            entry = await asyncio.to_thread(cache.not_modified, key, entry, e.headers)
+            return _async_cached_response(entry, _preload_content)
+        status = response.status if _preload_content else response.status_code
+        if key and status == 200:
+            response = await self._store(key, url, response, _preload_content)
+        return response
+
+    async def _store(self, key, url, response, _preload_content):
+        """Store a response in the HTTP cache, return the response to pass on"""
+        cache = self.http_cache
+        if _preload_content:
+            await asyncio.to_thread(cache.store, key, url, response.status, response.getheaders(), response.content)
+            return response
+        # The raw chunks are stored, along with their Content-Encoding
+        encoded = response.headers.get("Content-Encoding", "identity") != "identity"
+        writer = await asyncio.to_thread(cache.writer, key, url, response.status_code, response.headers, encoded)
+        if writer is not None:
+            response.stream = _CachingStream(response.stream, writer)
+        return response
+
+    async def _send(self, method, url, query_params, headers, body, post_params, _preload_content, _request_timeout):
+        """Perform the attempts of a request, see `request`."""
+        call = self.retry_policy.start()
+        breaker = self.circuit_breakers.current(url)
+        while True:
+            # Raises CircuitOpenError while the endpoint is failing, outside of the retried block and before
+            # taking a request from the rate limit, a rejected call does not delay the other ones
+            probe = breaker.before_call() if breaker is not None else False
+            try:
+                await self.rate_limiter.acquire_async(url)
+                started_at = time.monotonic()
+                response = await self._request(
+                    method,
+                    url,
+                    query_params=query_params,
+                    # The headers are changed by an attempt
+                    headers=dict(headers or {}),
+                    body=body,
+                    post_params=post_params,
+                    _preload_content=_preload_content,
+                    _request_timeout=_request_timeout,
+                )
+            except ApiException as e:
+                if breaker is not None:
+                    breaker.after_call(probe, time.monotonic() - started_at, e)
+                delay = self.retry_policy.next_delay(call, method, e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                if breaker is not None:
+                    breaker.cancelled(probe)
+                raise
+            if breaker is not None:
+                breaker.after_call(probe, time.monotonic() - started_at)
+            self.retry_policy.succeeded(call)
+            return response
+
+    async def _request(
+        self,
+        method,
+        url,
+        query_params=None,
+        headers=None,
+        body=None,
+        post_params=None,
+        _preload_content=True,
+        _request_timeout=None,
+    ):
+        """Perform one attempt of a request, see `request`."""
+        method = method.upper()
+        assert method in ["GET", "HEAD", "DELETE", "POST", "PUT", "PATCH", "OPTIONS"]
+
+        if post_params and body:
+            raise ValueError("body parameter cannot be used with post_params parameter.")
+
+        post_params = post_params or {}
+        headers = headers or {}
+
+        timeout = httpx.USE_CLIENT_DEFAULT
+        if _request_timeout:
+            if isinstance(_request_timeout, (int, float)):
+                timeout = httpx.Timeout(_request_timeout)
+            elif isinstance(_request_timeout, tuple) and len(_request_timeout) == 2:
+                timeout = httpx.Timeout(None, connect=_request_timeout[0], read=_request_timeout[1])
+
+        if "Content-Type" not in headers:
+            headers["Content-Type"] = "application/json"
+
+        request_args = {}
+        # For `POST`, `PUT`, `PATCH`, `OPTIONS`, `DELETE`
+        if method in ["POST", "PUT", "PATCH", "OPTIONS", "DELETE"]:
+            if query_params:
+                url += "?" + urlencode(query_params)
+            if re.search("json", headers["Content-Type"], re.IGNORECASE):
+                request_args["content"] = self.json_codec.dumpb(body) if body is not None else "{}"
+            elif headers["Content-Type"] == "application/x-www-form-urlencoded":  # noqa: E501
+                request_args["data"] = dict(post_params)
+            elif headers["Content-Type"] == "multipart/form-data":
+                # must del headers['Content-Type'], or the correct
+                # Content-Type which generated by httpx will be
+                # overwritten.
+                del headers["Content-Type"]
+                request_args["data"] = {k: v for k, v in post_params if not isinstance(v, tuple)}
+                request_args["files"] = [(k, v) for k, v in post_params if isinstance(v, tuple)]
+            # Pass a `string` parameter directly in the body to support
+            # other content types than Json when `body` argument is
+            # provided in serialized form
+            elif isinstance(body, str):
+                request_args["content"] = body
+            else:
+                # Cannot generate the request from given parameters
+                msg = """Cannot prepare a request message for provided
+                         arguments. Please check that your arguments match
+                         declared content type."""
+                raise ApiException(status=0, reason=msg)
+        # For `GET`, `HEAD`
+        else:
+            request_args["params"] = query_params
+
+        try:
+            request = self.client.build_request(method, url, headers=headers, timeout=timeout, **request_args)
+            r = await self.client.send(request, stream=not _preload_content)
+        except httpx.TransportError as e:
+            msg = "{0}\n{1}".format(type(e).__name__, str(e))
+            raise ApiException(status=0, reason=msg)
+
+        if _preload_content:
+            # The body is decoded to text when `data` is first read, `content` keeps the raw bytes
+            r = AsyncRESTResponse(r)
+
+            # log response body
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("response body: %s", r.data)
+
+            if not 200 <= r.status <= 299:
+                raise ApiException(http_resp=r)
+        elif not 200 <= r.status_code <= 299:
+            await r.aread()
+            raise ApiException(http_resp=AsyncRESTResponse(r))
+
+        return r
+
+
 class ApiException(Exception):
     def __init__(self, status=None, reason=None, http_resp=None):
         if http_resp:
@@ -0,0 +1,148 @@
+# coding: utf-8
+
+"""
+Alteryx Server API V3
+
+
+Retry policy of the REST clients.
+"""
+
+from __future__ import absolute_import
+
+import email.utils
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Methods that can be sent again without side effects
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+
+# Status returned when the server rejected the request without processing it, so any method can be retried
+REJECTED_STATUSES = frozenset((429,))
+
+# Status 0 is used by the REST clients for connection errors, timeouts and resets
+CONNECTION_ERROR_STATUS = 0
+
+
+class RetryPolicy(object):
+    """Decides whether a failed request is retried and how long to wait before the next attempt.
+
+    - Idempotent methods are retried on the `retry_statuses` of the configuration
+      (429, 502, 503 and 504 by default) and on connection errors. Other methods
+      are only retried on 429, which the server sends before processing a request.
+    - The wait before attempt `n` is drawn between 0 and
+      `min(retry_backoff_max_seconds, retry_backoff_seconds * 2 ** n)` (full jitter),
+      or follows the `Retry-After` header when the server sends one.
+    - A call makes at most `retry_max_retries` retries, and stops retrying once the
+      waits would exceed its budget of `retry_budget_seconds`.
+
+    The settings are read from the configuration on every call, so they can be
+    changed at any time.
+
+    :param configuration: the Configuration holding the retry settings.
+    """
+
+    def __init__(self, configuration):
+        self.configuration = configuration
+        self._lock = threading.Lock()
+
+        # counters
+        self.calls = 0
+        self.retries = 0
+        self.retried_calls = 0
+        self.recovered_calls = 0
+        self.exhausted_calls = 0
+        self.sleep_seconds = 0.0
+        self.retries_by_reason = {}
+
+    def start(self):
+        """Return the state of a new call, to pass to `next_delay`"""
+        with self._lock:
+            self.calls += 1
+        return {"retries": 0, "deadline": time.monotonic() + self.configuration.retry_budget_seconds}
+
+    def next_delay(self, call, method, exception):
+        """Return the seconds to wait before retrying a call that raised `exception`, or None to give up.
+
+        :param call: the state returned by `start`.
+        :param exception: the `ApiException` raised by the attempt.
+        """
+        reason = self._reason(method, exception)
+        if reason is None:
+            return None
+
+        configuration = self.configuration
+        retry_after = self._retry_after(exception)
+        if retry_after is not None:
+            delay = retry_after
+        else:
+            ceiling = min(
+                configuration.retry_backoff_max_seconds,
+                configuration.retry_backoff_seconds * 2 ** call["retries"],
+            )
+            delay = random.uniform(0, ceiling)
+
+        if call["retries"] >= configuration.retry_max_retries or time.monotonic() + delay > call["deadline"]:
+            if call["retries"]:
+                with self._lock:
+                    self.exhausted_calls += 1
+            return None
+
+        with self._lock:
+            if not call["retries"]:
+                self.retried_calls += 1
+            self.retries += 1
+            self.sleep_seconds += delay
+            self.retries_by_reason[reason] = self.retries_by_reason.get(reason, 0) + 1
+        call["retries"] += 1
+        logger.info(f"Retrying {method} in {delay:.2f}s after {reason} (retry {call['retries']})")
+        return delay
+
+    def succeeded(self, call):
+        """Record that a call succeeded, after retries or not"""
+        if call["retries"]:
+            with self._lock:
+                self.recovered_calls += 1
+
+    def stats(self):
+        """Return the retry counters"""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "retries": self.retries,
+                "retried_calls": self.retried_calls,
+                "recovered_calls": self.recovered_calls,
+                "exhausted_calls": self.exhausted_calls,
+                "sleep_seconds": round(self.sleep_seconds, 3),
+                "retries_by_reason": dict(self.retries_by_reason),
+            }
+
+    def _reason(self, method, exception):
+        """Return the reason to retry, e.g. `status 503` or `connection error`, or None if it must not be retried"""
+        status = exception.status
+        if status in REJECTED_STATUSES:
+            return f"status {status}"
+        if method.upper() not in IDEMPOTENT_METHODS:
+            return None
+        if status == CONNECTION_ERROR_STATUS:
+            return "connection error"
+        if status in self.configuration.retry_statuses:
+            return f"status {status}"
+        return None
+
+    def _retry_after(self, exception):
+        """Return the wait asked by the `Retry-After` header of the response, in seconds or as an HTTP date"""
+        value = exception.headers.get("Retry-After") if exception.headers else None
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            retry_at = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, retry_at.timestamp() - time.time())
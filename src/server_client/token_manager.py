@@ -0,0 +1,213 @@
+# coding: utf-8
+
+"""
+Alteryx Server API V3
+
+
+OAuth2 client credentials token management.
+"""
+
+from __future__ import absolute_import
+
+import asyncio
+import logging
+import threading
+import time
+from base64 import b64encode
+
+logger = logging.getLogger(__name__)
+
+
+class TokenManager(object):
+    """Caches the OAuth2 client credentials access token together with its expiry.
+
+    - A token close to its expiry is refreshed in the background while the
+      current one keeps being used.
+    - A missing or expired token is fetched before the request is sent;
+      concurrent callers share a single token request (single-flight).
+    - `invalidate` drops a token the server rejected with 401 so that the
+      next call fetches a new one.
+    - A failed token request raises its error to every caller waiting for it.
+      For `failure_backoff_seconds` afterwards the calls needing a token fail
+      fast with the same error instead of sending more token requests.
+
+    Token requests go through the REST client of the calling `ApiClient`, so
+    they reuse its connection pool.
+
+    :param configuration: the Configuration holding the client credentials.
+    """
+
+    def __init__(self, configuration):
+        self.configuration = configuration
+        # Refresh the token this many seconds before it expires
+        self.refresh_margin_seconds = 60
+        # Seconds during which the error of a failed token request is raised again without a new request
+        self.failure_backoff_seconds = 5
+        # monotonic time and error of the last failed token request, None after a success
+        self.failed_at = None
+        self.last_error = None
+        # monotonic time at which the current token expires, None if unknown
+        self.expires_at = None
+
+        self._lock = threading.Lock()
+        # True while a background refresh thread runs, guarded by `_refreshing_lock`
+        self._refreshing = False
+        self._refreshing_lock = threading.Lock()
+        self._refresh_task = None
+
+        # counters
+        self.refresh_count = 0
+        self.invalidation_count = 0
+        self.failure_count = 0
+
+    @property
+    def enabled(self):
+        """True if client credentials are configured."""
+        return bool(self.configuration.client_id and self.configuration.client_secret)
+
+    @property
+    def access_token(self):
+        return self.configuration.access_token
+
+    def is_valid(self):
+        """True if there is a token that has not expired yet."""
+        if not self.access_token:
+            return False
+        return self.expires_at is None or time.monotonic() < self.expires_at
+
+    def needs_refresh(self):
+        """True if the token is still valid but about to expire."""
+        if self.expires_at is None:
+            return False
+        return time.monotonic() >= self.expires_at - self.refresh_margin_seconds
+
+    def backing_off(self):
+        """True while the last token request failed less than `failure_backoff_seconds` ago."""
+        return self.failed_at is not None and time.monotonic() - self.failed_at < self.failure_backoff_seconds
+
+    def invalidate(self, token):
+        """Drops `token` if it is still the current one.
+
+        Callers that got a 401 with the same token only trigger one refresh.
+        """
+        if token and token == self.access_token:
+            self.configuration.access_token = ""
+            self.expires_at = None
+            self.invalidation_count += 1
+
+    def get_token(self, rest_client):
+        """Returns a valid access token, fetching it with `rest_client` if needed.
+
+        :param rest_client: RESTClientObject used to call the token endpoint.
+        """
+        if not self.enabled:
+            return self.access_token
+        if self.is_valid():
+            if self.needs_refresh() and not self.backing_off():
+                self._start_refresh_thread(rest_client)
+            return self.access_token
+
+        with self._lock:
+            # Another thread may have fetched the token, or failed to, while we were waiting
+            if not self.is_valid():
+                if self.backing_off():
+                    raise self.last_error
+                self._fetch(rest_client)
+        return self.access_token
+
+    async def get_token_async(self, rest_client):
+        """Returns a valid access token, fetching it with `rest_client` if needed.
+
+        :param rest_client: AsyncRESTClientObject used to call the token endpoint.
+        """
+        if not self.enabled:
+            return self.access_token
+        if self.is_valid():
+            if self.needs_refresh() and not self.backing_off():
+                self._start_refresh_task(rest_client)
+            return self.access_token
+
+        pending = self._refresh_task is not None and not self._refresh_task.done()
+        if not pending and self.backing_off():
+            raise self.last_error
+        # Share the pending refresh, if any, instead of sending another token request
+        await asyncio.shield(self._start_refresh_task(rest_client))
+        return self.access_token
+
+    def _start_refresh_thread(self, rest_client):
+        """Start one background refresh thread, however many callers see the token about to expire"""
+        with self._refreshing_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh_if_needed, args=(rest_client,), daemon=True).start()
+
+    def _refresh_if_needed(self, rest_client):
+        try:
+            with self._lock:
+                if not self.is_valid() or self.needs_refresh():
+                    self._fetch(rest_client)
+        except Exception as e:
+            # The current token is still used until it expires
+            logger.error(f"Error refreshing access token: {e}")
+        finally:
+            with self._refreshing_lock:
+                self._refreshing = False
+
+    def _start_refresh_task(self, rest_client):
+        """Return the pending refresh task, or start one"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.get_running_loop().create_task(self._fetch_async(rest_client))
+            self._refresh_task.add_done_callback(self._log_refresh_error)
+        return self._refresh_task
+
+    def _log_refresh_error(self, task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Error refreshing access token: {task.exception()}")
+
+    def _token_request(self):
+        """Returns the url, headers and form fields of a client credentials token request."""
+        credentials = f"{self.configuration.client_id}:{self.configuration.client_secret}"
+        headers = {
+            "Authorization": f"Basic {b64encode(credentials.encode()).decode()}",
+            "Content-Type": "application/x-www-form-urlencoded",
+        }
+        url = self.configuration.host.rstrip("/") + self.configuration.token_url
+        return url, headers, {"grant_type": "client_credentials"}
+
+    def _store(self, response):
+        token_data = self.configuration.json_codec.loads(response.data)
+        self.configuration.access_token = token_data.get("access_token") or ""
+        expires_in = token_data.get("expires_in")
+        if expires_in:
+            expires_in = float(expires_in)
+            self.expires_at = time.monotonic() + expires_in
+            # Never refresh more than half way through the token lifetime
+            self.refresh_margin_seconds = min(self.refresh_margin_seconds, expires_in / 2)
+        else:
+            self.expires_at = None
+        self.refresh_count += 1
+
+    def _failed(self, error):
+        """Record a failed token request, its error is raised again while `backing_off`"""
+        self.failed_at = time.monotonic()
+        self.last_error = error
+        self.failure_count += 1
+
+    def _fetch(self, rest_client):
+        url, headers, fields = self._token_request()
+        try:
+            self._store(rest_client.request("POST", url, headers=headers, post_params=fields))
+        except Exception as e:
+            self._failed(e)
+            raise
+        self.failed_at = None
+
+    async def _fetch_async(self, rest_client):
+        url, headers, fields = self._token_request()
+        try:
+            self._store(await rest_client.request("POST", url, headers=headers, post_params=fields))
+        except Exception as e:
+            self._failed(e)
+            raise
+        self.failed_at = None
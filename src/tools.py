@@ -1,15 +1,25 @@
+import asyncio
 import src.server_client as server_client
 from src.server_client.rest import ApiException
-from typing import List, Optional, Dict, Any
-import pprint
+from src.catalog_cache import CatalogCache
+from src.catalog_store import CatalogStore
+from src.dependency_index import DependencyIndex
+from src.job_watcher import JobWatcher
+from src.package_cache import PackageCache
+from src.workflow_graph import WorkflowGraph
+from src.workflow_package import WorkflowPackageError, read_tool_list, read_workflow_xml, write_file
+from src.output import decode_cursor, page, render_list, to_data
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 import tempfile
-import zipfile
 import os
-import shutil
 from pydantic import BaseModel
 import xml.etree.ElementTree as ET
 import time
-import xmltodict
+
+
+def _not_none(**kwargs) -> Dict[str, Any]:
+    """Keep the filters that were given, so that the API call only sends those"""
+    return {key: value for key, value in kwargs.items() if value is not None}
 
 
 class InputData(BaseModel):
@@ -21,144 +31,342 @@ class AYXMCPTools:
     def __init__(self):
         """Initialize the Alteryx Server Client with API instances"""
         self.configuration = server_client.Configuration()
-        self.collections_api = server_client.CollectionsApi(server_client.ApiClient(self.configuration))
-        self.workflows_api = server_client.WorkflowsApi(server_client.ApiClient(self.configuration))
-        self.users_api = server_client.UsersApi(server_client.ApiClient(self.configuration))
-        self.jobs_api = server_client.JobsApi(server_client.ApiClient(self.configuration))
-        self.credentials_api = server_client.CredentialsApi(server_client.ApiClient(self.configuration))
-        self.dcm_api = server_client.DCMEApi(server_client.ApiClient(self.configuration))
-        self.schedules_api = server_client.SchedulesApi(server_client.ApiClient(self.configuration))
+        # A single ApiClient is shared by every API facade so that all calls go through
+        # one connection pool and one SSL context. The asyncio client makes every
+        # API call awaitable so that tools never block the MCP event loop.
+        self.api_client = server_client.AsyncApiClient(self.configuration)
+        self.collections_api = server_client.CollectionsApi(self.api_client)
+        self.workflows_api = server_client.WorkflowsApi(self.api_client)
+        self.users_api = server_client.UsersApi(self.api_client)
+        self.jobs_api = server_client.JobsApi(self.api_client)
+        self.credentials_api = server_client.CredentialsApi(self.api_client)
+        self.dcm_api = server_client.DCMEApi(self.api_client)
+        self.schedules_api = server_client.SchedulesApi(self.api_client)
+        # Shared poller for every caller waiting on a job
+        self.job_watcher = JobWatcher(self.jobs_api, self.configuration.job_poll_requests_per_second)
+        # Shared cache of the catalog objects read by the tools, invalidated by the mutating tools
+        self.catalog_cache = CatalogCache(
+            self.configuration.catalog_cache_max_entries, self.configuration.catalog_cache_ttl_seconds
+        )
+        # Workflow packages of the published versions, on disk
+        self.package_cache = PackageCache(
+            os.path.join(os.path.normpath(self.configuration.temp_directory), "packages"),
+            self.configuration.package_cache_max_bytes,
+        )
+        # Optional on-disk mirror of the catalog lists
+        self.catalog_store = None
+        if self.configuration.catalog_store_enabled:
+            self.catalog_store = CatalogStore(
+                os.path.join(os.path.normpath(self.configuration.temp_directory), "catalog", "alteryx_catalog.sqlite3"),
+                self.configuration.json_codec,
+                self.configuration.catalog_full_sync_seconds,
+                self.configuration.catalog_incremental_sync_seconds,
+            )
+        # Connections, credentials and file paths used by the published workflows
+        self.dependency_index = DependencyIndex(
+            self.configuration.dependency_index_concurrency,
+            self.configuration.dependency_index_refresh_seconds,
+            self.configuration.parse_workers,
+        )
+
+    async def close(self):
+        """Close the connection pool shared by the API facades and the catalog store"""
+        self.dependency_index.close()
+        await self.api_client.close()
+        if self.catalog_store is not None:
+            self.catalog_store.close()
+
+    async def _get_json(self, entity: str, api_method: Callable, object_id: Optional[str] = None, **filters):
+        """Read an object, or a list if `object_id` is None, as decoded JSON through the catalog cache"""
+        args = (object_id,) if object_id is not None else ()
+        variant = ("json", api_method.__name__, tuple(sorted(filters.items())))
+        return await self.catalog_cache.get_or_load(
+            entity, object_id, variant, lambda: self.api_client.call_json(api_method, *args, **filters)
+        )
+
+    async def _get_list(self, entity: str, api_method: Callable, **filters):
+        """Read a list from the catalog store if it can answer the filters, otherwise like `_get_json`"""
+        if self.catalog_store is not None and self.catalog_store.can_serve(entity, filters):
+            return await self.catalog_store.list(
+                entity, lambda **sync_filters: self.api_client.call_json(api_method, **sync_filters), filters
+            )
+        return await self._get_json(entity, api_method, **filters)
+
+    async def _invalidate(
+        self,
+        entity: str,
+        object_id: Optional[str] = None,
+        everything: bool = False,
+        item: Any = None,
+        get_method: Optional[Callable] = None,
+        deleted: bool = False,
+    ):
+        """Drop the cached copies of an object changed by a mutation, or of every object of `entity`.
+
+        The row of the object in the catalog store is updated from `item`, the object returned by the
+        mutation, or read again with `get_method`, or deleted if `deleted`. Mutations of every object of
+        `entity` force a full sync of the store instead.
+        """
+        if everything:
+            self.catalog_cache.clear(entity)
+            if self.catalog_store is not None:
+                self.catalog_store.invalidate(entity)
+            return
+        self.catalog_cache.invalidate(entity, object_id)
+        if self.catalog_store is None or object_id is None:
+            return
+        try:
+            if deleted:
+                await self.catalog_store.remove(entity, object_id)
+            elif item is not None:
+                await self.catalog_store.upsert(entity, to_data(item))
+            elif get_method is not None:
+                await self.catalog_store.upsert(entity, await self._get_json(entity, get_method, object_id))
+        except Exception:
+            # Sync the whole list again rather than serve a stale row
+            self.catalog_store.invalidate(entity)
+
+    async def _download_workflow_package(self, workflow_id: str, version_id: Optional[str]):
+        """Download the package of a published workflow version through the package cache"""
+        download_args = {"version_id": version_id} if version_id else {}
+        return await self.package_cache.get_or_download(
+            workflow_id,
+            version_id,
+            lambda: self.workflows_api.workflows_download_workflow(workflow_id, **download_args),
+        )
+
+    async def _get_workflow_graph(self, workflow_id: str) -> Optional[WorkflowGraph]:
+        """Get the graph of the published version of a workflow, parsed once per version through the catalog cache"""
+        workflow = await self._get_model("workflows", self.workflows_api.workflows_get_workflow, workflow_id)
+        if workflow is None:
+            return None
+        version_id = workflow.published_version_id
+
+        async def load():
+            package = await self._download_workflow_package(workflow_id, version_id)
+            if package is None:
+                return None
+            return await asyncio.to_thread(WorkflowGraph.from_package, package)
+
+        if not version_id:
+            return await load()
+        return await self.catalog_cache.get_or_load("workflow_graphs", workflow_id, version_id, load)
+
+    async def _download_published_package(self, workflow_id: str) -> Optional[bytes]:
+        """Download the package of the published version of a workflow"""
+        workflow = await self._get_model("workflows", self.workflows_api.workflows_get_workflow, workflow_id)
+        if workflow is None:
+            return None
+        return await self._download_workflow_package(workflow_id, workflow.published_version_id)
+
+    async def _get_model(self, entity: str, api_method: Callable, object_id: str):
+        """Read an object as a model through the catalog cache"""
+        return await self.catalog_cache.get_or_load(
+            entity, object_id, ("model", api_method.__name__), lambda: api_method(object_id)
+        )
+
+    def get_client_stats(self):
+        """Get the counters of the catalog cache, the catalog store, the package cache, the dependency index,
+        the job watcher, the request retries, the rate limiter, the circuit breakers, the request coalescing
+        and the HTTP cache"""
+        stats = {"catalog_cache": self.catalog_cache.stats()}
+        if self.catalog_store is not None:
+            stats["catalog_store"] = self.catalog_store.stats()
+        stats["package_cache"] = self.package_cache.stats()
+        stats["dependency_index"] = self.dependency_index.stats()
+        stats["retries"] = self.configuration.retry_policy.stats()
+        stats["rate_limiter"] = self.configuration.rate_limiter.stats()
+        stats["circuit_breakers"] = self.configuration.circuit_breakers.stats()
+        stats["request_coalescing"] = self.configuration.request_coalescer.stats()
+        stats["http_cache"] = self.configuration.http_cache.stats()
+        stats["job_watcher"] = self.job_watcher.stats()
+        return stats
+
+    def get_circuit_breakers(self):
+        """Get the state and the counters of the circuit breaker of each endpoint called so far"""
+        return self.configuration.circuit_breakers.stats()
 
     # Collections functions
-    def get_all_collections(self):
-        """Get the list of all collections of the Alteryx server"""
+    async def get_all_collections(
+        self,
+        fields: Optional[List[str]] = None,
+        summary: bool = False,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ):
+        """Get the list of all collections of the Alteryx server.
+        Only the given `fields` of each collection are returned, or the summary fields if `summary` is set.
+        With `limit` or `cursor` one page `{"items", "next_cursor"}` is returned."""
         try:
-            api_response = self.collections_api.collections_get_collections()
-            return pprint.pformat(api_response)
-        except ApiException as e:
+            api_response = await self._get_list("collections", self.collections_api.collections_get_collections)
+            return render_list(api_response, "collections", fields, summary, limit, cursor)
+        except (ApiException, ValueError) as e:
             return f"Error: {e}"
 
-    def get_collection_by_id(self, collection_id: str):
+    async def get_collection_by_id(self, collection_id: str):
         """Get a collection by its ID"""
         try:
-            api_response = self.collections_api.collections_get_collection(collection_id)
-            return pprint.pformat(api_response)
+            api_response = await self._get_json(
+                "collections", self.collections_api.collections_get_collection, collection_id
+            )
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
-    def create_collection(self, name: str):
+    async def create_collection(self, name: str):
         """Create a new collection. To add a collection to a user, use the update_collection_name_or_owner function."""
         try:
             contract = server_client.CreateCollectionContract(name=name)
-            api_response = self.collections_api.collections_create_collection(contract)
-            return pprint.pformat(api_response)
+            api_response = await self.collections_api.collections_create_collection(contract)
+            await self._invalidate(
+                "collections", api_response, get_method=self.collections_api.collections_get_collection
+            )
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
-    def delete_collection(self, collection_id: str):
+    async def delete_collection(self, collection_id: str):
         """Delete a collection by its ID"""
         try:
-            collection = self.collections_api.collections_get_collection(collection_id)
+            collection = await self._get_model(
+                "collections", self.collections_api.collections_get_collection, collection_id
+            )
             if not collection:
                 return "Error: Collection not found"
-            api_response = self.collections_api.collections_delete_collection(collection_id)
-            return pprint.pformat(api_response)
+            api_response = await self.collections_api.collections_delete_collection(collection_id)
+            await self._invalidate("collections", collection_id, deleted=True)
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
-    def update_collection_name_or_owner(self, collection_id: str, name: str, owner_id: str):
+    async def update_collection_name_or_owner(self, collection_id: str, name: str, owner_id: str):
         """Update a collection name or owner by its ID"""
         try:
-            collection = self.collections_api.collections_get_collection(collection_id)
+            collection = await self._get_model(
+                "collections", self.collections_api.collections_get_collection, collection_id
+            )
             if not collection:
                 return "Error: Collection not found"
             contract = server_client.UpdateCollectionContract(
                 name=name if name else collection.name, owner_id=owner_id if owner_id else collection.owner_id
             )
-            api_response = self.collections_api.collections_update_collection(collection_id, contract)
-            return pprint.pformat(api_response)
+            api_response = await self.collections_api.collections_update_collection(collection_id, contract)
+            await self._invalidate("collections", collection_id, item=api_response)
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
-    def add_workflow_to_collection(self, collection_id: str, workflow_id: str):
+    async def add_workflow_to_collection(self, collection_id: str, workflow_id: str):
         """Add a workflow to a collection by its ID"""
         try:
-            collection = self.collections_api.collections_get_collection(collection_id)
+            collection = await self._get_model(
+                "collections", self.collections_api.collections_get_collection, collection_id
+            )
             if not collection:
                 return "Error: Collection not found"
-            workflow = self.workflows_api.workflows_get_workflow(workflow_id)
+            workflow = await self._get_model("workflows", self.workflows_api.workflows_get_workflow, workflow_id)
             if not workflow:
                 return "Error: Workflow not found"
             contract = server_client.AddWorkflowContract(workflow_id=workflow_id)
-            api_response = self.collections_api.collections_add_workflow_to_collection(collection_id, contract)
-            return pprint.pformat(api_response)
+            api_response = await self.collections_api.collections_add_workflow_to_collection(collection_id, contract)
+            await self._invalidate("collections", collection_id, item=api_response)
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
-    def remove_workflow_from_collection(self, collection_id: str, workflow_id: str):
+    async def remove_workflow_from_collection(self, collection_id: str, workflow_id: str):
         """Remove a workflow from a collection by its ID"""
         try:
-            collection = self.collections_api.collections_get_collection(collection_id)
+            collection = await self._get_model(
+                "collections", self.collections_api.collections_get_collection, collection_id
+            )
             if not collection:
                 return "Error: Collection not found"
-            workflow = self.workflows_api.workflows_get_workflow(workflow_id)
+            workflow = await self._get_model("workflows", self.workflows_api.workflows_get_workflow, workflow_id)
             if not workflow:
                 return "Error: Workflow not found"
-            api_response = self.collections_api.collections_remove_workflow_from_collection(collection_id, workflow_id)
-            return pprint.pformat(api_response)
+            api_response = await self.collections_api.collections_remove_workflow_from_collection(
+                collection_id, workflow_id
+            )
+            await self._invalidate("collections", collection_id, item=api_response)
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
-    def add_schedule_to_collection(self, collection_id: str, schedule_id: str):
+    async def add_schedule_to_collection(self, collection_id: str, schedule_id: str):
         """Add a schedule to a collection by its ID"""
         try:
-            collection = self.collections_api.collections_get_collection(collection_id)
+            collection = await self._get_model(
+                "collections", self.collections_api.collections_get_collection, collection_id
+            )
             if not collection:
                 return "Error: Collection not found"
-            schedule = self.schedules_api.schedules_get_schedule(schedule_id)
+            schedule = await self._get_model("schedules", self.schedules_api.schedules_get_schedule, schedule_id)
             if not schedule:
                 return "Error: Schedule not found"
             contract = server_client.AddScheduleContract(schedule_id=schedule_id)
-            api_response = self.collections_api.collections_add_schedule_to_collection(collection_id, contract)
-            return pprint.pformat(api_response)
+            api_response = await self.collections_api.collections_add_schedule_to_collection(collection_id, contract)
+            await self._invalidate("collections", collection_id, item=api_response)
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
-    def remove_schedule_from_collection(self, collection_id: str, schedule_id: str):
+    async def remove_schedule_from_collection(self, collection_id: str, schedule_id: str):
         """Remove a schedule from a collection by its ID"""
         try:
-            collection = self.collections_api.collections_get_collection(collection_id)
+            collection = await self._get_model(
+                "collections", self.collections_api.collections_get_collection, collection_id
+            )
             if not collection:
                 return "Error: Collection not found"
-            schedule = self.schedules_api.schedules_get_schedule(schedule_id)
+            schedule = await self._get_model("schedules", self.schedules_api.schedules_get_schedule, schedule_id)
             if not schedule:
                 return "Error: Schedule not found"
-            api_response = self.collections_api.collections_remove_schedule_from_collection(collection_id, schedule_id)
-            return pprint.pformat(api_response)
+            api_response = await self.collections_api.collections_remove_schedule_from_collection(
+                collection_id, schedule_id
+            )
+            await self._invalidate("collections", collection_id, item=api_response)
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
     # Workflows functions
-    def get_all_workflows(self):
-        """Get the list of all workflows of the Alteryx server"""
+    async def get_all_workflows(
+        self,
+        fields: Optional[List[str]] = None,
+        summary: bool = False,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        name: Optional[str] = None,
+        owner_id: Optional[str] = None,
+        created_after: Optional[str] = None,
+        created_before: Optional[str] = None,
+    ):
+        """Get the list of all workflows of the Alteryx server.
+        The `name`, `owner_id`, `created_after` and `created_before` filters are applied by the server.
+        Only the given `fields` of each workflow are returned, or the summary fields if `summary` is set.
+        With `limit` or `cursor` one page `{"items", "next_cursor"}` is returned."""
         try:
-            api_response = self.workflows_api.workflows_get_workflows()
-            return pprint.pformat(api_response)
-        except ApiException as e:
+            filters = _not_none(
+                name=name, owner_id=owner_id, created_after=created_after, created_before=created_before
+            )
+            api_response = await self._get_list("workflows", self.workflows_api.workflows_get_workflows, **filters)
+            return render_list(api_response, "workflows", fields, summary, limit, cursor)
+        except (ApiException, ValueError) as e:
             return f"Error: {e}"
 
-    def get_workflow_by_id(self, workflow_id: str):
+    async def get_workflow_by_id(self, workflow_id: str):
         """Get a workflow by its ID"""
         try:
-            api_response = self.workflows_api.workflows_get_workflow(workflow_id)
-            return pprint.pformat(api_response)
+            api_response = await self._get_json("workflows", self.workflows_api.workflows_get_workflow, workflow_id)
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
-    def update_workflow_name_or_comment(self, workflow_id: str, name: str, comment: str):
+    async def update_workflow_name_or_comment(self, workflow_id: str, name: str, comment: str):
         """Update a workflow name or comment by its ID"""
         try:
-            workflow = self.workflows_api.workflows_get_workflow(workflow_id)
+            workflow = await self._get_model("workflows", self.workflows_api.workflows_get_workflow, workflow_id)
             if not workflow:
                 return "Error: Workflow not found"
             workflow_details = workflow
@@ -180,47 +388,77 @@ class AYXMCPTools:
                 execution_mode=workflow_details.execution_mode,
                 has_private_data_exemption=workflow_details.has_private_data_exemption,
             )
-            api_response = self.workflows_api.workflows_update_workflow(workflow_id, contract)
-            return pprint.pformat(api_response)
+            api_response = await self.workflows_api.workflows_update_workflow(workflow_id, contract)
+            await self._invalidate("workflows", workflow_id, item=api_response)
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
-    def transfer_workflow(self, workflow_id: str, new_owner_id: str):
+    async def transfer_workflow(self, workflow_id: str, new_owner_id: str):
         """Transfer a workflow to a new owner by its ID"""
         try:
-            workflow = self.workflows_api.workflows_get_workflow(workflow_id)
+            workflow = await self._get_model("workflows", self.workflows_api.workflows_get_workflow, workflow_id)
             if not workflow:
                 return "Error: Workflow not found"
-            new_owner = self.users_api.users_get_user(new_owner_id)
+            new_owner = await self._get_model("users", self.users_api.users_get_user, new_owner_id)
             if not new_owner:
                 return "Error: New owner not found"
             contract = server_client.TransferWorkflowContract(owner_id=new_owner_id)
-            api_response = self.workflows_api.workflows_transfer_workflow(workflow_id, contract)
-            return pprint.pformat(api_response)
+            api_response = await self.workflows_api.workflows_transfer_workflow(workflow_id, contract)
+            await self._invalidate("workflows", workflow_id, get_method=self.workflows_api.workflows_get_workflow)
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
-    def get_workflow_jobs(self, workflow_id: str):
-        """Get the list of jobs for an existing workflow"""
+    async def get_workflow_jobs(
+        self,
+        workflow_id: str,
+        status: Optional[str] = None,
+        result_code: Optional[str] = None,
+        sort_field: Optional[str] = None,
+        direction: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ):
+        """Get the list of jobs for an existing workflow.
+        The filters, the sort order and the pagination are applied by the server.
+        With `limit` or `cursor` one page `{"items", "next_cursor"}` is returned."""
         try:
-            workflow = self.workflows_api.workflows_get_workflow(workflow_id)
+            workflow = await self._get_model("workflows", self.workflows_api.workflows_get_workflow, workflow_id)
             if not workflow:
                 return "Error: Workflow not found"
-            api_response = self.workflows_api.workflows_get_jobs_for_workflow(workflow_id)
-            return pprint.pformat(api_response)
-        except ApiException as e:
+            offset = decode_cursor(cursor)
+            paginated = limit is not None or offset > 0
+            filters = _not_none(
+                status=status,
+                result_code=result_code,
+                sort_field=sort_field,
+                direction=direction,
+                offset=str(offset) if offset else None,
+                # One more job than requested tells whether there is a next page
+                limit=str(limit + 1) if limit is not None else None,
+            )
+            api_response = await self.api_client.call_json(
+                self.workflows_api.workflows_get_jobs_for_workflow, workflow_id, **filters
+            )
+            if not paginated:
+                return to_data(api_response)
+            jobs = api_response or []
+            more = limit is not None and len(jobs) > limit
+            return to_data(page(jobs[:limit], offset, limit, more))
+        except (ApiException, ValueError) as e:
             return f"Error: {e}"
 
-    def start_workflow_execution(self, workflow_id: str, input_data: list[InputData] = None):
+    async def start_workflow_execution(self, workflow_id: str, input_data: list[InputData] = None):
         """Start a workflow execution by its ID and return the job ID. This will create a new job and add it to the execution queue.
         This call will return a job ID that can be used to get the job details. Once the job is executed, 
         the results can be retrieved via the produced JobID
         The input data is a list of name-value pairs, each containing a name and value."""
         try:
-            workflow = self.workflows_api.workflows_get_workflow(workflow_id)
+            workflow = await self._get_model("workflows", self.workflows_api.workflows_get_workflow, workflow_id)
             if not workflow:
                 return "Error: Workflow not found"
-            questions = self.workflows_api.workflows_get_workflow_questions(workflow_id)
+            questions = await self.workflows_api.workflows_get_workflow_questions(workflow_id)
             if (not questions or len(questions) == 0) and (input_data):
                 return "Error: Workflow has no questions, input data not allowed"
             if questions and len(questions) > 0:
@@ -236,29 +474,33 @@ class AYXMCPTools:
             # Proper type conversion
             workflow = server_client.WorkflowView(workflow)
             contract = server_client.EnqueueJobContract(worker_tag=workflow.worker_tag, questions=app_values)
-            api_response = self.workflows_api.workflows_enqueue(workflow_id, contract)
-            return pprint.pformat(api_response)
+            api_response = await self.workflows_api.workflows_enqueue(workflow_id, contract)
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
 
-    def execute_workflow_with_monitoring(
+    async def execute_workflow_with_monitoring(
             self,
             workflow_id: str, 
             input_data: Optional[List[InputData]] = None, 
             wait_for_completion: bool = True,
             timeout_seconds: int = 3600,
-            poll_interval_seconds: int = 5
+            poll_interval_seconds: int = 5,
+            progress_callback: Optional[Callable[[float, float, str], Awaitable[None]]] = None,
     ):
         """ Execute a workflow and monitor its execution status. 
         This call will return a jobID as well as the complete job details. 
-        The input data parameter is a list of name-value pairs, each containing a name and value. """
+        The input data parameter is a list of name-value pairs, each containing a name and value.
+        The job is polled quickly right after it is queued and less often as it ages, up to
+        poll_interval_seconds between two polls. progress_callback(elapsed, total, message) is awaited
+        after every poll. """
         try:
-            workflow = self.workflows_api.workflows_get_workflow(workflow_id)
+            workflow = await self._get_model("workflows", self.workflows_api.workflows_get_workflow, workflow_id)
             if not workflow:
                 return "Error: Workflow not found"
             
-            questions = self.workflows_api.workflows_get_workflow_questions(workflow_id)
+            questions = await self.workflows_api.workflows_get_workflow_questions(workflow_id)
             if (not questions or len(questions) == 0) and (input_data):
                 return "Error: Workflow has no questions, input data not allowed"
             if questions and len(questions) > 0:
@@ -273,146 +515,154 @@ class AYXMCPTools:
 
             # Start the workflow execution
             contract = server_client.EnqueueJobContract(worker_tag=workflow.worker_tag, questions=app_values)
-            job_response = self.workflows_api.workflows_enqueue(workflow_id, contract)
+            job_response = await self.workflows_api.workflows_enqueue(workflow_id, contract)
+
+            # Extract the job id
+            job_id = job_response.id
 
             # Parse the job response to get the job ID
             if job_response.status != "Queued":
                 # Out put error
-                return pprint.pformat({
+                return to_data({
                     "success": False,
                     "job_id": job_id,
                     "status": job_response.status,
                     "message": f"Error: Workfow was not successfully started. Current JobID:'{job_response.id}"
                 })
 
-            # Extract the job id
-            job_id = job_response.id
-
             if not wait_for_completion:
-                return pprint.pformat({
+                return to_data({
                     "success": True,
                     "job_id": job_id,
                     "status": "Started",
                     "message": "Job started successfully, not waiting for completion"
                 })
 
-            start_time = time.time()
-
-            while True:
-                # Check if timeout exceeded
-                if time.time() - start_time > timeout_seconds:
-                    return pprint.pformat({
-                        "success": False,
-                        "job_id": job_id,
-                        "status": "Timeout",
-                        "error": f"Job execution timed out after {timeout_seconds} seconds"
-                    })
-                
-                # Get job status
-                try:
-                    job_details = self.jobs_api.jobs_get_job_v3(job_id)
-                    
-                    if job_details.status in ["Completed", "Cancelled"]:
-                        # Get final job details including outputs and messages
-                        final_details = job_details
-                        job_messages = self.jobs_api.jobs_get_job_messages(job_id=job_id)
-                        return  pprint.pformat({
-                                "success": job_details.status == "Completed",
-                                "job_id": job_id,
-                                "status": job_details.status,
-                                "job_details": final_details,
-                                "execution_time_seconds": time.time() - start_time
-                            })
-                    # else:
-                    #     return pprint.pformat({
-                    #         "success": False,
-                    #         "job_id": job_id,
-                    #         "status": "Failed",
-                    #         "error": "Could not extract status from job details, continuing to monitor..."
-                    #     }) 
-                    
-                except Exception as e:
-                    return pprint.pformat({
-                        "success": False,
-                        "job_id": job_id,
-                        "status": "Failed",
-                        "error": f"Error checking job status: {str(e)}"
-                    })           
-                # Wait before next check
-                time.sleep(poll_interval_seconds)
-
-        except ApiException as e:
-            return pprint.pformat({
+            start_time = time.monotonic()
+            try:
+                job_details = await self.job_watcher.wait_for_job(
+                    job_id, timeout_seconds, poll_interval_seconds, progress_callback
+                )
+            except Exception as e:
+                return to_data({
+                    "success": False,
+                    "job_id": job_id,
+                    "status": "Failed",
+                    "error": f"Error checking job status: {str(e)}"
+                })
+
+            if job_details is None:
+                return to_data({
+                    "success": False,
+                    "job_id": job_id,
+                    "status": "Timeout",
+                    "error": f"Job execution timed out after {timeout_seconds} seconds"
+                })
+
+            return to_data({
+                "success": job_details.status == "Completed",
+                "job_id": job_id,
+                "status": job_details.status,
+                "job_details": job_details,
+                "execution_time_seconds": time.monotonic() - start_time
+            })
+
+        except ApiException as e:
+            return to_data({
                 "success": False,
                 "error": f"Unexpected error: {str(e)}",
                 "job_id": None,
                 "status": "Failed"
             })
-            
-
 
     # Users functions
-    def get_all_users(self):
-        """Get the list of all users of the Alteryx server"""
+    async def get_all_users(
+        self,
+        fields: Optional[List[str]] = None,
+        summary: bool = False,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        active: Optional[bool] = None,
+        email: Optional[str] = None,
+        role: Optional[str] = None,
+        first_name: Optional[str] = None,
+        last_name: Optional[str] = None,
+        created_after: Optional[str] = None,
+        created_before: Optional[str] = None,
+    ):
+        """Get the list of all users of the Alteryx server.
+        The `active`, `email`, `role`, `first_name`, `last_name`, `created_after` and `created_before`
+        filters are applied by the server.
+        Only the given `fields` of each user are returned, or the summary fields if `summary` is set.
+        With `limit` or `cursor` one page `{"items", "next_cursor"}` is returned."""
         try:
-            api_response = self.users_api.users_get_users()
-            return pprint.pformat(api_response)
-        except ApiException as e:
+            filters = _not_none(
+                active=active,
+                email=email,
+                role=role,
+                first_name=first_name,
+                last_name=last_name,
+                created_after=created_after,
+                created_before=created_before,
+            )
+            api_response = await self._get_list("users", self.users_api.users_get_users, **filters)
+            return render_list(api_response, "users", fields, summary, limit, cursor)
+        except (ApiException, ValueError) as e:
             return f"Error: {e}"
 
-    def get_user_by_id(self, user_id: str):
+    async def get_user_by_id(self, user_id: str):
         """Get a user by their ID"""
         try:
-            api_response = self.users_api.users_get_user(user_id)
-            return pprint.pformat(api_response)
+            api_response = await self._get_json("users", self.users_api.users_get_user, user_id)
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
-    def get_user_by_email(self, email: str):
+    async def get_user_by_email(self, email: str):
         """Get a user by their email"""
         try:
-            api_response = self.users_api.users_get_users(email=email)
-            return pprint.pformat(api_response)
+            api_response = await self._get_json("users", self.users_api.users_get_users, email=email)
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
-    def get_user_by_name(self, name: str):
+    async def get_user_by_name(self, name: str):
         """Get a user by their last name"""
         try:
-            api_response = self.users_api.users_get_users(last_name=name)
-            return pprint.pformat(api_response)
+            api_response = await self._get_json("users", self.users_api.users_get_users, last_name=name)
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
-    def get_user_by_first_name(self, first_name: str):
+    async def get_user_by_first_name(self, first_name: str):
         """Get a user by their first name"""
         try:
-            api_response = self.users_api.users_get_users(first_name=first_name)
-            return pprint.pformat(api_response)
+            api_response = await self._get_json("users", self.users_api.users_get_users, first_name=first_name)
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
-    def get_all_user_assets(self, user_id: str):
+    async def get_all_user_assets(self, user_id: str):
         """Get all the assets for a user"""
         try:
-            api_response = self.users_api.users_get_users_assets(user_id)
-            return pprint.pformat(api_response)
+            api_response = await self.api_client.call_json(self.users_api.users_get_users_assets, user_id)
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
-    def get_user_assets_by_type(self, user_id: str, asset_type: str):
+    async def get_user_assets_by_type(self, user_id: str, asset_type: str):
         """Get all the assets for a user by type. The asset type can be 'Workflow', 'Collection',
         'Connection', 'Credential' or 'All'."""
         try:
-            api_response = self.users_api.users_get_users_assets(user_id, asset_type)
-            return pprint.pformat(api_response)
+            api_response = await self.api_client.call_json(self.users_api.users_get_users_assets, user_id, asset_type)
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
-    def update_user_details(self, user_id: str, first_name: str, last_name: str, email: str):
+    async def update_user_details(self, user_id: str, first_name: str, last_name: str, email: str):
         """Update details of an existing user by their ID. Can be used to update any of the user's details."""
         try:
-            user_details = self.users_api.users_get_user(user_id)
+            user_details = await self._get_model("users", self.users_api.users_get_user, user_id)
             
             if not user_details:
                 return "Error: User not found"
@@ -439,12 +689,13 @@ class AYXMCPTools:
                 can_share_for_collaboration_dcm=user_details.can_share_for_collaboration_dcm,
                 can_manage_generic_vaults_dcm=user_details.can_manage_generic_vaults_dcm,
             )
-            api_response = self.users_api.users_update_user(user_id, contract)
-            return pprint.pformat(api_response)
+            api_response = await self.users_api.users_update_user(user_id, contract)
+            await self._invalidate("users", user_id, item=api_response)
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
-    def transfer_all_assets(
+    async def transfer_all_assets(
         self,
         user_id: str,
         new_owner_id: str,
@@ -454,10 +705,10 @@ class AYXMCPTools:
     ):
         """Transfer all assets (workflows, schedules, collections) owned by one user to another."""
         try:
-            user = self.users_api.users_get_user(user_id)
+            user = await self._get_model("users", self.users_api.users_get_user, user_id)
             if not user:
                 return "Error: User not found"
-            new_owner = self.users_api.users_get_user(new_owner_id)
+            new_owner = await self._get_model("users", self.users_api.users_get_user, new_owner_id)
             if not new_owner:
                 return "Error: New owner not found"
             contract = server_client.TransferUserAssetsContract(
@@ -466,60 +717,76 @@ class AYXMCPTools:
                 transfer_schedules=transfer_schedules,
                 transfer_collections=transfer_collections,
             )
-            api_response = self.users_api.users_transfer_assets(user_id, contract)
-            return pprint.pformat(api_response)
+            api_response = await self.users_api.users_transfer_assets(user_id, contract)
+            if transfer_workflows:
+                await self._invalidate("workflows", everything=True)
+            if transfer_schedules:
+                await self._invalidate("schedules", everything=True)
+            if transfer_collections:
+                await self._invalidate("collections", everything=True)
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
-    def deactivate_user(self, user_id: str):
+    async def deactivate_user(self, user_id: str):
         """Deactivate a user by their ID"""
         try:
-            user = self.users_api.users_get_user(user_id)
+            user = await self._get_model("users", self.users_api.users_get_user, user_id)
             if not user:
                 return "Error: User not found"
-            api_response = self.users_api.users_deactivate_user(user_id)
-            return pprint.pformat(api_response)
+            api_response = await self.users_api.users_deactivate_user(user_id)
+            await self._invalidate("users", user_id, get_method=self.users_api.users_get_user)
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
-    def reset_user_password(self, user_id: str):
+    async def reset_user_password(self, user_id: str):
         """Reset a user's password by their ID"""
         try:
-            user = self.users_api.users_get_user(user_id)
+            user = await self._get_model("users", self.users_api.users_get_user, user_id)
             if not user:
                 return "Error: User not found"
-            api_response = self.users_api.users_reset_user_password(user_id)
-            return pprint.pformat(api_response)
+            api_response = await self.users_api.users_reset_user_password(user_id)
+            await self._invalidate("users", user_id)
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
     # Jobs functions
-    def get_all_job_messages(self, job_id: str):
+    async def get_all_job_messages(self, job_id: str):
         """Get all the messages for a job"""
         try:
             # check if job exists
-            job = self.jobs_api.jobs_get_job_v3(job_id)
+            job = await self.jobs_api.jobs_get_job_v3(job_id)
             if not job:
                 return "Error: Job not found"
             
-            api_response = self.jobs_api.jobs_get_job_messages(job_id)
-            return pprint.pformat(api_response)
+            api_response = await self.api_client.call_json(self.jobs_api.jobs_get_job_messages, job_id)
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
-    def get_job_by_id(self, job_id: str):
+    async def get_job_by_id(self, job_id: str):
         """Retrieve details about an existing job and its current state. Only app workflows can be used."""
         try:
-            api_response = self.jobs_api.jobs_get_job_v3(job_id)
-            return pprint.pformat(api_response)
+            api_response = await self.api_client.call_json(self.jobs_api.jobs_get_job_v3, job_id)
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
         
-    def get_job_output_data(self, job_id: str):
-        """Get the output data for a job"""
+    async def get_job_output_data(
+        self,
+        job_id: str,
+        formats: Optional[Dict[str, str]] = None,
+        preferred_formats: Optional[List[str]] = None,
+    ):
+        """Get the output data for a job.
+        The format of each output is taken from `formats` (output id -> format), else the first of
+        `preferred_formats` the output is available in, else its first available format.
+        The outputs are downloaded concurrently and streamed to the temp directory."""
         try:
             # check if job exists
-            job = self.jobs_api.jobs_get_job_v3(job_id)
+            job = await self.jobs_api.jobs_get_job_v3(job_id)
             if not job:
                 return "Error: Job not found"
             # check if job is completed
@@ -531,81 +798,136 @@ class AYXMCPTools:
             temp_directory = os.path.normpath(temp_directory)
             if not os.path.exists(temp_directory):
                 os.makedirs(temp_directory)
-            all_output_files = []
-
-            for output in job.outputs:
-                output_id = output.id
-                file_name = output.file_name
-                available_output_types = output.available_formats
-                # get file name with extension from file_name
-                # Extract base name without extension if it exists
-                base_name = os.path.splitext(os.path.basename(file_name))[0]
-                
-                # Get the file extension from the file name
-                raw_file_extension = os.path.splitext(os.path.basename(file_name))[1]
-
-                # Map output format to file extension
-                format_extension_map = {
-                    'Raw': raw_file_extension if raw_file_extension else '.txt',
-                    'Yxdb': '.yxdb',
-                    'Shp': '.shp',
-                    'Kml': '.kml',
-                    'Tab': '.tab',
-                    'Mif': '.mif',
-                    'Dbf': '.dbf',
-                    'Csv': '.csv',
-                    'Pdf': '.pdf',
-                    'Docx': '.docx',
-                    'Xlsx': '.xlsx',
-                    'Html': '.html',
-                    'Tde': '.tde',
-                    'Zip': '.zip'
-                }
-
-                # Get the extension for the first available format
-                output_format = available_output_types[0] if available_output_types else 'Raw'
-                file_extension = format_extension_map.get(output_format, raw_file_extension)
-                file_name_with_extension = base_name + file_extension
-
-                # get the output data
-                api_response = self.jobs_api.jobs_get_output_file(job_id, output_id, output_format)
-
-                # Convert to bytes if it's a string
-                if isinstance(api_response, str):
-                    api_response_bytes = api_response.encode('utf-8')
-                else:
-                    api_response_bytes = api_response
-
-                with open(f"{temp_directory}/{job_id}_{output_id}_{file_name_with_extension}", "wb") as f:
-                    f.write(api_response_bytes)
-
-                all_output_files.append(f"{temp_directory}/{job_id}_{output_id}_{file_name_with_extension}")
-
-            return f"Output files saved to:  {pprint.pformat(all_output_files)} \n\n"
+
+            semaphore = asyncio.Semaphore(max(1, self.configuration.output_download_concurrency))
+            started_at = time.perf_counter()
+            downloads = await asyncio.gather(
+                *(
+                    self._download_job_output(job_id, output, temp_directory, formats, preferred_formats, semaphore)
+                    for output in job.outputs or []
+                )
+            )
+            elapsed = time.perf_counter() - started_at
+            total_bytes = sum(download.get("size_bytes", 0) for download in downloads)
+            return {
+                "output_files": [download["path"] for download in downloads if "path" in download],
+                "downloads": downloads,
+                "total_bytes": total_bytes,
+                "seconds": round(elapsed, 3),
+                "mb_per_second": round(total_bytes / elapsed / 1e6, 2) if elapsed else None,
+            }
         except ApiException as e:
             return f"Error: {e}"
 
+    async def _download_job_output(
+        self,
+        job_id: str,
+        output,
+        temp_directory: str,
+        formats: Optional[Dict[str, str]],
+        preferred_formats: Optional[List[str]],
+        semaphore: asyncio.Semaphore,
+    ) -> Dict[str, Any]:
+        """Stream one output of a job to the temp directory and report its size and throughput"""
+        output_id = output.id
+        file_name = output.file_name or output_id
+        available_output_types = output.available_formats or []
+        # The file names are paths on the server, which are usually Windows paths
+        base_file_name = os.path.basename(file_name.replace("\\", "/"))
+        # Extract base name without extension if it exists
+        base_name = os.path.splitext(base_file_name)[0]
+        
+        # Get the file extension from the file name
+        raw_file_extension = os.path.splitext(base_file_name)[1]
+
+        # Map output format to file extension
+        format_extension_map = {
+            'Raw': raw_file_extension if raw_file_extension else '.txt',
+            'Yxdb': '.yxdb',
+            'Shp': '.shp',
+            'Kml': '.kml',
+            'Tab': '.tab',
+            'Mif': '.mif',
+            'Dbf': '.dbf',
+            'Csv': '.csv',
+            'Pdf': '.pdf',
+            'Docx': '.docx',
+            'Xlsx': '.xlsx',
+            'Html': '.html',
+            'Tde': '.tde',
+            'Zip': '.zip'
+        }
+
+        # Use the requested format, else the first preferred or available format
+        output_format = (formats or {}).get(output_id)
+        if output_format is None:
+            output_format = next(
+                (item for item in preferred_formats or [] if item in available_output_types),
+                available_output_types[0] if available_output_types else 'Raw',
+            )
+        result = {"output_id": output_id, "file_name": file_name, "format": output_format}
+        if available_output_types and output_format not in available_output_types:
+            result["error"] = f"Format {output_format} is not available, use one of {', '.join(available_output_types)}"
+            return result
+        file_extension = format_extension_map.get(output_format, raw_file_extension)
+        path = f"{temp_directory}/{job_id}_{output_id}_{base_name + file_extension}"
+
+        # Stream the output data to disk without holding it in memory
+        async with semaphore:
+            started_at = time.perf_counter()
+            try:
+                size = await self.api_client.download_to_file(
+                    self.jobs_api.jobs_get_output_file, path, job_id, output_id, output_format
+                )
+            except ApiException as e:
+                result["error"] = str(e)
+                return result
+            elapsed = time.perf_counter() - started_at
+        result.update(
+            path=path,
+            size_bytes=size,
+            seconds=round(elapsed, 3),
+            mb_per_second=round(size / elapsed / 1e6, 2) if elapsed else None,
+        )
+        return result
+
     # Schedules functions
-    def get_all_schedules(self):
-        """Get the list of all schedules of the Alteryx server"""
+    async def get_all_schedules(
+        self,
+        fields: Optional[List[str]] = None,
+        summary: bool = False,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        owner_id: Optional[str] = None,
+        workflow_id: Optional[str] = None,
+        runs_after: Optional[str] = None,
+        runs_before: Optional[str] = None,
+    ):
+        """Get the list of all schedules of the Alteryx server.
+        The `owner_id`, `workflow_id`, `runs_after` and `runs_before` filters are applied by the server.
+        Only the given `fields` of each schedule are returned, or the summary fields if `summary` is set.
+        With `limit` or `cursor` one page `{"items", "next_cursor"}` is returned."""
         try:
-            api_response = self.schedules_api.schedules_get_schedules()
-            return pprint.pformat(api_response)
-        except ApiException as e:
+            filters = _not_none(
+                owner_id=owner_id, workflow_id=workflow_id, runs_after=runs_after, runs_before=runs_before
+            )
+            api_response = await self._get_list("schedules", self.schedules_api.schedules_get_schedules, **filters)
+            return render_list(api_response, "schedules", fields, summary, limit, cursor)
+        except (ApiException, ValueError) as e:
             return f"Error: {e}"
 
-    def get_schedule_by_id(self, schedule_id: str):
+    async def get_schedule_by_id(self, schedule_id: str):
         """Get a schedule by its ID"""
         try:
-            api_response = self.schedules_api.schedules_get_schedule(schedule_id)
-            return pprint.pformat(api_response)
+            api_response = await self._get_json("schedules", self.schedules_api.schedules_get_schedule, schedule_id)
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
-    def deactivate_schedule(self, schedule_id: str):
+    async def deactivate_schedule(self, schedule_id: str):
         """Deactivate a schedule by its ID"""
         try:
-            schedule = self.schedules_api.schedules_get_schedule(schedule_id)
+            schedule = await self._get_model("schedules", self.schedules_api.schedules_get_schedule, schedule_id)
             if not schedule:
                 return "Error: Schedule not found"
             
@@ -622,15 +944,16 @@ class AYXMCPTools:
                 time_zone=schedule.time_zone,
                 questions=schedule.questions,
             )
-            api_response = self.schedules_api.schedules_update_schedule(schedule_id, contract)
-            return pprint.pformat(api_response)
+            api_response = await self.schedules_api.schedules_update_schedule(schedule_id, contract)
+            await self._invalidate("schedules", schedule_id, item=api_response)
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
-    def activate_schedule(self, schedule_id: str):
+    async def activate_schedule(self, schedule_id: str):
         """Activate a schedule by its ID"""
         try:
-            schedule = self.schedules_api.schedules_get_schedule(schedule_id)
+            schedule = await self._get_model("schedules", self.schedules_api.schedules_get_schedule, schedule_id)
             if not schedule:
                 return "Error: Schedule not found"
             
@@ -647,15 +970,16 @@ class AYXMCPTools:
                 time_zone=schedule.time_zone,
                 questions=schedule.questions,
             )
-            api_response = self.schedules_api.schedules_update_schedule(schedule_id, contract)
-            return pprint.pformat(api_response)
+            api_response = await self.schedules_api.schedules_update_schedule(schedule_id, contract)
+            await self._invalidate("schedules", schedule_id, item=api_response)
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
-    def update_schedule_name_or_comment(self, schedule_id: str, name: str, comment: str):
+    async def update_schedule_name_or_comment(self, schedule_id: str, name: str, comment: str):
         """Update the name or comment of a schedule by its ID"""
         try:
-            schedule = self.schedules_api.schedules_get_schedule(schedule_id)
+            schedule = await self._get_model("schedules", self.schedules_api.schedules_get_schedule, schedule_id)
             if not schedule:
                 return "Error: Schedule not found"
             
@@ -672,15 +996,16 @@ class AYXMCPTools:
                 time_zone=schedule.time_zone,
                 questions=schedule.questions,
             )
-            api_response = self.schedules_api.schedules_update_schedule(schedule_id, contract)
-            return pprint.pformat(api_response)
+            api_response = await self.schedules_api.schedules_update_schedule(schedule_id, contract)
+            await self._invalidate("schedules", schedule_id, item=api_response)
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
-    def change_schedule_owner(self, schedule_id: str, new_owner_id: str):
+    async def change_schedule_owner(self, schedule_id: str, new_owner_id: str):
         """Change the owner of a schedule by its ID"""
         try:
-            schedule = self.schedules_api.schedules_get_schedule(schedule_id)
+            schedule = await self._get_model("schedules", self.schedules_api.schedules_get_schedule, schedule_id)
             if not schedule:
                 return "Error: Schedule not found"
             
@@ -697,71 +1022,72 @@ class AYXMCPTools:
                 time_zone=schedule.time_zone,
                 questions=schedule.questions,
             )
-            api_response = self.schedules_api.schedules_update_schedule(schedule_id, contract)
-            return pprint.pformat(api_response)
+            api_response = await self.schedules_api.schedules_update_schedule(schedule_id, contract)
+            await self._invalidate("schedules", schedule_id, item=api_response)
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
     # Credentials functions
-    def get_all_credentials(self):
-        """Get the list of all accessible credentials of the Alteryx server"""
+    async def get_all_credentials(
+        self,
+        fields: Optional[List[str]] = None,
+        summary: bool = False,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ):
+        """Get the list of all accessible credentials of the Alteryx server.
+        Only the given `fields` of each credential are returned, or the summary fields if `summary` is set.
+        With `limit` or `cursor` one page `{"items", "next_cursor"}` is returned."""
         try:
-            api_response = self.credentials_api.credentials_get_credentials()
-            return pprint.pformat(api_response)
-        except ApiException as e:
+            api_response = await self._get_list("credentials", self.credentials_api.credentials_get_credentials)
+            return render_list(api_response, "credentials", fields, summary, limit, cursor)
+        except (ApiException, ValueError) as e:
             return f"Error: {e}"
 
-    def get_credential_by_id(self, credential_id: str):
+    async def get_credential_by_id(self, credential_id: str):
         """Get the details of an existing credential."""
         try:
-            api_response = self.credentials_api.credentials_get_credential(credential_id)
-            return pprint.pformat(api_response)
+            api_response = await self._get_json(
+                "credentials", self.credentials_api.credentials_get_credential, credential_id
+            )
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
     # Connections functions
-    def lookup_connection(self, connection_id: str):
+    async def lookup_connection(self, connection_id: str):
         """Lookup a DCM Connection as referenced in workflows"""
         try:
-            api_response = self.dcm_api.d_cme_lookup_dcm_connection(connection_id)
-            return pprint.pformat(api_response)
+            api_response = await self._get_json("connections", self.dcm_api.d_cme_lookup_dcm_connection, connection_id)
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
-    def get_connection_by_id(self, connection_id: str):
+    async def get_connection_by_id(self, connection_id: str):
         """Get a connection by its ID"""
         try:
-            api_response = self.dcm_api.d_cme_get_dcm_connection(connection_id)
-            return pprint.pformat(api_response)
+            api_response = await self._get_json("connections", self.dcm_api.d_cme_get_dcm_connection, connection_id)
+            return to_data(api_response)
         except ApiException as e:
             return f"Error: {e}"
 
     # Workflow file functions
-    def download_workflow_package_file(self, workflow_id: str):
+    async def download_workflow_package_file(self, workflow_id: str):
         """Download a workflow package file by its ID and save it to the local directory"""
         try:
-            api_response = self.workflows_api.workflows_get_workflow(workflow_id)
-            if api_response is None:
+            workflow = await self._get_model("workflows", self.workflows_api.workflows_get_workflow, workflow_id)
+            if workflow is None:
                 return "Error: Workflow not found"
             
             # Download the workflow file
-            api_response = self.workflows_api.workflows_download_workflow(workflow_id)
+            api_response = await self._download_workflow_package(workflow_id, workflow.published_version_id)
             if api_response is None:
                 return "Error: Failed to download workflow"
             
-            # Create the output directory if it doesn't exist
-            temp_directory = self.configuration.temp_directory
-            # normalize the temp directory
-            temp_directory = os.path.normpath(temp_directory)
-            if not os.path.exists(temp_directory):
-                os.makedirs(temp_directory)
-            
             # Save the workflow file to the output directory
-            with open(
-                f"{temp_directory}/{workflow_id}.yxzp",
-                "wb" if not os.path.exists(f"{temp_directory}/{workflow_id}.yxzp") else "wb+",
-            ) as f:
-                f.write(api_response)
+            temp_directory = os.path.normpath(self.configuration.temp_directory)
+            await asyncio.to_thread(write_file, f"{temp_directory}/{workflow_id}.yxzp", api_response)
 
             return (
                 f"Workflow {workflow_id} downloaded successfully. File saved to '{temp_directory}/{workflow_id}.yxzp'"
@@ -769,44 +1095,25 @@ class AYXMCPTools:
         except ApiException as e:
             return f"Error: {e.body}"
 
-    def get_workflow_xml(self, workflow_id: str):
+    async def get_workflow_xml(self, workflow_id: str):
         """Get the XML representation of a workflow file by its ID"""
         try:
-            api_response = self.workflows_api.workflows_get_workflow(workflow_id)
-            if api_response is None:
+            workflow = await self._get_model("workflows", self.workflows_api.workflows_get_workflow, workflow_id)
+            if workflow is None:
                 return "Error: Workflow not found"
             
              # Download the workflow file
-            api_response = self.workflows_api.workflows_download_workflow(workflow_id)
+            api_response = await self._download_workflow_package(workflow_id, workflow.published_version_id)
             if api_response is None:
                 return "Error: Failed to download workflow"
                 
-            # Create the output directory if it doesn't exist
-            temp_directory = self.configuration.temp_directory
-            # normalize the temp directory
-            temp_directory = os.path.normpath(temp_directory)
-            if not os.path.exists(temp_directory):
-                os.makedirs(temp_directory)
-            
-            with open(
-                f"{temp_directory}/{workflow_id}.yxzp",
-                "wb" if not os.path.exists(f"{temp_directory}/{workflow_id}.yxz") else "wb+",
-            ) as f:
-                f.write(api_response)
-
-            new_directory = f"{temp_directory}/{workflow_id}"
-            if os.path.exists(new_directory):
-                shutil.rmtree(new_directory)
-            os.makedirs(new_directory)
-            
-            with zipfile.ZipFile(f"{temp_directory}/{workflow_id}.yxzp", "r") as zip_ref:
-                zip_ref.extractall(new_directory)
-            
-            yxmd_files = [file for file in os.listdir(new_directory) if file.endswith(".yxmd") or file.endswith(".yxwz")]
-            if len(yxmd_files) == 0:
-                return "Error: No Workflow or Analytics App XML file found after unzipping the downloaded workflow package file"
-            
-            yxmd_file = yxmd_files[0]
+            # Only the workflow document is decompressed and written to disk
+            try:
+                yxmd_file, xml_bytes = await asyncio.to_thread(read_workflow_xml, api_response)
+            except WorkflowPackageError as e:
+                return f"Error: {e}"
+            new_directory = f"{os.path.normpath(self.configuration.temp_directory)}/{workflow_id}"
+            await asyncio.to_thread(write_file, f"{new_directory}/{yxmd_file}", xml_bytes)
             
             # Return the path to the XML file
             return f"Workflow XML file saved to: {new_directory}/{yxmd_file}"
@@ -815,102 +1122,93 @@ class AYXMCPTools:
             return f"Error: {e}"
         
 
-    def get_workflow_tool_list(self, workflow_id: str):
+    async def get_workflow_tool_list(self, workflow_id: str):
         """Get the list of the workflow tools and the tool properties by the workflow ID"""
         try:
-            api_response = self.workflows_api.workflows_get_workflow(workflow_id)
-            if api_response is None:
+            workflow = await self._get_model("workflows", self.workflows_api.workflows_get_workflow, workflow_id)
+            if workflow is None:
                 return "Error: Workflow not found"
             
             # Download the workflow file
-            api_response = self.workflows_api.workflows_download_workflow(workflow_id)
+            api_response = await self._download_workflow_package(workflow_id, workflow.published_version_id)
             if api_response is None:
                 return "Error: Failed to download workflow"
                 
-            temp_directory = self.configuration.temp_directory
-            # normalize the temp directory
-            temp_directory = os.path.normpath(temp_directory)
-            if not os.path.exists(temp_directory):
-                os.makedirs(temp_directory)
-            
-            with open(
-                f"{temp_directory}/{workflow_id}.yxzp",
-                "wb" if not os.path.exists(f"{temp_directory}/{workflow_id}.yxzp") else "wb+",
-            ) as f:
-                f.write(api_response)
-
-            new_directory = f"{temp_directory}/{workflow_id}"
-            if os.path.exists(new_directory):
-                shutil.rmtree(new_directory)
-            os.makedirs(new_directory)
-            
-            with zipfile.ZipFile(f"{temp_directory}/{workflow_id}.yxzp", "r") as zip_ref:
-                zip_ref.extractall(new_directory)
-            
-            yxmd_files = [file for file in os.listdir(new_directory) if file.endswith(".yxmd") or file.endswith(".yxwz")]
-            if len(yxmd_files) == 0:
-                return "Error: Workflow XML file not found after unzipping"
-            
-            yxmd_file = yxmd_files[0]
-
-            # Read as binary first, then decode as UTF-8
-            with open(f"{new_directory}/{yxmd_file}", "rb") as f:
-                binary_content = f.read()
-                try:
-                    # Try to decode as UTF-8
-                    xml_content = binary_content.decode('utf-8')
-                except UnicodeDecodeError:
-                    # If UTF-8 fails, return the binary content as a string representation
-                    xml_content = binary_content
-
-            # Parse the XML content using xmltodict
-            xml_dict = xmltodict.parse(xml_content)
-
-            # extract the tools list
-            tools_list = xml_dict['AlteryxDocument']['Nodes']['Node']
-            # if tools_list is a list, then we need to iterate through it
-            tools_dict = {}
-            if isinstance(tools_list, list):
-                for tool in tools_list:
-                    tool_id = tool['@ToolID']
-                    tool_type = tool['GuiSettings']['@Plugin']
-                    tool_dict = tool['Properties']['Configuration']
-                    # Add the tool type to the tool dictionary
-                    tool_dict['ToolType'] = tool_type
-
-                    # Remove all properties BG_Image, Font, TextColor, FillColor, Justification, TextSize
-                    tool_dict.pop('BG_Image', None)
-                    tool_dict.pop('Font', None)
-                    tool_dict.pop('TextColor', None)
-                    tool_dict.pop('FillColor', None)
-                    tool_dict.pop('Justification', None)
-                    tool_dict.pop('TextSize', None)
-
-                    # Remove the data encoded in the tool
-                    tool_dict.pop('Data', None)
-
-                    tools_dict[tool_id] = tool_dict
-            else:
-                tool_id = tools_list['@ToolID']
-                tool_type = tools_list['GuiSettings']['@Plugin']
-                tool_dict = tools_list['Properties']['Configuration']
-                # Add the tool type to the tool dictionary
-                tool_dict['ToolType'] = tool_type
-
-                # Remove all properties BG_Image, Font, TextColor, FillColor, Justification, TextSize
-                tool_dict.pop('BG_Image', None)
-                tool_dict.pop('Font', None)
-                tool_dict.pop('TextColor', None)
-                tool_dict.pop('FillColor', None)
-                tool_dict.pop('Justification', None)
-                tool_dict.pop('TextSize', None)
-
-                # Remove the data encoded in the tool
-                tool_dict.pop('Data', None)
-
-                # Add the tool dictionary to the tools dictionary
-                tools_dict[tool_id] = tool_dict
-            return pprint.pformat(tools_dict)
+            # Parse the workflow document as it streams out of the downloaded package
+            try:
+                tools_dict = await asyncio.to_thread(read_tool_list, api_response)
+            except WorkflowPackageError as e:
+                return f"Error: {e}"
+            return to_data(tools_dict)
                     
         except Exception as e:
             return f"Error: {str(e)}"
+
+    async def get_workflow_graph(self, workflow_id: str):
+        """Get the tools, connections, containers and macros of a workflow,
+        with its sources, sinks and the topological order of its tools"""
+        try:
+            graph = await self._get_workflow_graph(workflow_id)
+            if graph is None:
+                return "Error: Workflow not found"
+            return graph.to_data()
+        except (ApiException, WorkflowPackageError) as e:
+            return f"Error: {e}"
+
+    async def get_workflow_data_flow(self, workflow_id: str):
+        """Get the sources and the sinks of a workflow and the order in which its tools process the data"""
+        try:
+            graph = await self._get_workflow_graph(workflow_id)
+            if graph is None:
+                return "Error: Workflow not found"
+            return {
+                "sources": graph.describe(graph.sources()),
+                "sinks": graph.describe(graph.sinks()),
+                "topological_order": graph.topological_order(),
+            }
+        except (ApiException, WorkflowPackageError) as e:
+            return f"Error: {e}"
+
+    async def get_workflow_upstream_tools(self, workflow_id: str, tool_id: str, recursive: bool = False):
+        """Get the tools feeding a tool of a workflow, or every tool it depends on if `recursive`"""
+        return await self._get_workflow_neighbors(workflow_id, str(tool_id), recursive, upstream=True)
+
+    async def get_workflow_downstream_tools(self, workflow_id: str, tool_id: str, recursive: bool = False):
+        """Get the tools fed by a tool of a workflow, or every tool depending on it if `recursive`"""
+        return await self._get_workflow_neighbors(workflow_id, str(tool_id), recursive, upstream=False)
+
+    async def find_workflows_by_dependency(
+        self,
+        connection_id: Optional[str] = None,
+        credential_id: Optional[str] = None,
+        file_path: Optional[str] = None,
+    ):
+        """Find the published workflows using a data connection, a credential or a file path.
+        File paths match every file under them, e.g. a share path."""
+        queries = _not_none(connections=connection_id, credentials=credential_id, files=file_path)
+        if len(queries) != 1:
+            return "Error: Give exactly one of connection_id, credential_id or file_path"
+        (kind, value), = queries.items()
+        try:
+            workflows = await self.dependency_index.query(
+                kind,
+                value,
+                lambda: self._get_list("workflows", self.workflows_api.workflows_get_workflows),
+                self._download_published_package,
+                prefix=kind == "files",
+            )
+            return {"workflows": workflows, "index": self.dependency_index.stats()}
+        except (ApiException, ValueError) as e:
+            return f"Error: {e}"
+
+    async def _get_workflow_neighbors(self, workflow_id: str, tool_id: str, recursive: bool, upstream: bool):
+        try:
+            graph = await self._get_workflow_graph(workflow_id)
+            if graph is None:
+                return "Error: Workflow not found"
+            if tool_id not in graph.tools:
+                return f"Error: Tool {tool_id} not found in the workflow"
+            tool_ids = graph.upstream(tool_id, recursive) if upstream else graph.downstream(tool_id, recursive)
+            return {"tool": graph.tools[tool_id], "tools": graph.describe(tool_ids)}
+        except (ApiException, WorkflowPackageError) as e:
+            return f"Error: {e}"
@@ -0,0 +1,157 @@
+import heapq
+import io
+import zipfile
+from collections import deque
+from typing import Any, Dict, List, Optional, Set
+
+from src.workflow_package import WorkflowPackageError, find_workflow_member
+from src.workflow_xml import parse_workflow_graph
+
+# Extension of the macro documents inside a package
+MACRO_EXTENSION = ".yxmc"
+
+# Macros used by macros are resolved down to this depth
+MAX_MACRO_DEPTH = 4
+
+
+class WorkflowGraph:
+    """Tools and connections of a workflow document, indexed for data flow queries.
+
+    Built once per published workflow version and kept in the catalog cache, so the queries below
+    run on in-memory adjacency sets:
+
+    - `upstream` and `downstream` tools of a tool, directly connected or transitively.
+    - `topological_order` of the tools, every tool after the tools feeding it.
+    - `sources` (connected tools without input) and `sinks` (connected tools without output).
+
+    `containers` maps the tool containers to the tools they hold, and `macros` maps the macro
+    paths used by the tools to the graph of the macro when the package embeds it.
+    """
+
+    def __init__(self, tools: List[Dict[str, Any]], connections: List[Dict[str, Any]]):
+        self.tools: Dict[str, Dict[str, Any]] = {tool["tool_id"]: tool for tool in tools}
+        self.connections = connections
+        self.macros: Dict[str, Optional["WorkflowGraph"]] = {}
+        self.containers: Dict[str, List[str]] = {}
+        for tool in tools:
+            if tool["container"] is not None:
+                self.containers.setdefault(tool["container"], []).append(tool["tool_id"])
+            if tool["macro"]:
+                self.macros.setdefault(tool["macro"], None)
+
+        self._upstream: Dict[str, Set[str]] = {}
+        self._downstream: Dict[str, Set[str]] = {}
+        for connection in connections:
+            self._downstream.setdefault(connection["origin"], set()).add(connection["destination"])
+            self._upstream.setdefault(connection["destination"], set()).add(connection["origin"])
+        self._topological_order: Optional[List[str]] = None
+
+    @classmethod
+    def from_package(cls, package_bytes: bytes) -> "WorkflowGraph":
+        """Build the graph of the workflow document of a package held in memory, with its embedded macros"""
+        try:
+            with zipfile.ZipFile(io.BytesIO(package_bytes)) as package:
+                graph = cls._from_member(package, find_workflow_member(package))
+                graph._resolve_macros(package, MAX_MACRO_DEPTH, set())
+                return graph
+        except zipfile.BadZipFile as e:
+            raise WorkflowPackageError(f"Invalid workflow package file: {e}")
+
+    @classmethod
+    def _from_member(cls, package: zipfile.ZipFile, member: zipfile.ZipInfo) -> "WorkflowGraph":
+        with package.open(member) as stream:
+            target = parse_workflow_graph(stream)
+        return cls(target.tools, target.connections)
+
+    def _resolve_macros(self, package: zipfile.ZipFile, depth: int, resolving: Set[str]):
+        if depth <= 0:
+            return
+        # Macro paths are recorded as they were on the designer machine, match them on the file name
+        members = {
+            info.filename.replace("\\", "/").rsplit("/", 1)[-1].lower(): info
+            for info in package.infolist()
+            if info.filename.lower().endswith(MACRO_EXTENSION)
+        }
+        for macro in self.macros:
+            name = macro.replace("\\", "/").rsplit("/", 1)[-1].lower()
+            member = members.get(name)
+            if member is None or name in resolving:
+                continue
+            graph = self._from_member(package, member)
+            graph._resolve_macros(package, depth - 1, resolving | {name})
+            self.macros[macro] = graph
+
+    def _check(self, tool_id: str):
+        if tool_id not in self.tools:
+            raise KeyError(f"Tool {tool_id} not found in the workflow")
+
+    def upstream(self, tool_id: str, recursive: bool = False) -> List[str]:
+        """Return the tools feeding `tool_id`, or every tool it depends on if `recursive`, in topological order"""
+        return self._walk(tool_id, self._upstream, recursive)
+
+    def downstream(self, tool_id: str, recursive: bool = False) -> List[str]:
+        """Return the tools fed by `tool_id`, or every tool depending on it if `recursive`, in topological order"""
+        return self._walk(tool_id, self._downstream, recursive)
+
+    def _walk(self, tool_id: str, adjacency: Dict[str, Set[str]], recursive: bool) -> List[str]:
+        self._check(tool_id)
+        found = set(adjacency.get(tool_id, ()))
+        if recursive:
+            queue = deque(found)
+            while queue:
+                for next_id in adjacency.get(queue.popleft(), ()):
+                    if next_id not in found:
+                        found.add(next_id)
+                        queue.append(next_id)
+            found.discard(tool_id)
+        return [tool for tool in self.topological_order() if tool in found]
+
+    def topological_order(self) -> List[str]:
+        """Return the tool ids ordered so that every tool comes after the tools feeding it.
+
+        Ties keep the document order. Tools caught in a cycle, which a valid workflow does not
+        have, are appended at the end in document order.
+        """
+        if self._topological_order is None:
+            position = {tool_id: index for index, tool_id in enumerate(self.tools)}
+            inputs = {tool_id: len(self._upstream.get(tool_id, ())) for tool_id in self.tools}
+            ready = [(position[tool_id], tool_id) for tool_id, count in inputs.items() if count == 0]
+            heapq.heapify(ready)
+            order = []
+            while ready:
+                _, tool_id = heapq.heappop(ready)
+                order.append(tool_id)
+                for next_id in self._downstream.get(tool_id, ()):
+                    if next_id in inputs:
+                        inputs[next_id] -= 1
+                        if inputs[next_id] == 0:
+                            heapq.heappush(ready, (position[next_id], next_id))
+            if len(order) < len(self.tools):
+                ordered = set(order)
+                order += [tool_id for tool_id in self.tools if tool_id not in ordered]
+            self._topological_order = order
+        return self._topological_order
+
+    def sources(self) -> List[str]:
+        """Return the connected tools without an incoming connection, usually the inputs of the workflow"""
+        return [tool_id for tool_id in self.tools if tool_id in self._downstream and tool_id not in self._upstream]
+
+    def sinks(self) -> List[str]:
+        """Return the connected tools without an outgoing connection, usually the outputs of the workflow"""
+        return [tool_id for tool_id in self.tools if tool_id in self._upstream and tool_id not in self._downstream]
+
+    def describe(self, tool_ids: List[str]) -> List[Dict[str, Any]]:
+        """Return the tool records of `tool_ids`"""
+        return [self.tools[tool_id] for tool_id in tool_ids if tool_id in self.tools]
+
+    def to_data(self) -> Dict[str, Any]:
+        """Return the whole graph as JSON-compatible data"""
+        return {
+            "tools": list(self.tools.values()),
+            "connections": self.connections,
+            "containers": self.containers,
+            "macros": {path: graph.to_data() if graph is not None else None for path, graph in self.macros.items()},
+            "sources": self.sources(),
+            "sinks": self.sinks(),
+            "topological_order": self.topological_order(),
+        }
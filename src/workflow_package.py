@@ -0,0 +1,60 @@
+import io
+import os
+import threading
+import zipfile
+from typing import Any, Dict, Tuple
+
+from src.workflow_xml import iter_tool_configs, tool_list
+
+# Extensions of the workflow and analytic app documents inside a package
+WORKFLOW_EXTENSIONS = (".yxmd", ".yxwz")
+
+
+class WorkflowPackageError(Exception):
+    """The package is not a valid zip file or does not contain a workflow document"""
+
+
+def find_workflow_member(package: zipfile.ZipFile) -> zipfile.ZipInfo:
+    """Return the workflow document of a package, preferring a top level one.
+
+    Only the central directory is read, no member is decompressed.
+    """
+    members = [info for info in package.infolist() if info.filename.lower().endswith(WORKFLOW_EXTENSIONS)]
+    if not members:
+        raise WorkflowPackageError("No Workflow or Analytics App XML file found in the workflow package file")
+    return min(members, key=lambda info: info.filename.count("/"))
+
+
+def read_workflow_xml(package_bytes: bytes) -> Tuple[str, bytes]:
+    """Return the file name and the raw XML of the workflow document of a package held in memory.
+
+    Only the workflow document is decompressed, embedded data files and macros are left untouched.
+    """
+    try:
+        with zipfile.ZipFile(io.BytesIO(package_bytes)) as package:
+            member = find_workflow_member(package)
+            return os.path.basename(member.filename), package.read(member)
+    except zipfile.BadZipFile as e:
+        raise WorkflowPackageError(f"Invalid workflow package file: {e}")
+
+
+def read_tool_list(package_bytes: bytes) -> Dict[str, Any]:
+    """Return the tool configurations of the workflow document of a package held in memory, by tool id.
+
+    The document is decompressed and parsed as a stream, it is never held in memory as a whole.
+    """
+    try:
+        with zipfile.ZipFile(io.BytesIO(package_bytes)) as package:
+            with package.open(find_workflow_member(package)) as stream:
+                return tool_list(iter_tool_configs(stream))
+    except zipfile.BadZipFile as e:
+        raise WorkflowPackageError(f"Invalid workflow package file: {e}")
+
+
+def write_file(path: str, data: bytes):
+    """Write `data` to `path` through a temporary file, so that concurrent calls never see a partial file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
@@ -0,0 +1,308 @@
+import re
+import xml.etree.ElementTree as ET
+from typing import IO, Any, Dict, Iterator, List, Optional, Set, Tuple
+
+# Children of a tool configuration that only hold embedded data or GUI settings, and are skipped by the parser
+SKIPPED_CONFIGURATION_ELEMENTS = frozenset(
+    ("Data", "BG_Image", "Font", "TextColor", "FillColor", "Justification", "TextSize")
+)
+
+# Size of the chunks fed to the XML parser
+CHUNK_SIZE = 64 * 1024
+
+# (tool id, plugin of the tool, configuration of the tool)
+ToolConfig = Tuple[str, Optional[str], Optional[Any]]
+
+
+class _Element:
+    __slots__ = ("attrib", "children", "text")
+
+    def __init__(self, attrib: Dict[str, str]):
+        self.attrib = attrib
+        self.children: Dict[str, Any] = {}
+        self.text: List[str] = []
+
+    def value(self) -> Any:
+        """Return the element in the layout of `xmltodict.parse`: `@` attributes, `#text` and lists for repeats"""
+        text = "".join(self.text).strip() or None
+        if not self.attrib and not self.children:
+            return text
+        value = {f"@{key}": item for key, item in self.attrib.items()}
+        value.update(self.children)
+        if text is not None:
+            value["#text"] = text
+        return value
+
+    def add_child(self, tag: str, value: Any):
+        if tag not in self.children:
+            self.children[tag] = value
+        elif isinstance(self.children[tag], list):
+            self.children[tag].append(value)
+        else:
+            self.children[tag] = [self.children[tag], value]
+
+
+class _Node:
+    __slots__ = ("tool_id", "plugin", "configuration")
+
+    def __init__(self, tool_id: str):
+        self.tool_id = tool_id
+        self.plugin: Optional[str] = None
+        self.configuration: Optional[Any] = None
+
+
+class ToolConfigTarget:
+    """XML parser target collecting the configuration of every tool of a workflow document.
+
+    Only the `Properties/Configuration` element of each `Node` is built, the rest of the document
+    is dropped as it streams through the parser. The children listed in
+    `SKIPPED_CONFIGURATION_ELEMENTS` are not built either, so base64 data and GUI settings never
+    take memory. Tools nested in containers are collected too. The finished tools are appended to
+    `tools` and can be consumed while parsing goes on.
+    """
+
+    def __init__(self):
+        self.tools: List[ToolConfig] = []
+        self._path: List[str] = []
+        self._nodes: List[_Node] = []
+        # Elements of the configuration being built, the configuration itself first
+        self._elements: List[_Element] = []
+        # Depth inside a skipped element
+        self._skipping = 0
+
+    def start(self, tag: str, attrib: Dict[str, str]):
+        path = self._path
+        path.append(tag)
+        if self._skipping:
+            self._skipping += 1
+        elif self._elements:
+            if len(self._elements) == 1 and tag in SKIPPED_CONFIGURATION_ELEMENTS:
+                self._skipping = 1
+            else:
+                self._elements.append(_Element(dict(attrib)))
+        elif tag == "Node" and len(path) >= 2 and path[-2] in ("Nodes", "ChildNodes"):
+            self._nodes.append(_Node(attrib.get("ToolID")))
+        elif not self._nodes:
+            pass
+        elif tag == "GuiSettings" and path[-2] == "Node":
+            self._nodes[-1].plugin = attrib.get("Plugin")
+        elif tag == "Configuration" and path[-2] == "Properties" and path[-3] == "Node":
+            self._elements.append(_Element(dict(attrib)))
+
+    def end(self, tag: str):
+        self._path.pop()
+        if self._skipping:
+            self._skipping -= 1
+        elif self._elements:
+            element = self._elements.pop()
+            if self._elements:
+                self._elements[-1].add_child(tag, element.value())
+            else:
+                self._nodes[-1].configuration = element.value()
+        elif tag == "Node" and self._nodes:
+            node = self._nodes.pop()
+            self.tools.append((node.tool_id, node.plugin, node.configuration))
+
+    def data(self, text: str):
+        if self._elements and not self._skipping:
+            self._elements[-1].text.append(text)
+
+    def close(self):
+        return None
+
+
+def iter_tool_configs(stream: IO[bytes], chunk_size: int = CHUNK_SIZE) -> Iterator[ToolConfig]:
+    """Yield `(tool_id, plugin, configuration)` for every tool of the workflow document read from `stream`.
+
+    The document is parsed incrementally, so memory is bounded by the largest tool configuration
+    rather than by the size of the document.
+    """
+    target = ToolConfigTarget()
+    parser = ET.XMLParser(target=target)
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        parser.feed(chunk)
+        if target.tools:
+            yield from target.tools
+            target.tools.clear()
+    parser.close()
+    yield from target.tools
+
+
+def tool_list(tools: Iterator[ToolConfig]) -> Dict[str, Any]:
+    """Return the configurations of `tools` by tool id, with the plugin of each tool as `ToolType`"""
+    result = {}
+    for tool_id, plugin, configuration in tools:
+        if not isinstance(configuration, dict):
+            configuration = {} if configuration is None else {"#text": configuration}
+        configuration["ToolType"] = plugin
+        result[tool_id] = configuration
+    return result
+
+
+class WorkflowGraphTarget:
+    """XML parser target collecting the tools and the connections of a workflow document.
+
+    No configuration is built, so memory only grows with the number of tools and connections.
+    Each tool is recorded as a dict with its `tool_id`, `tool_type` (the plugin), the `container`
+    it is nested in, the `macro` it runs and its `annotation`; each connection as a dict with the
+    `origin` and `destination` tool ids and anchors, its `name` and whether it is `wireless`.
+    """
+
+    def __init__(self):
+        self.tools: List[Dict[str, Any]] = []
+        self.connections: List[Dict[str, Any]] = []
+        self._path: List[str] = []
+        # Tools being parsed, containers first
+        self._nodes: List[Dict[str, Any]] = []
+        self._connection: Optional[Dict[str, Any]] = None
+        # Annotation texts of the innermost tool, by element name
+        self._text: Optional[List[str]] = None
+        self._annotation: Dict[str, str] = {}
+
+    def start(self, tag: str, attrib: Dict[str, str]):
+        path = self._path
+        path.append(tag)
+        parent = path[-2] if len(path) >= 2 else None
+        if tag == "Node" and parent in ("Nodes", "ChildNodes"):
+            node = {
+                "tool_id": attrib.get("ToolID"),
+                "tool_type": None,
+                "container": self._nodes[-1]["tool_id"] if self._nodes else None,
+                "macro": None,
+                "annotation": None,
+            }
+            self._nodes.append(node)
+            # Tools are listed in document order, containers before their children
+            self.tools.append(node)
+            self._annotation = {}
+        elif tag == "GuiSettings" and parent == "Node" and self._nodes:
+            self._nodes[-1]["tool_type"] = attrib.get("Plugin")
+        elif tag == "EngineSettings" and parent == "Node" and self._nodes:
+            self._nodes[-1]["macro"] = attrib.get("Macro") or None
+        elif tag in ("Name", "DefaultAnnotationText") and parent == "Annotation" and self._nodes:
+            self._text = []
+        elif tag == "Connection" and parent == "Connections":
+            self._connection = {
+                "origin": None,
+                "origin_anchor": None,
+                "destination": None,
+                "destination_anchor": None,
+                "name": attrib.get("name") or None,
+                "wireless": attrib.get("Wireless", "").lower() == "true",
+            }
+        elif tag in ("Origin", "Destination") and parent == "Connection" and self._connection is not None:
+            key = tag.lower()
+            self._connection[key] = attrib.get("ToolID")
+            self._connection[f"{key}_anchor"] = attrib.get("Connection")
+
+    def end(self, tag: str):
+        path = self._path
+        path.pop()
+        if tag == "Node" and self._nodes and path and path[-1] in ("Nodes", "ChildNodes"):
+            self._nodes.pop()
+        elif self._text is not None and tag in ("Name", "DefaultAnnotationText"):
+            self._annotation[tag] = "".join(self._text).strip()
+            self._text = None
+            self._nodes[-1]["annotation"] = self._annotation.get("Name") or self._annotation.get(
+                "DefaultAnnotationText"
+            ) or None
+        elif tag == "Connection" and self._connection is not None:
+            if self._connection["origin"] is not None and self._connection["destination"] is not None:
+                self.connections.append(self._connection)
+            self._connection = None
+
+    def data(self, text: str):
+        if self._text is not None:
+            self._text.append(text)
+
+    def close(self):
+        return None
+
+
+def parse_workflow_graph(stream: IO[bytes], chunk_size: int = CHUNK_SIZE) -> WorkflowGraphTarget:
+    """Parse the tools and the connections of the workflow document read from `stream` incrementally"""
+    target = WorkflowGraphTarget()
+    parser = ET.XMLParser(target=target)
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        parser.feed(chunk)
+    parser.close()
+    return target
+
+
+# Elements whose text is a file path, or a data connection when it starts with `aka:`
+FILE_ELEMENTS = frozenset(("File", "FileName", "OutputFileName", "Path"))
+
+# Prefix of the named data connections in file elements, e.g. `aka:Sales DB|||dbo.Orders`
+CONNECTION_ALIAS_PREFIX = "aka:"
+
+# Connection strings such as `odbc:DSN=...` are not file paths, drive letters and URLs are
+_CONNECTION_STRING = re.compile(r"^[A-Za-z][\w+.-]+:(?![\\/])")
+
+
+class DependencyTarget:
+    """XML parser target collecting the data connections, credentials and file paths a workflow document uses.
+
+    Elements and attributes named `...ConnectionId` and `...CredentialId` give the connection and
+    credential ids, the file elements (`FILE_ELEMENTS`) the file paths, and file elements starting
+    with `aka:` the named data connections. Only the text of those elements is kept, so embedded
+    data never takes memory. The results are in the `connections`, `credentials` and `files` sets.
+    """
+
+    def __init__(self):
+        self.connections: Set[str] = set()
+        self.credentials: Set[str] = set()
+        self.files: Set[str] = set()
+        # (tag, collected text) of the elements whose text is kept
+        self._texts: List[Tuple[str, List[str]]] = []
+
+    def _add(self, name: str, value: Optional[str]):
+        value = (value or "").strip()
+        if not value:
+            return
+        name = name.lower()
+        if name.endswith("connectionid"):
+            self.connections.add(value)
+        elif name.endswith("credentialid"):
+            self.credentials.add(value)
+        elif value.startswith(CONNECTION_ALIAS_PREFIX):
+            self.connections.add(value[len(CONNECTION_ALIAS_PREFIX):].split("|||")[0])
+        elif not _CONNECTION_STRING.match(value):
+            # e.g. `\\share\sales.xlsx|||Sheet1$`
+            self.files.add(value.split("|||")[0])
+
+    def start(self, tag: str, attrib: Dict[str, str]):
+        for name, value in attrib.items():
+            if name.lower().endswith(("connectionid", "credentialid")):
+                self._add(name, value)
+        if tag in FILE_ELEMENTS or tag.lower().endswith(("connectionid", "credentialid")):
+            self._texts.append((tag, []))
+
+    def end(self, tag: str):
+        if self._texts and self._texts[-1][0] == tag:
+            _, text = self._texts.pop()
+            self._add(tag, "".join(text))
+
+    def data(self, text: str):
+        if self._texts:
+            self._texts[-1][1].append(text)
+
+    def close(self):
+        return None
+
+
+def parse_dependencies(stream: IO[bytes], target: DependencyTarget, chunk_size: int = CHUNK_SIZE) -> DependencyTarget:
+    """Parse the dependencies of the workflow document read from `stream` incrementally into `target`"""
+    parser = ET.XMLParser(target=target)
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        parser.feed(chunk)
+    parser.close()
+    return target
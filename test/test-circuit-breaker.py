@@ -0,0 +1,145 @@
+import io
+import time
+from types import SimpleNamespace
+
+import urllib3
+
+import src.server_client as server_client
+from src.server_client.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from src.server_client.rest import ApiException
+
+HOST = "http://server/webapi/v3"
+
+
+class FakePoolManager:
+    """Stands in for the urllib3 pool manager, answering every request with `handler(method, url)`"""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests = []
+
+    def request(self, method, url, preload_content=True, **kwargs):
+        self.requests.append(url)
+        status, seconds = self.handler(method, url)
+        time.sleep(seconds)
+        return urllib3.HTTPResponse(
+            body=io.BytesIO(b"{}"), status=status, headers={"Content-Type": "application/json"},
+            preload_content=preload_content,
+        )
+
+
+def client(handler, **settings):
+    configuration = server_client.Configuration()
+    configuration.host = HOST
+    configuration.retry_max_retries = 0
+    configuration.rate_limit_requests_per_second = 0
+    configuration.http_cache_enabled = False
+    configuration.request_coalescing = False
+    for name, value in settings.items():
+        setattr(configuration, name, value)
+    api_client = server_client.ApiClient(configuration)
+    api_client.rest_client.pool_manager = FakePoolManager(handler)
+    return api_client
+
+
+def get(api_client, path, **path_params):
+    return api_client.call_api(path, "GET", path_params=path_params, response_type="object",
+                               _return_http_data_only=True)
+
+
+def test_state_machine():
+    """closed -> open -> half open -> closed, and a failed probe opens the breaker again"""
+    configuration = SimpleNamespace(circuit_breaker_window=4, circuit_breaker_failure_rate=0.5,
+                                    circuit_breaker_slow_call_seconds=1.0, circuit_breaker_open_seconds=0.1)
+    breaker = CircuitBreaker("/workflows/{workflowId}", configuration)
+    failure = ApiException(status=503, reason="Service Unavailable")
+
+    for _ in range(2):
+        breaker.after_call(breaker.before_call(), 0.01, failure)
+    assert breaker.state == OPEN
+    try:
+        breaker.before_call()
+        raise AssertionError("an open breaker let a call through")
+    except CircuitOpenError:
+        pass
+
+    time.sleep(0.1)
+    probe = breaker.before_call()
+    assert probe and breaker.state == HALF_OPEN
+    try:
+        breaker.before_call()
+        raise AssertionError("a half open breaker let a second call through while probing")
+    except CircuitOpenError:
+        pass
+    breaker.after_call(probe, 0.01, failure)
+    assert breaker.state == OPEN
+
+    time.sleep(0.1)
+    breaker.after_call(breaker.before_call(), 0.01)
+    assert breaker.state == CLOSED
+    assert breaker.stats()["opened"] == 2 and breaker.stats()["rejected"] == 2
+    # client errors do not count against the endpoint
+    for _ in range(4):
+        breaker.after_call(breaker.before_call(), 0.01, ApiException(status=404, reason="Not Found"))
+    assert breaker.state == CLOSED
+    print("state machine: ok")
+
+
+def test_endpoints_fail_fast_independently():
+    """A failing endpoint opens its own breaker and fails fast, the other endpoints keep working"""
+    api_client = client(
+        lambda method, url: (503 if "/workflows/" in url else 200, 0),
+        circuit_breaker_window=4, circuit_breaker_open_seconds=60, rate_limit_requests_per_second=1000,
+    )
+    pool_manager = api_client.rest_client.pool_manager
+    errors = []
+    for i in range(6):
+        try:
+            get(api_client, "/workflows/{workflowId}", workflowId=str(i))
+        except ApiException as e:
+            errors.append(type(e).__name__)
+    assert errors == ["ApiException"] * 2 + ["CircuitOpenError"] * 4, errors
+    assert len(pool_manager.requests) == 2, "requests were sent while the breaker was open"
+    lanes = api_client.configuration.rate_limiter.stats()["lanes"]
+    assert lanes["interactive"]["requests"] == 2, "the calls rejected by the breaker took rate limit tokens"
+    assert get(api_client, "/users/{userId}", userId="u1") == {}
+    stats = api_client.configuration.circuit_breakers.stats()
+    assert stats["open"] == ["/workflows/{workflowId}"]
+    assert stats["endpoints"]["/users/{userId}"]["state"] == CLOSED
+    print("fail fast per endpoint: ok")
+
+
+def test_waits_are_not_slow_calls():
+    """Rate limiter waits and retry backoff do not make a healthy endpoint look slow"""
+    attempts = {"count": 0}
+
+    def flaky(method, url):
+        attempts["count"] += 1
+        return (503 if attempts["count"] % 2 else 200), 0
+
+    api_client = client(
+        flaky,
+        circuit_breaker_window=4, circuit_breaker_failure_rate=0.75, circuit_breaker_slow_call_seconds=0.1,
+        rate_limit_requests_per_second=5, rate_limit_burst=1,
+        retry_max_retries=1, retry_backoff_seconds=0.2, retry_backoff_max_seconds=0.2,
+    )
+    start = time.monotonic()
+    for i in range(4):
+        get(api_client, "/jobs/{jobId}", jobId=str(i))
+    elapsed = time.monotonic() - start
+    stats = api_client.configuration.circuit_breakers.stats()["endpoints"]["/jobs/{jobId}"]
+    assert elapsed > 1.0, "the rate limiter did not throttle the calls"
+    assert stats["slow_calls"] == 0 and stats["state"] == CLOSED, stats
+    assert stats["calls"] == 8 and stats["failures"] == 4, stats
+    print(f"throttled and retried calls are not slow: ok ({elapsed:.1f} s)")
+
+
+def main():
+    """Drive the circuit breakers through a fake transport."""
+    test_state_machine()
+    test_endpoints_fail_fast_independently()
+    test_waits_are_not_slow_calls()
+
+
+if __name__ == "__main__":
+    main()
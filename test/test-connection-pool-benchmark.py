@@ -0,0 +1,99 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import src.server_client as server_client
+
+REQUESTS_PER_RUN = 2000
+CONCURRENCY = 16
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+    """Minimal keep-alive HTTP handler that counts new TCP connections."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with CountingHandler.lock:
+            CountingHandler.connections += 1
+
+    def do_GET(self):
+        body = b'{"id": "abc", "name": "benchmark"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def build_getters(configuration, shared: bool):
+    """Build the seven API facades the same way AYXMCPTools does, with or without a shared ApiClient."""
+    shared_client = server_client.ApiClient(configuration) if shared else None
+
+    def client():
+        return shared_client or server_client.ApiClient(configuration)
+
+    return [
+        server_client.CollectionsApi(client()).collections_get_collection,
+        server_client.WorkflowsApi(client()).workflows_get_workflow,
+        server_client.UsersApi(client()).users_get_user,
+        server_client.JobsApi(client()).jobs_get_job_v3,
+        server_client.CredentialsApi(client()).credentials_get_credential,
+        server_client.DCMEApi(client()).d_cme_get_dcm_connection,
+        server_client.SchedulesApi(client()).schedules_get_schedule,
+    ]
+
+
+def run(configuration, shared: bool):
+    CountingHandler.connections = 0
+    getters = build_getters(configuration, shared)
+    latencies = []
+
+    def call(i):
+        start = time.perf_counter()
+        getters[i % len(getters)]("abc")
+        latencies.append(time.perf_counter() - start)
+
+    with ThreadPoolExecutor(CONCURRENCY) as executor:
+        list(executor.map(call, range(REQUESTS_PER_RUN)))
+
+    latencies.sort()
+    return {
+        "connections": CountingHandler.connections,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    """Compare one ApiClient per API facade against a single shared ApiClient."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    configuration = server_client.Configuration()
+    configuration.host = f"http://127.0.0.1:{server.server_port}"
+    configuration.client_id = ""
+    configuration.client_secret = ""
+    configuration.connection_pool_maxsize = CONCURRENCY
+
+    for label, shared in (("per-facade clients", False), ("shared client", True)):
+        result = run(configuration, shared)
+        print(
+            f"{label:20s} connections={result['connections']:4d} "
+            f"p50={result['p50_ms']:.2f}ms p99={result['p99_ms']:.2f}ms"
+        )
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import json
+import re
+import time
+
+import six
+from dateutil.parser import parse
+
+import src.server_client as server_client
+import src.server_client.models as server_client_models
+
+ROWS = 5000
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+def synthetic_users(count):
+    return [
+        {
+            "id": f"{i:024x}",
+            "firstName": f"First{i}",
+            "lastName": f"Last{i}",
+            "email": f"user{i}@example.com",
+            "role": "Artisan",
+            "defaultWorkerTag": "",
+            "canScheduleJobs": True,
+            "canPrioritizeJobs": False,
+            "canAssignJobs": False,
+            "canCreateCollections": True,
+            "isApiEnabled": True,
+            "defaultCredentialId": None,
+            "isAccountLocked": False,
+            "isActive": True,
+            "lastLoginDateTime": "2024-05-01T12:34:56.1234567Z",
+            "isValidated": True,
+            "sharedCredentialIds": ["a", "b"],
+            "dataConnectionIds": [],
+            "timeZone": "Europe/Berlin",
+            "language": "en-us",
+        }
+        for i in range(count)
+    ]
+
+
+def synthetic_workflows(count):
+    return [
+        {
+            "id": f"{i:024x}",
+            "sourceAppId": f"{i:024x}",
+            "name": f"Workflow {i}",
+            "ownerId": f"{i % 100:024x}",
+            "dateCreated": "2024-05-01T12:34:56Z",
+            "publishedVersionNumber": i % 7,
+            "isAmp": True,
+            "executionMode": "Standard",
+        }
+        for i in range(count)
+    ]
+
+
+def legacy_deserialize(data, klass):
+    """The deserializer as it was before compiled plans, kept here as the baseline."""
+    if data is None:
+        return None
+    if isinstance(klass, str):
+        if klass.startswith("list["):
+            sub_kls = re.match(r"list\[(.*)\]", klass).group(1)
+            return [legacy_deserialize(sub_data, sub_kls) for sub_data in data]
+        if klass in server_client.ApiClient.NATIVE_TYPES_MAPPING:
+            klass = server_client.ApiClient.NATIVE_TYPES_MAPPING[klass]
+        else:
+            klass = getattr(server_client_models, klass)
+    if klass in server_client.ApiClient.PRIMITIVE_TYPES:
+        return klass(data)
+    if klass.__name__ == "datetime":
+        return parse(data)
+    kwargs = {}
+    for attr, attr_type in six.iteritems(klass.swagger_types):
+        if klass.attribute_map[attr] in data:
+            kwargs[attr] = legacy_deserialize(data[klass.attribute_map[attr]], attr_type)
+    return klass(**kwargs)
+
+
+def bench(label, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:40s} {elapsed * 1000:9.1f} ms  {ROWS / elapsed:10.0f} rows/s")
+    return result
+
+
+def main():
+    """Deserialize large synthetic list payloads with the legacy and the compiled deserializer."""
+    api_client = server_client.ApiClient()
+
+    for response_type, payload in (
+        ("list[UserView]", synthetic_users(ROWS)),
+        ("list[ReducedWorkflowView]", synthetic_workflows(ROWS)),
+    ):
+        body = json.dumps(payload)
+        legacy = bench(f"legacy   {response_type}", lambda: legacy_deserialize(json.loads(body), response_type))
+        compiled = bench(f"compiled {response_type}", lambda: api_client.deserialize(FakeResponse(body), response_type))
+        assert [item.to_dict() for item in legacy] == [item.to_dict() for item in compiled]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import asyncio
+import gzip
+import io
+import json
+import os
+import stat
+import tempfile
+
+import httpx
+import urllib3
+
+import src.server_client as server_client
+from src.server_client.api.jobs_api import JobsApi
+from src.server_client.api.users_api import UsersApi
+from src.server_client.api.workflows_api import WorkflowsApi
+
+HOST = "http://server/webapi"
+JOB = {"id": "job1", "status": "Completed"}
+USER = {"id": "user1", "firstName": "Ada"}
+OUTPUT = os.urandom(256 * 1024)
+PACKAGE = os.urandom(64 * 1024)
+
+
+class FakeServer:
+    """Answers the requests of the tests, with 304 Not Modified when the `If-None-Match` of a request matches"""
+
+    def __init__(self):
+        self.requests = []
+        # path -> (body, ETag or None, Cache-Control of the 304 responses)
+        self.resources = {
+            "/webapi/v3/jobs/job1": (json.dumps(JOB).encode("utf8"), '"job-v1"', None),
+            "/webapi/v3/users/user1": (json.dumps(USER).encode("utf8"), None, None),
+            "/webapi/v1/jobs/job1/output/out1": (OUTPUT, '"output-v1"', None),
+            "/webapi/v3/workflows/wf1/package": (PACKAGE, '"package-v1"', None),
+        }
+
+    def respond(self, method, url, headers):
+        """Return the status, headers and body of the response"""
+        path = url.split("?", 1)[0].replace(HOST, "/webapi")
+        self.requests.append((path, dict(headers)))
+        body, etag, not_modified_cache_control = self.resources[path]
+        if etag and headers.get("If-None-Match") == etag:
+            return 304, {"ETag": etag, "Cache-Control": not_modified_cache_control or "no-cache"}, b""
+        response_headers = {"Content-Type": "application/json", "Content-Length": str(len(body))}
+        if etag:
+            response_headers["ETag"] = etag
+        return 200, response_headers, body
+
+    def count(self, path):
+        return sum(1 for requested, _ in self.requests if requested == path)
+
+
+class FakePoolManager:
+    """Stands in for the urllib3 pool manager of the sync client"""
+
+    def __init__(self, server):
+        self.server = server
+
+    def request(self, method, url, preload_content=True, headers=None, **kwargs):
+        status, response_headers, body = self.server.respond(method, url, headers or {})
+        return urllib3.HTTPResponse(
+            body=io.BytesIO(body), status=status, headers=response_headers, preload_content=preload_content,
+        )
+
+
+def client(server, directory, access_token="token", client_class=server_client.ApiClient):
+    configuration = server_client.Configuration()
+    configuration.host = HOST
+    configuration.client_id = ""
+    configuration.access_token = access_token
+    configuration.temp_directory = directory
+    configuration.rate_limit_requests_per_second = 0
+    configuration.request_coalescing = False
+    configuration.http_cache_enabled = True
+    configuration.http_cache_ttl_seconds = 0
+    configuration.http_cache_ttl_classes = {"users": 60}
+    api_client = client_class(configuration)
+    if client_class is server_client.ApiClient:
+        api_client.rest_client.pool_manager = FakePoolManager(server)
+    return api_client
+
+
+def test_not_modified(directory):
+    """Responses with an ETag are revalidated, and served from the cache on 304"""
+    server = FakeServer()
+    api_client = client(server, directory)
+    jobs_api = JobsApi(api_client)
+    path = "/webapi/v3/jobs/job1"
+
+    assert api_client.call_json(jobs_api.jobs_get_job_v3, "job1") == JOB
+    assert api_client.call_json(jobs_api.jobs_get_job_v3, "job1") == JOB
+    assert jobs_api.jobs_get_job_v3("job1").id == "job1"
+    assert server.count(path) == 3
+    assert "If-None-Match" not in server.requests[0][1]
+    assert all(headers["If-None-Match"] == '"job-v1"' for _, headers in server.requests[1:])
+    assert api_client.configuration.http_cache.stats()["revalidated"] == 2
+
+    # A 304 with a max-age makes the entry fresh, on disk too
+    server.resources[path] = server.resources[path][:2] + ("max-age=60",)
+    api_client.call_json(jobs_api.jobs_get_job_v3, "job1")
+    assert server.count(path) == 4
+    restarted = client(server, directory)
+    assert restarted.call_json(JobsApi(restarted).jobs_get_job_v3, "job1") == JOB
+    assert server.count(path) == 4, "the max-age of the 304 was not written to disk"
+    assert restarted.configuration.http_cache.stats()["fresh_hits"] == 1
+    print("304 Not Modified: ok")
+
+
+def test_ttl(directory):
+    """Responses without validators are served for the TTL of their endpoint class, and only for it"""
+    server = FakeServer()
+    api_client = client(server, directory)
+    users_api = UsersApi(api_client)
+    for _ in range(3):
+        assert api_client.call_json(users_api.users_get_user, "user1") == USER
+    assert server.count("/webapi/v3/users/user1") == 1
+
+    server.requests.clear()
+    other = client(server, tempfile.mkdtemp(dir=directory))
+    other.configuration.http_cache_ttl_classes = {}
+    for _ in range(3):
+        other.call_json(UsersApi(other).users_get_user, "user1")
+    assert server.count("/webapi/v3/users/user1") == 3
+    print("TTL fallback: ok")
+
+
+def test_identities(directory):
+    """The responses of a user are never served to another one"""
+    server = FakeServer()
+    first = client(server, directory, access_token="first token")
+    second = client(server, directory, access_token="second token")
+    first.call_json(UsersApi(first).users_get_user, "user1")
+    second.call_json(UsersApi(second).users_get_user, "user1")
+    first.call_json(UsersApi(first).users_get_user, "user1")
+    assert server.count("/webapi/v3/users/user1") == 2
+    first.call_json(JobsApi(first).jobs_get_job_v3, "job1")
+    second.call_json(JobsApi(second).jobs_get_job_v3, "job1")
+    assert not any("If-None-Match" in headers for _, headers in server.requests)
+    print("identities: ok")
+
+
+def test_streamed(directory):
+    """Downloads are written to the cache while they stream, partial reads and packages are not stored"""
+    server = FakeServer()
+    api_client = client(server, directory)
+    cache = api_client.configuration.http_cache
+    jobs_api = JobsApi(api_client)
+    path = os.path.join(directory, "output.csv")
+
+    response = jobs_api.jobs_get_output_file("job1", "out1", "Csv", _preload_content=False)
+    response.read(1024)
+    response.release_conn()
+    assert cache.stats()["stores"] == 0, "a partial body was stored"
+
+    # read_bytes stops at the Content-Length
+    assert bytes(api_client.read_bytes(jobs_api.jobs_get_output_file, "job1", "out1", "Csv",
+                                       _return_http_data_only=True)) == OUTPUT
+    assert cache.stats()["stores"] == 1
+    for _ in range(2):
+        assert api_client.download_to_file(jobs_api.jobs_get_output_file, path, "job1", "out1", "Csv") == len(OUTPUT)
+        with open(path, "rb") as f:
+            assert f.read() == OUTPUT
+    assert cache.stats()["revalidated"] == 2
+
+    workflows_api = WorkflowsApi(api_client)
+    for _ in range(2):
+        api_client.download_to_file(workflows_api.workflows_download_workflow, path, "wf1")
+    assert cache.stats()["stores"] == 1, "a workflow package was stored"
+    assert not any("If-None-Match" in headers for requested, headers in server.requests if "package" in requested)
+    print("streamed downloads: ok")
+
+
+def test_permissions(directory):
+    """The cache directory and files are only readable by the current user, also in an existing directory"""
+    server = FakeServer()
+    api_client = client(server, directory)
+    cache_directory = api_client.configuration.http_cache.directory
+    os.makedirs(cache_directory, mode=0o755)
+    os.chmod(cache_directory, 0o755)
+    api_client.call_json(JobsApi(api_client).jobs_get_job_v3, "job1")
+    api_client.download_to_file(JobsApi(api_client).jobs_get_output_file, os.path.join(directory, "output.csv"),
+                                "job1", "out1", "Csv")
+    assert stat.S_IMODE(os.stat(cache_directory).st_mode) == 0o700
+    names = os.listdir(cache_directory)
+    assert len(names) == 2 and all(stat.S_IMODE(os.stat(os.path.join(cache_directory, name)).st_mode) == 0o600
+                                   for name in names), names
+    print("permissions: ok")
+
+
+async def test_async(directory):
+    """The async client writes streamed and compressed bodies to the cache and serves them on 304"""
+    server = FakeServer()
+
+    def handler(request):
+        status, headers, body = server.respond(request.method, str(request.url), request.headers)
+        if body:
+            body = gzip.compress(body)
+            headers = dict(headers, **{"Content-Encoding": "gzip", "Content-Length": str(len(body))})
+        return httpx.Response(status, headers=headers, stream=httpx.ByteStream(body))
+
+    api_client = client(server, directory, client_class=server_client.AsyncApiClient)
+    api_client.rest_client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    jobs_api = JobsApi(api_client)
+    path = os.path.join(directory, "async-output.csv")
+    try:
+        for _ in range(2):
+            assert await api_client.download_to_file(jobs_api.jobs_get_output_file, path, "job1", "out1", "Csv") \
+                == len(OUTPUT)
+            with open(path, "rb") as f:
+                assert f.read() == OUTPUT
+        for _ in range(2):
+            assert await api_client.call_json(jobs_api.jobs_get_job_v3, "job1") == JOB
+    finally:
+        await api_client.close()
+    stats = api_client.configuration.http_cache.stats()
+    assert stats["stores"] == 2 and stats["revalidated"] == 2, stats
+    print("async client: ok")
+
+
+def main():
+    """Drive the HTTP cache through a fake transport."""
+    with tempfile.TemporaryDirectory() as directory:
+        test_not_modified(tempfile.mkdtemp(dir=directory))
+        test_ttl(tempfile.mkdtemp(dir=directory))
+        test_identities(tempfile.mkdtemp(dir=directory))
+        test_streamed(tempfile.mkdtemp(dir=directory))
+        if os.name == "posix":
+            test_permissions(tempfile.mkdtemp(dir=directory))
+        asyncio.run(test_async(tempfile.mkdtemp(dir=directory)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import json
+import sys
+import time
+
+from src.server_client.codec import JsonCodec, OrjsonCodec, orjson
+
+REPEAT = 5
+
+
+def synthetic_schedules(count):
+    """A workflows/schedules style list response, used when no recorded response is given."""
+    return [
+        {
+            "id": f"{i:024x}",
+            "name": f"Schedule {i}",
+            "workflowId": f"{i % 500:024x}",
+            "ownerId": f"{i % 50:024x}",
+            "runDateTime": "2024-05-01T12:34:56Z",
+            "timeZone": "Europe/Berlin",
+            "enabled": bool(i % 2),
+            "comment": "Nightly refresh of the sales mart — ünïcødé included",
+            "iteration": {"iterationType": "Daily", "startTime": "2024-05-01T02:00:00Z", "daysOfWeek": [1, 2, 3]},
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    """Measure decode throughput of the available JSON codecs.
+
+    Usage: python test/test-json-codec-benchmark.py [recorded-response.json ...]
+    """
+    if len(sys.argv) > 1:
+        bodies = {path: open(path, "rb").read() for path in sys.argv[1:]}
+    else:
+        bodies = {"synthetic schedules (50k)": json.dumps(synthetic_schedules(50000)).encode("utf-8")}
+
+    codecs = [JsonCodec()]
+    if orjson is not None:
+        codecs.append(OrjsonCodec())
+    else:
+        print("orjson is not installed, only the standard library codec is measured")
+
+    for label, body in bodies.items():
+        # The REST client hands the decoded str to the codec
+        text = body.decode("utf-8")
+        size_mb = len(body) / 1e6
+        print(f"{label}: {size_mb:.1f} MB")
+        for codec in codecs:
+            start = time.perf_counter()
+            for _ in range(REPEAT):
+                data = codec.loads(text)
+            decode = (time.perf_counter() - start) / REPEAT
+            start = time.perf_counter()
+            for _ in range(REPEAT):
+                codec.dumpb(data)
+            encode = (time.perf_counter() - start) / REPEAT
+            rows = len(data) if isinstance(data, list) else 1
+            print(
+                f"  {codec.name:8s} decode {decode * 1000:8.1f} ms ({size_mb / decode:7.1f} MB/s, {rows / decode:9.0f} rows/s)"
+                f"  encode {encode * 1000:8.1f} ms ({size_mb / encode:7.1f} MB/s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import asyncio
+import base64
+import io
+import os
+import time
+import zipfile
+
+from src.dependency_index import DependencyIndex
+
+WORKFLOWS = 200
+TOOLS = 100
+DOWNLOAD_SECONDS = 0.02
+
+
+def synthetic_package(i):
+    """Zip a workflow whose tools read files and use data connections, with some embedded data"""
+    data = base64.b64encode(os.urandom(2048)).decode("ascii")
+    nodes = "".join(
+        f'<Node ToolID="{t}"><GuiSettings Plugin="AlteryxBasePluginsGui.DbFileInput.DbFileInput" />'
+        f"<Properties><Configuration><File>\\\\share\\team{i % 10}\\file{t}.csv</File>"
+        f"<DcmConnectionId>connection-{t % 20}</DcmConnectionId><Fields><Field name=\"A\" /></Fields>"
+        f"<Data>{data}</Data></Configuration></Properties></Node>"
+        for t in range(TOOLS)
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as package:
+        package.writestr(f"workflow{i}.yxmd", f"<AlteryxDocument><Nodes>{nodes}</Nodes></AlteryxDocument>")
+    return buffer.getvalue()
+
+
+async def build(parse_workers, packages):
+    index = DependencyIndex(concurrency=8, parse_workers=parse_workers)
+    workflows = [{"id": str(i), "name": f"Workflow {i}", "publishedVersionNumber": 1} for i in range(WORKFLOWS)]
+
+    async def list_workflows():
+        return workflows
+
+    async def download(workflow_id):
+        # Network latency of the package download
+        await asyncio.sleep(DOWNLOAD_SECONDS)
+        return packages[int(workflow_id)]
+
+    start = time.perf_counter()
+    found = await index.query("connections", "connection-1", list_workflows, download)
+    elapsed = time.perf_counter() - start
+    index.close()
+    assert len(found) == WORKFLOWS
+    return elapsed
+
+
+def main():
+    """Compare the time to build the dependency index with threads and with a pool of parse processes."""
+    packages = [synthetic_package(i) for i in range(WORKFLOWS)]
+    print(f"{WORKFLOWS} workflows of {TOOLS} tools, {DOWNLOAD_SECONDS * 1000:.0f} ms download latency")
+    for parse_workers in sorted({0, 2, os.cpu_count() or 1}):
+        elapsed = asyncio.run(build(parse_workers, packages))
+        label = f"{parse_workers} parse processes" if parse_workers else "threads"
+        print(f"{label:20s} {elapsed:7.2f} s  {WORKFLOWS / elapsed:7.1f} workflows/s")
+
+
+if __name__ == "__main__":
+    main()
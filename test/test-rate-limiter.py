@@ -0,0 +1,94 @@
+import asyncio
+import time
+
+import httpx
+
+import src.server_client as server_client
+from src.server_client.rate_limit import background_priority
+
+HOST = "http://server/webapi/v3"
+REQUESTS_PER_SECOND = 20
+TASKS = 5
+JOBS_PER_SECOND = 2
+
+
+def client(sent, **settings):
+    """Async client whose requests are recorded in `sent` by a fake transport, as `(path, priority)`"""
+
+    def handler(request):
+        sent.append((request.url.path, request.headers["X-Priority"]))
+        return httpx.Response(200, json={})
+
+    configuration = server_client.Configuration()
+    configuration.host = HOST
+    configuration.rate_limit_requests_per_second = REQUESTS_PER_SECOND
+    configuration.rate_limit_burst = 1
+    configuration.rate_limit_classes = {}
+    configuration.http_cache_enabled = False
+    configuration.request_coalescing = False
+    for name, value in settings.items():
+        setattr(configuration, name, value)
+    api_client = server_client.AsyncApiClient(configuration)
+    api_client.rest_client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return api_client
+
+
+async def get(api_client, path, priority):
+    await api_client.call_api(path, "GET", header_params={"X-Priority": priority}, response_type="object")
+
+
+async def background(api_client, path):
+    with background_priority():
+        await get(api_client, path, "background")
+
+
+async def test_lanes():
+    """Interactive requests queued after background ones are sent first"""
+    sent = []
+    api_client = client(sent)
+    try:
+        tasks = [asyncio.create_task(background(api_client, f"/workflows/{i}")) for i in range(TASKS)]
+        await asyncio.sleep(0.01)
+        tasks += [asyncio.create_task(get(api_client, f"/jobs/{i}", "interactive")) for i in range(TASKS)]
+        await asyncio.gather(*tasks)
+    finally:
+        await api_client.close()
+    priorities = [priority for _, priority in sent]
+    # The first background request takes the burst, the interactive ones overtake the others
+    assert priorities == ["background"] + ["interactive"] * TASKS + ["background"] * (TASKS - 1), priorities
+
+    lanes = api_client.configuration.rate_limiter.stats()["lanes"]
+    assert lanes["interactive"]["requests"] == TASKS and lanes["background"]["requests"] == TASKS, lanes
+    assert lanes["background"]["max_wait_seconds"] > lanes["interactive"]["max_wait_seconds"], lanes
+    print("priority lanes: ok")
+
+
+async def test_rate():
+    """The requests to a host are spaced by the rate, and an endpoint class can be limited further"""
+    sent = []
+    api_client = client(sent, rate_limit_classes={"jobs": JOBS_PER_SECOND})
+    try:
+        start = time.monotonic()
+        await asyncio.gather(*(get(api_client, f"/users/{i}", "interactive") for i in range(TASKS)))
+        users_seconds = time.monotonic() - start
+        start = time.monotonic()
+        await asyncio.gather(*(get(api_client, f"/jobs/{i}", "interactive") for i in range(TASKS)))
+        jobs_seconds = time.monotonic() - start
+    finally:
+        await api_client.close()
+    assert (TASKS - 1) / REQUESTS_PER_SECOND * 0.8 <= users_seconds < 0.5, users_seconds
+    # The burst of the jobs bucket is twice its rate, the extra requests wait for it
+    assert jobs_seconds >= (TASKS - 2 * JOBS_PER_SECOND) / JOBS_PER_SECOND * 0.8, jobs_seconds
+    stats = api_client.configuration.rate_limiter.stats()
+    assert "server/jobs" in stats["buckets"] and stats["lanes"]["interactive"]["waited"] > 0, stats
+    print(f"rates: ok (users {users_seconds:.2f} s, jobs {jobs_seconds:.2f} s)")
+
+
+def main():
+    """Drive the rate limiter through a fake transport."""
+    asyncio.run(test_lanes())
+    asyncio.run(test_rate())
+
+
+if __name__ == "__main__":
+    main()
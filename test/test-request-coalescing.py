@@ -0,0 +1,135 @@
+import asyncio
+import io
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import urllib3
+
+import src.server_client as server_client
+from src.server_client.api.jobs_api import JobsApi
+from src.server_client.coalescing import RequestCoalescer
+
+HOST = "http://server/webapi"
+CALLS = 20
+# Time the fake server takes to answer, long enough for every call to start while the first one is in flight
+LATENCY = 0.3
+JOB = {"id": "job1", "status": "Running", "messages": [{"text": "started"}]}
+
+
+class FakePoolManager:
+    """Stands in for the urllib3 pool manager, answering every request with the job after `LATENCY`"""
+
+    def __init__(self):
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def request(self, method, url, preload_content=True, **kwargs):
+        with self._lock:
+            self.requests += 1
+        time.sleep(LATENCY)
+        return urllib3.HTTPResponse(
+            body=io.BytesIO(json.dumps(JOB).encode("utf8")), status=200,
+            headers={"Content-Type": "application/json"}, preload_content=preload_content,
+        )
+
+
+def configuration():
+    configuration = server_client.Configuration()
+    configuration.host = HOST
+    configuration.client_id = ""
+    configuration.access_token = "token"
+    configuration.rate_limit_requests_per_second = 0
+    configuration.http_cache_enabled = False
+    configuration.request_coalescer = RequestCoalescer()
+    return configuration
+
+
+def test_threads():
+    """Identical call_json and deserialized calls made by threads at the same time share one request"""
+    api_client = server_client.ApiClient(configuration())
+    pool_manager = api_client.rest_client.pool_manager = FakePoolManager()
+    jobs_api = JobsApi(api_client)
+
+    with ThreadPoolExecutor(CALLS) as executor:
+        results = list(executor.map(lambda _: api_client.call_json(jobs_api.jobs_get_job_v3, "job1"), range(CALLS)))
+    assert pool_manager.requests == 1, pool_manager.requests
+    assert all(result == JOB for result in results)
+    # Every caller decodes its own copy of the body
+    assert len({id(result) for result in results}) == CALLS
+    results[0]["messages"].append({"text": "changed by a caller"})
+    assert results[1] == JOB
+    stats = api_client.configuration.request_coalescer.stats()
+    assert stats["calls"] == CALLS and stats["requests"] == 1 and stats["in_flight"] == 0, stats
+
+    with ThreadPoolExecutor(CALLS) as executor:
+        jobs = list(executor.map(lambda _: jobs_api.jobs_get_job_v3("job1"), range(CALLS)))
+    assert pool_manager.requests == 2, pool_manager.requests
+    assert all(job.id == "job1" for job in jobs) and len({id(job) for job in jobs}) == CALLS
+
+    # Streamed reads are not coalesced
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(
+            lambda _: api_client.read_bytes(jobs_api.jobs_get_job_v3, "job1", _return_http_data_only=True), range(4)
+        ))
+    assert pool_manager.requests == 6, pool_manager.requests
+    print(f"threads: {CALLS} identical calls, 1 request: ok")
+
+
+def test_identities():
+    """Calls made with different credentials never share a request"""
+    api_client = server_client.ApiClient(configuration())
+    pool_manager = api_client.rest_client.pool_manager = FakePoolManager()
+    other_configuration = configuration()
+    other_configuration.access_token = "other token"
+    other_configuration.request_coalescer = api_client.configuration.request_coalescer
+    other_client = server_client.ApiClient(other_configuration)
+    other_client.rest_client.pool_manager = pool_manager
+
+    clients = [api_client, other_client]
+    with ThreadPoolExecutor(CALLS) as executor:
+        list(executor.map(
+            lambda i: clients[i % 2].call_json(JobsApi(clients[i % 2]).jobs_get_job_v3, "job1"), range(CALLS)
+        ))
+    assert pool_manager.requests == 2, pool_manager.requests
+    print("identities: ok")
+
+
+async def test_tasks():
+    """Identical call_json calls made by tasks at the same time share one request"""
+    requests = []
+
+    async def handler(request):
+        requests.append(request.url)
+        await asyncio.sleep(LATENCY)
+        return httpx.Response(200, json=JOB)
+
+    api_client = server_client.AsyncApiClient(configuration())
+    api_client.rest_client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    jobs_api = JobsApi(api_client)
+    try:
+        results = await asyncio.gather(*(api_client.call_json(jobs_api.jobs_get_job_v3, "job1") for _ in range(CALLS)))
+        assert len(requests) == 1, requests
+        assert all(result == JOB for result in results) and len({id(result) for result in results}) == CALLS
+
+        jobs = await asyncio.gather(*(jobs_api.jobs_get_job_v3("job1") for _ in range(CALLS)))
+        assert len(requests) == 2, requests
+        assert all(job.id == "job1" for job in jobs) and len({id(job) for job in jobs}) == CALLS
+    finally:
+        await api_client.close()
+    stats = api_client.configuration.request_coalescer.stats()
+    assert stats["calls"] == 2 * CALLS and stats["coalesced"] == 2 * CALLS - 2, stats
+    print(f"tasks: {CALLS} identical calls, 1 request: ok")
+
+
+def main():
+    """Check that identical concurrent GET calls share one request through a fake transport."""
+    test_threads()
+    test_identities()
+    asyncio.run(test_tasks())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import email.utils
+import io
+import time
+
+import urllib3
+
+import src.server_client as server_client
+from src.server_client.rest import ApiException
+
+HOST = "http://server/webapi/v3"
+
+
+class ScriptedPoolManager:
+    """Stands in for the urllib3 pool manager, answering the requests with the scripted responses in order.
+
+    A response is a `(status, headers)` pair, or an exception raised by the request.
+    """
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.sent_at = []
+
+    def request(self, method, url, preload_content=True, **kwargs):
+        self.sent_at.append(time.monotonic())
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        status, headers = response
+        return urllib3.HTTPResponse(
+            body=io.BytesIO(b"{}"), status=status, headers=dict(headers, **{"Content-Type": "application/json"}),
+            preload_content=preload_content,
+        )
+
+
+def client(responses, **settings):
+    configuration = server_client.Configuration()
+    configuration.host = HOST
+    configuration.rate_limit_requests_per_second = 0
+    configuration.circuit_breaker_window = 0
+    configuration.http_cache_enabled = False
+    configuration.retry_max_retries = 3
+    configuration.retry_backoff_seconds = 0.05
+    configuration.retry_budget_seconds = 10
+    for name, value in settings.items():
+        setattr(configuration, name, value)
+    api_client = server_client.ApiClient(configuration)
+    api_client.rest_client.pool_manager = ScriptedPoolManager(responses)
+    return api_client
+
+
+def call(api_client, method="GET"):
+    return api_client.call_api("/jobs/{jobId}", method, path_params={"jobId": "job1"}, response_type="object",
+                               body={} if method == "POST" else None, _return_http_data_only=True)
+
+
+def waits(api_client):
+    sent_at = api_client.rest_client.pool_manager.sent_at
+    return [later - earlier for earlier, later in zip(sent_at, sent_at[1:])]
+
+
+def test_retry_after_seconds():
+    """A 503 with `Retry-After: 1` is retried after one second"""
+    api_client = client([(503, {"Retry-After": "1"}), (200, {})])
+    assert call(api_client) == {}
+    assert 0.95 <= waits(api_client)[0] < 1.5, waits(api_client)
+    stats = api_client.configuration.retry_policy.stats()
+    assert stats["recovered_calls"] == 1 and stats["retries_by_reason"] == {"status 503": 1}, stats
+    print("Retry-After in seconds: ok")
+
+
+def test_retry_after_date():
+    """A 429 with a `Retry-After` date is retried at that date, even for a POST"""
+    retry_at = email.utils.formatdate(time.time() + 2, usegmt=True)
+    api_client = client([(429, {"Retry-After": retry_at}), (200, {})])
+    assert call(api_client, "POST") == {}
+    # The date has a one second resolution
+    assert 0.9 <= waits(api_client)[0] < 2.5, waits(api_client)
+    print("Retry-After as a date: ok")
+
+
+def test_non_idempotent():
+    """A POST is not retried on a server error, it may have been processed"""
+    api_client = client([(503, {}), (200, {})])
+    try:
+        call(api_client, "POST")
+        raise AssertionError("the POST was retried")
+    except ApiException as e:
+        assert e.status == 503
+    assert len(api_client.rest_client.pool_manager.sent_at) == 1
+    print("non idempotent methods: ok")
+
+
+def test_connection_errors():
+    """Connection errors are retried with a backoff, up to `retry_max_retries`"""
+    error = urllib3.exceptions.NewConnectionError(None, "Connection refused")
+    api_client = client([error, error, (200, {})])
+    assert call(api_client) == {}
+    assert api_client.configuration.retry_policy.stats()["retries_by_reason"] == {"connection error": 2}
+
+    api_client = client([error] * 5, retry_max_retries=2)
+    try:
+        call(api_client)
+        raise AssertionError("the connection error was not raised")
+    except ApiException as e:
+        assert e.status == 0
+    assert len(api_client.rest_client.pool_manager.sent_at) == 3
+    assert api_client.configuration.retry_policy.stats()["exhausted_calls"] == 1
+    print("connection errors: ok")
+
+
+def test_budget():
+    """A Retry-After beyond the budget of the call fails it right away instead of waiting"""
+    api_client = client([(503, {"Retry-After": "30"}), (200, {})], retry_budget_seconds=2)
+    start = time.monotonic()
+    try:
+        call(api_client)
+        raise AssertionError("the call waited beyond its budget")
+    except ApiException as e:
+        assert e.status == 503
+    assert time.monotonic() - start < 0.5
+    assert len(api_client.rest_client.pool_manager.sent_at) == 1
+    print("retry budget: ok")
+
+
+def main():
+    """Drive the retry policy through a fake transport."""
+    test_retry_after_seconds()
+    test_retry_after_date()
+    test_non_idempotent()
+    test_connection_errors()
+    test_budget()
+
+
+if __name__ == "__main__":
+    main()
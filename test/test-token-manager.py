@@ -0,0 +1,139 @@
+import asyncio
+import io
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import urllib3
+
+import src.server_client as server_client
+from src.server_client.rest import ApiException
+
+HOST = "http://server/webapi"
+CALLS = 10
+BACKOFF_SECONDS = 0.5
+
+
+class FakeServer:
+    """Token endpoint failing with 503 while `down`, API endpoints accepting the tokens it issued"""
+
+    def __init__(self):
+        self.down = True
+        self.token_requests = 0
+        self._lock = threading.Lock()
+
+    def respond(self, url, authorization):
+        """Return the status and JSON body of the response"""
+        if url.endswith("/oauth2/token"):
+            with self._lock:
+                self.token_requests += 1
+            # Slow enough for every concurrent call to wait for the same token request
+            time.sleep(0.2)
+            if self.down:
+                return 503, {"message": "token endpoint down"}
+            return 200, {"access_token": "token", "expires_in": 3600}
+        if authorization != "Bearer token":
+            return 401, {"message": "invalid token"}
+        return 200, {"id": "job1"}
+
+
+class FakePoolManager:
+    def __init__(self, server):
+        self.server = server
+
+    def request(self, method, url, preload_content=True, headers=None, **kwargs):
+        status, body = self.server.respond(url, (headers or {}).get("Authorization"))
+        return urllib3.HTTPResponse(
+            body=io.BytesIO(json.dumps(body).encode("utf8")), status=status,
+            headers={"Content-Type": "application/json"}, preload_content=preload_content,
+        )
+
+
+def configuration():
+    configuration = server_client.Configuration()
+    configuration.host = HOST
+    configuration.client_id = "client"
+    configuration.client_secret = "secret"
+    configuration.access_token = ""
+    configuration.retry_max_retries = 0
+    configuration.rate_limit_requests_per_second = 0
+    configuration.circuit_breaker_window = 0
+    configuration.http_cache_enabled = False
+    configuration.request_coalescing = False
+    configuration.token_manager.failure_backoff_seconds = BACKOFF_SECONDS
+    return configuration
+
+
+def get_job(api_client):
+    try:
+        return api_client.call_api("/v3/jobs/{jobId}", "GET", path_params={"jobId": "job1"}, response_type="object",
+                                   auth_settings=["oauth2"], _return_http_data_only=True)
+    except ApiException as e:
+        return e.status
+
+
+def test_threads():
+    """Callers get the error of the token request, and no other one is sent during the backoff"""
+    server = FakeServer()
+    api_client = server_client.ApiClient(configuration())
+    api_client.rest_client.pool_manager = FakePoolManager(server)
+
+    with ThreadPoolExecutor(CALLS) as executor:
+        assert list(executor.map(lambda _: get_job(api_client), range(CALLS))) == [503] * CALLS
+    assert server.token_requests == 1, server.token_requests
+    assert [get_job(api_client) for _ in range(CALLS)] == [503] * CALLS
+    assert server.token_requests == 1, "token requests were sent during the backoff"
+
+    server.down = False
+    time.sleep(BACKOFF_SECONDS)
+    assert get_job(api_client) == {"id": "job1"}
+    assert server.token_requests == 2
+    print("threads: ok")
+
+
+async def test_tasks():
+    """Tasks waiting for a failed token request get its error, and no other one is sent during the backoff"""
+    server = FakeServer()
+
+    async def handler(request):
+        if request.url.path.endswith("/oauth2/token"):
+            await asyncio.sleep(0.2)
+        status, body = server.respond(str(request.url), request.headers.get("Authorization"))
+        return httpx.Response(status, json=body)
+
+    api_client = server_client.AsyncApiClient(configuration())
+    api_client.rest_client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def get_job_async():
+        try:
+            return await api_client.call_api("/v3/jobs/{jobId}", "GET", path_params={"jobId": "job1"},
+                                             response_type="object", auth_settings=["oauth2"],
+                                             _return_http_data_only=True)
+        except ApiException as e:
+            return e.status
+
+    try:
+        assert await asyncio.gather(*(get_job_async() for _ in range(CALLS))) == [503] * CALLS
+        assert await asyncio.gather(*(get_job_async() for _ in range(CALLS))) == [503] * CALLS
+        assert server.token_requests == 1, server.token_requests
+
+        server.down = False
+        await asyncio.sleep(BACKOFF_SECONDS)
+        assert await asyncio.gather(*(get_job_async() for _ in range(CALLS))) == [{"id": "job1"}] * CALLS
+        assert server.token_requests == 2, server.token_requests
+    finally:
+        await api_client.close()
+    assert api_client.configuration.token_manager.failure_count == 1
+    print("tasks: ok")
+
+
+def main():
+    """Drive the token manager through a fake transport while the token endpoint is down."""
+    test_threads()
+    asyncio.run(test_tasks())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import json
+import pprint
+import time
+
+import src.server_client as server_client
+from src.output import list_fields, project, to_data, to_tool_result
+
+ROWS = 2000
+REPEAT = 5
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+def synthetic_workflows(count):
+    return [
+        {
+            "id": f"{i:024x}",
+            "sourceAppId": f"{i:024x}",
+            "name": f"Workflow {i}",
+            "ownerId": f"{i % 100:024x}",
+            "dateCreated": "2024-05-01T12:34:56Z",
+            "publishedVersionNumber": i % 7,
+            "isAmp": True,
+            "executionMode": "Standard",
+            "workflowCredentialType": None,
+            "credentialId": None,
+        }
+        for i in range(count)
+    ]
+
+
+def bench(label, func):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        text = func()
+    elapsed = (time.perf_counter() - start) / REPEAT
+    size = len(text.encode("utf-8"))
+    print(f"{label:40s} {elapsed * 1000:9.1f} ms/call  {size:10d} bytes")
+    return elapsed, size
+
+
+def main():
+    """Compare the pprint tool output with the structured JSON output for a get_all_workflows call."""
+    api_client = server_client.ApiClient()
+    codec = api_client.configuration.json_codec
+    body = json.dumps(synthetic_workflows(ROWS))
+
+    def pformat_output():
+        return pprint.pformat(api_client.deserialize(FakeResponse(body), "list[ReducedWorkflowView]"))
+
+    def models_output():
+        data = to_data(api_client.deserialize(FakeResponse(body), "list[ReducedWorkflowView]"))
+        return to_tool_result(data, codec)[0][0].text
+
+    def json_output():
+        return to_tool_result(to_data(codec.loads(body)), codec)[0][0].text
+
+    def summary_output():
+        data = to_data(project(codec.loads(body), list_fields("workflows", summary=True)))
+        return to_tool_result(data, codec)[0][0].text
+
+    print(f"get_all_workflows with {ROWS} workflows, {codec.name} codec")
+    baseline_ms, baseline_bytes = bench("pprint.pformat of models", pformat_output)
+    for label, func in (
+        ("structured JSON from models", models_output),
+        ("structured JSON from decoded JSON", json_output),
+        ("structured JSON, summary fields", summary_output),
+    ):
+        elapsed, size = bench(label, func)
+        print(f"{'':40s} {baseline_ms / elapsed:9.1f}x faster  {size / baseline_bytes:10.0%} of the bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import asyncio
 import time
 import json
 import re
@@ -21,13 +22,13 @@ def main():
 
     tools = AYXMCPTools()
     
-    execution_result = tools.execute_workflow_with_monitoring(
+    execution_result = asyncio.run(tools.execute_workflow_with_monitoring(
         workflow_id=workflow_id,
         input_data=None,  # Set to None for workflows without parameters
         wait_for_completion=True,
         timeout_seconds=300,  # 5 minutes timeout
         poll_interval_seconds=10
-    )
+    ))
 
     print(execution_result)
     
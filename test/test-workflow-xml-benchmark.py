@@ -0,0 +1,72 @@
+import base64
+import io
+import os
+import time
+import tracemalloc
+import zipfile
+
+import xmltodict
+
+from src.workflow_package import read_tool_list
+
+TOOLS = 200
+DATA_BYTES = 256 * 1024
+SKIPPED = ("BG_Image", "Font", "TextColor", "FillColor", "Justification", "TextSize", "Data")
+
+
+def synthetic_package():
+    """Zip a workflow whose tools each embed DATA_BYTES of base64 data, like Text Input tools do"""
+    data = base64.b64encode(os.urandom(DATA_BYTES)).decode("ascii")
+    nodes = "".join(
+        f'<Node ToolID="{i}"><GuiSettings Plugin="AlteryxBasePluginsGui.TextInput.TextInput">'
+        f'<Position x="{i * 10}" y="54" /></GuiSettings><Properties><Configuration>'
+        f'<NumRows value="100" /><Fields><Field name="A" /><Field name="B" /></Fields>'
+        f"<Data>{data}</Data><Font name=\"Arial\" size=\"8\" /><TextColor name=\"Black\" /></Configuration>"
+        f"<Annotation DisplayMode=\"0\"><Name /></Annotation></Properties>"
+        f'<EngineSettings EngineDll="AlteryxBasePluginsEngine.dll" /></Node>'
+        for i in range(TOOLS)
+    )
+    xml = f'<?xml version="1.0"?><AlteryxDocument yxmdVer="2023.1"><Nodes>{nodes}</Nodes><Connections />' \
+          f"</AlteryxDocument>"
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as package:
+        package.writestr("workflow.yxmd", xml)
+    return buffer.getvalue(), len(xml)
+
+
+def xmltodict_tool_list(package_bytes):
+    """The previous implementation: read the whole document, build the full tree, then drop the unused keys"""
+    with zipfile.ZipFile(io.BytesIO(package_bytes)) as package:
+        xml_content = package.read("workflow.yxmd").decode("utf-8")
+    tools_dict = {}
+    for tool in xmltodict.parse(xml_content)["AlteryxDocument"]["Nodes"]["Node"]:
+        tool_dict = tool["Properties"]["Configuration"]
+        tool_dict["ToolType"] = tool["GuiSettings"]["@Plugin"]
+        for key in SKIPPED:
+            tool_dict.pop(key, None)
+        tools_dict[tool["@ToolID"]] = tool_dict
+    return tools_dict
+
+
+def bench(label, func, package_bytes):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(package_bytes)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:30s} {elapsed * 1000:9.1f} ms  {peak / 2 ** 20:9.1f} MiB peak")
+    return result
+
+
+def main():
+    """Compare the time and peak memory of the xmltodict and the streaming tool list extraction."""
+    package_bytes, xml_size = synthetic_package()
+    print(f"{TOOLS} tools, {xml_size / 2 ** 20:.1f} MiB document, {len(package_bytes) / 2 ** 20:.1f} MiB package")
+    expected = bench("xmltodict", xmltodict_tool_list, package_bytes)
+    result = bench("streaming parser", read_tool_list, package_bytes)
+    assert result == expected, "the streaming parser output differs from xmltodict"
+
+
+if __name__ == "__main__":
+    main()